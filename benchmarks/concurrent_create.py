@@ -0,0 +1,44 @@
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+from task_cli.task_manager import TaskManager
+
+
+def _create_tasks(root_dir: str, count: int) -> list:
+    task_manager = TaskManager(root_dir)
+    return [task_manager.create_task(f"Task {i}", "Feature", "bench") for i in range(count)]
+
+
+def run(processes: int, count: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        TaskManager(tmp).init_workspace()
+        start = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(_create_tasks, [(tmp, count)] * processes)
+        elapsed = time.perf_counter() - start
+    task_ids = [task_id for result in results for task_id in result]
+    return {
+        "processes": processes,
+        "creates": len(task_ids),
+        "duplicates": len(task_ids) - len(set(task_ids)),
+        "seconds": elapsed,
+        "creates_per_second": len(task_ids) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create tasks from concurrent processes and report creates/sec")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--count", type=int, default=100, help="Tasks created by every process")
+    args = parser.parse_args()
+    result = run(args.processes, args.count)
+    print(f"{result['creates']} creates from {result['processes']} processes in {result['seconds']:.2f}s, "
+          f"{result['creates_per_second']:.0f} creates/sec, {result['duplicates']} duplicate ids")
+    if result["duplicates"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import gc
+import json
+import tempfile
+import tracemalloc
+
+from benchmarks.workspace_generator import generate_workspace
+from task_cli.task_manager import TaskManager
+
+
+def measure(count: int, history_length: int = 20, body_size: int = 0, seed: int = 0) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_workspace(tmp, count, history_length=history_length, body_size=body_size, seed=seed)
+        task_manager = TaskManager(tmp)
+        # The index is loaded before measuring, only the tasks themselves are counted.
+        task_manager.sync()
+        gc.collect()
+        tracemalloc.start()
+        tasks = task_manager.list_tasks()
+        for task in tasks:
+            task.history
+        gc.collect()
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "tasks": len(tasks),
+        "history_length": history_length,
+        "bytes": size,
+        "peak_bytes": peak,
+        "bytes_per_task": size / len(tasks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the memory used by the tasks of a board-wide scan")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--history-length", type=int, default=20)
+    parser.add_argument("--body-size", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+    result = measure(args.count, args.history_length, args.body_size, args.seed)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['tasks']} tasks with {result['history_length']} history entries: "
+              f"{result['bytes_per_task']:.0f} bytes/task, {result['peak_bytes'] / 2 ** 20:.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.workspace_generator import generate_workspace
+from task_cli.config import WorkspaceConfig
+from task_cli.task_manager import TaskManager
+
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_ENGINES = (WorkspaceConfig.FILES,)
+
+
+# Every scenario gets the workspace, its size and the repetition number, does its
+# setup and returns the callable that is timed.
+def _init(root_dir: Path, count: int, i: int):
+    workspace = root_dir / "init" / str(i)
+    workspace.mkdir(parents=True)
+    return lambda: TaskManager(workspace).init_workspace()
+
+
+def _create(root_dir: Path, count: int, i: int):
+    return lambda: TaskManager(root_dir).create_task("Benchmark task", "Feature", "bench")
+
+
+def _move(root_dir: Path, count: int, i: int):
+    return lambda: TaskManager(root_dir).move_task(i + 1, "ip")
+
+
+def _update_priority(root_dir: Path, count: int, i: int):
+    return lambda: TaskManager(root_dir).update_task_priority(i + 1, "Low")
+
+
+def _update_category(root_dir: Path, count: int, i: int):
+    return lambda: TaskManager(root_dir).update_task_category(i + 1, "Security")
+
+
+def _delete(root_dir: Path, count: int, i: int):
+    return lambda: TaskManager(root_dir).delete_task(count - i)
+
+
+def _list_cold(root_dir: Path, count: int, i: int):
+    (root_dir / ".tasks" / "index").unlink(missing_ok=True)
+    return lambda: TaskManager(root_dir).list_tasks()
+
+
+def _list(**filters):
+    def scenario(root_dir: Path, count: int, i: int):
+        return lambda: TaskManager(root_dir).list_tasks(**filters)
+    return scenario
+
+
+def _iter(**options):
+    def scenario(root_dir: Path, count: int, i: int):
+        return lambda: list(TaskManager(root_dir).iter_tasks(**options))
+    return scenario
+
+
+def _summary(by: list = None):
+    def scenario(root_dir: Path, count: int, i: int):
+        return lambda: TaskManager(root_dir).summarize(by)
+    return scenario
+
+
+def _search(text: str, **filters):
+    def scenario(root_dir: Path, count: int, i: int):
+        return lambda: TaskManager(root_dir).search_tasks(text, limit=20, **filters)
+    return scenario
+
+
+SCENARIOS = {
+    "init": _init,
+    "list_cold": _list_cold,
+    "list": _list(),
+    "list_board": _list(board="ip"),
+    "list_priority": _list(priority="High"),
+    "list_category": _list(category="Bug"),
+    "list_owner": _list(owner="alice"),
+    "list_board_category": _list(board="ip", category="Bug"),
+    "list_limit": _iter(limit=20),
+    "list_sort": _iter(order="-priority,created"),
+    "summary": _summary(),
+    "summary_pivot": _summary(["board", "priority"]),
+    "search": _search("cache parser"),
+    "search_prefix_board": _search("work*", board="ip"),
+    "create": _create,
+    "move": _move,
+    "update_priority": _update_priority,
+    "update_category": _update_category,
+    "delete": _delete,
+}
+
+
+def run_scenario(scenario, root_dir: Path, count: int, repeat: int) -> list:
+    timings = []
+    for i in range(repeat):
+        func = scenario(root_dir, count, i)
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def generate(root_dir: Path, count: int, engine: str = WorkspaceConfig.FILES, **generator_options):
+    task_manager = generate_workspace(root_dir, count, **generator_options)
+    if engine != WorkspaceConfig.FILES:
+        (task_manager.workspace / "config").write_text(f"[storage]\nengine = {engine}\n")
+        # The first command of the new engine imports the task files.
+        TaskManager(root_dir).sync()
+
+
+def run(sizes, repeat: int = 5, scenarios=None, engines=DEFAULT_ENGINES, **generator_options) -> dict:
+    results = []
+    for count in sizes:
+        for engine in engines:
+            with tempfile.TemporaryDirectory() as tmp:
+                root_dir = Path(tmp)
+                start = time.perf_counter()
+                generate(root_dir, count, engine, **generator_options)
+                print(f"Generated {count} tasks for {engine} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+                for name in scenarios or SCENARIOS:
+                    timings = run_scenario(SCENARIOS[name], root_dir, count, repeat)
+                    results.append({
+                        "scenario": name,
+                        "engine": engine,
+                        "tasks": count,
+                        "repeat": repeat,
+                        "min": min(timings),
+                        "median": statistics.median(timings),
+                        "mean": statistics.fmean(timings),
+                    })
+                    print(f"{name:>16} {engine:>7} {count:>8} tasks  median "
+                          f"{results[-1]['median'] * 1000:10.2f} ms", file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "generator": generator_options,
+        "results": results,
+    }
+
+
+def _key(result: dict) -> tuple:
+    # Results saved before the storage engines were added are for the files engine.
+    return result["scenario"], result.get("engine", WorkspaceConfig.FILES), result["tasks"]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    baseline_medians = {_key(result): result["median"] for result in baseline["results"]}
+    comparison = []
+    for result in results["results"]:
+        baseline_median = baseline_medians.get(_key(result))
+        if not baseline_median:
+            continue
+        ratio = result["median"] / baseline_median
+        comparison.append({
+            "scenario": result["scenario"],
+            "engine": result.get("engine", WorkspaceConfig.FILES),
+            "tasks": result["tasks"],
+            "baseline": baseline_median,
+            "median": result["median"],
+            "ratio": ratio,
+            "regression": ratio > threshold,
+        })
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the task-cli benchmarks on synthetic workspaces")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma separated workspace sizes, eg 1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scenarios", default=None, help=f"Comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--engines", default=",".join(DEFAULT_ENGINES),
+                        help="Comma separated storage engines to compare, eg files,sqlite")
+    parser.add_argument("--history-length", type=int, default=5)
+    parser.add_argument("--body-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="Compare against results saved with --output")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(",") if args.scenarios else None
+    for name in scenarios or []:
+        if name not in SCENARIOS:
+            parser.error(f"Invalid scenario: {name}")
+    engines = args.engines.split(",")
+    for engine in engines:
+        if engine not in WorkspaceConfig._storage_engines:
+            parser.error(f"Invalid storage engine: {engine}")
+    results = run([int(size) for size in args.sizes.split(",")], args.repeat, scenarios, engines,
+                  history_length=args.history_length, body_size=args.body_size, seed=args.seed)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        comparison = compare(results, json.loads(Path(args.baseline).read_text()), args.threshold)
+        for row in comparison:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['scenario']:>16} {row['engine']:>7} {row['tasks']:>8} tasks  {row['baseline'] * 1000:10.2f} ms -> "
+                  f"{row['median'] * 1000:10.2f} ms  x{row['ratio']:.2f} {flag}", file=sys.stderr)
+        if any(row["regression"] for row in comparison):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
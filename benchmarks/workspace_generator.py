@@ -0,0 +1,74 @@
+import random
+from datetime import datetime, timedelta
+
+from task_cli.task import Task, TaskHistory
+from task_cli.task_manager import TaskManager
+from task_cli.task_priority import TaskPriority
+
+DEFAULT_BOARDS = {"Backlog": 0.3, "In Progress": 0.1, "Done": 0.6}
+DEFAULT_PRIORITIES = {"High": 0.2, "Medium": 0.6, "Low": 0.2}
+DEFAULT_CATEGORIES = {"Bug": 0.3, "Feature": 0.4, "Documentation": 0.1, "Maintenance": 0.1,
+                      "UI/UX": 0.05, "Security": 0.05}
+DEFAULT_OWNERS = {"alice": 0.4, "bob": 0.4, None: 0.2}
+
+_words = ("task", "cli", "board", "list", "update", "fix", "add", "remove", "index", "cache", "docs",
+          "history", "priority", "category", "owner", "parser", "workspace", "sort", "filter", "test")
+
+
+def generate_workspace(root_dir, count: int, history_length: int = 5, body_size: int = 200,
+                       boards: dict = None, priorities: dict = None, categories: dict = None,
+                       owners: dict = None, seed: int = 0) -> TaskManager:
+    rng = random.Random(seed)
+    task_manager = TaskManager(root_dir)
+    task_manager.init_workspace()
+    boards = _choices(rng, boards or DEFAULT_BOARDS, count)
+    priorities = _choices(rng, priorities or DEFAULT_PRIORITIES, count)
+    categories = _choices(rng, categories or DEFAULT_CATEGORIES, count)
+    owners = _choices(rng, owners or DEFAULT_OWNERS, count)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        created = start + timedelta(minutes=rng.randrange(60 * 24 * 365))
+        task = Task(
+            task_id=i + 1,
+            title=" ".join(rng.choices(_words, k=rng.randint(2, 6))),
+            description=_text(rng, body_size),
+            priority=TaskPriority.from_name(priorities[i]),
+            category=categories[i],
+            owner=owners[i],
+            created=created,
+            board=boards[i],
+            notes=_text(rng, body_size // 4),
+            history=_history(rng, created, boards[i], history_length))
+        task_file = task_manager.storage.layout.path(f"{task.task_id}.md")
+        task_file.parent.mkdir(exist_ok=True)
+        task_file.write_text(task.to_string())
+    task_manager.task_counter_file.write_text(str(count))
+    return task_manager
+
+
+def _choices(rng: random.Random, weights: dict, count: int) -> list:
+    return rng.choices(list(weights), weights=list(weights.values()), k=count)
+
+
+def _text(rng: random.Random, size: int) -> str:
+    words = []
+    length = -1
+    while length < size:
+        word = rng.choice(_words)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def _history(rng: random.Random, created: datetime, board: str, length: int) -> list:
+    history = [TaskHistory(timestamp=created, action="Created")]
+    timestamp = created
+    for i in range(1, length):
+        timestamp += timedelta(minutes=rng.randrange(1, 60 * 24 * 7))
+        if i == length - 1:
+            action = f"Moved to {board}"
+        else:
+            action = rng.choice(["Moved to In Progress", "Priority updated to High",
+                                 "Priority updated to Medium", "Category updated to Bug"])
+        history.append(TaskHistory(timestamp=timestamp, action=action))
+    return history
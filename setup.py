@@ -3,7 +3,7 @@ from setuptools import setup, find_packages
 setup(
     name='task-cli',
     version='0.1.2',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     include_package_data=True,
     install_requires=[
         'Click',
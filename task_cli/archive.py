@@ -0,0 +1,138 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from task_cli.query import TaskQuery
+from task_cli.task import Task
+from task_cli.task_index import TaskIndex
+from task_cli.task_parser import parse_header
+from task_cli.workflow import Workflow
+
+
+class TaskArchive:
+    """Tasks packed into the single file `.tasks/archive`, read through `mmap`.
+
+    The file starts with a magic number, followed by every task's Markdown text and an
+    offset table sorted by task id, and ends with the position and length of the table.
+    Each table row has the task id, the offset of its record, the length of the front
+    matter and the length of the whole record, so a task is found without reading the
+    other records and filters only decode front matters.
+    """
+
+    _magic = b"TASKARC1"
+    _row = struct.Struct("<IQII")
+    _footer = struct.Struct("<QI")
+
+    def __init__(self, archive_file: Path, workflow: Workflow = Task.DEFAULT_WORKFLOW):
+        self.archive_file = archive_file
+        self.workflow = workflow
+        self._map = None
+        self._table = {}
+        self._stat = None
+
+    def __len__(self):
+        return len(self._records())
+
+    def __contains__(self, task_id) -> bool:
+        return self._task_num(task_id) in self._records()
+
+    def task_ids(self) -> list:
+        return [Task.task_id_from_string(task_num) for task_num in self._records()]
+
+    def read(self, task_id) -> Task:
+        task_num = self._task_num(task_id)
+        record = self._records().get(task_num)
+        if record is None:
+            raise ValueError(f"Task {task_id} not found in the archive")
+        offset, _, length = record
+        return Task.from_string(self._map[offset:offset + length].decode(), workflow=self.workflow)
+
+    def query(self, where: TaskQuery = None):
+        """Yields the archived tasks by id, their bodies are only decoded when accessed."""
+        where = where or TaskQuery(workflow=self.workflow)
+        for task_num, (offset, header_length, length) in self._records().items():
+            metadata = parse_header(self._map[offset:offset + header_length].decode())
+            if not where.matches(TaskIndex.entry_from_metadata(metadata, self.workflow)):
+                continue
+            task = Task.from_metadata(metadata, self.workflow)
+            task.defer_body(lambda mapped=self._map, start=offset + header_length, end=offset + length:
+                            mapped[start:end].decode().strip())
+            yield task
+
+    def write(self, tasks=(), remove=()):
+        """Rewrites the archive with `tasks` added and the task ids in `remove` left out.
+
+        Records that are kept are copied without being decoded. The new archive replaces
+        the old one atomically and is deleted when no task is left in it.
+        """
+        records = self._records()
+        removed = {self._task_num(task_id) for task_id in remove}
+        added = {Task.task_num_from_id(task.task_id): task.to_string().encode() for task in tasks}
+        task_nums = sorted((records.keys() - removed) | added.keys())
+        if not task_nums:
+            self.close()
+            self.archive_file.unlink(missing_ok=True)
+            return
+        table = bytearray()
+        tmp_file = self.archive_file.with_name(f".{self.archive_file.name}.tmp")
+        with tmp_file.open("wb") as f:
+            f.write(self._magic)
+            position = len(self._magic)
+            for task_num in task_nums:
+                if task_num in added:
+                    record = added[task_num]
+                    header_length = self._header_length(record)
+                else:
+                    offset, header_length, length = records[task_num]
+                    record = self._map[offset:offset + length]
+                f.write(record)
+                table += self._row.pack(task_num, position, header_length, len(record))
+                position += len(record)
+            f.write(table)
+            f.write(self._footer.pack(position, len(task_nums)))
+            f.flush()
+            os.fsync(f.fileno())
+        # The map is closed first, a mapped file can't be replaced on Windows.
+        self.close()
+        os.replace(tmp_file, self.archive_file)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._table = {}
+        self._stat = None
+
+    def _records(self) -> dict:
+        # The archive is mapped again when another process replaced it.
+        try:
+            stat = self.archive_file.stat()
+        except FileNotFoundError:
+            self.close()
+            return self._table
+        stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stat != self._stat:
+            # Not closed, tasks read from the old map may not have loaded their body yet.
+            with self.archive_file.open("rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._table = self._read_table()
+            self._stat = stat
+        return self._table
+
+    def _read_table(self) -> dict:
+        if self._map[:len(self._magic)] != self._magic:
+            raise ValueError(f"Invalid task archive: {self.archive_file}")
+        table_offset, count = self._footer.unpack_from(self._map, len(self._map) - self._footer.size)
+        rows = self._map[table_offset:table_offset + count * self._row.size]
+        return {task_num: (offset, header_length, length)
+                for task_num, offset, header_length, length in self._row.iter_unpack(rows)}
+
+    @staticmethod
+    def _header_length(record: bytes) -> int:
+        # The front matter ends with the second delimiter line.
+        return record.index(b"\n---\n", 3) + len(b"\n---\n")
+
+    @staticmethod
+    def _task_num(task_id) -> int:
+        return Task.task_num_from_id(Task.task_id_from_string(task_id))
@@ -0,0 +1,104 @@
+import csv
+import json
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from task_cli.task import Task
+
+
+@dataclass
+class Operation:
+    CREATE = "create"
+    MOVE = "move"
+    UPDATE = "update"
+    DELETE = "delete"
+
+    _ops = (CREATE, MOVE, UPDATE, DELETE)
+
+    line: int
+    op: str
+    task_id: Optional[int] = None
+    board: Optional[str] = None
+    priority: Optional[str] = None
+    category: Optional[str] = None
+    title: Optional[str] = None
+    owner: str = ""
+    error: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, line: int, data: dict):
+        if not isinstance(data, dict):
+            return cls(line=line, op="", error="Operation must be an object")
+        data = {key: value for key, value in data.items() if value not in (None, "")}
+        op = str(data.get("op", "")).lower()
+        operation = cls(line=line, op=op, board=data.get("board"), priority=data.get("priority"),
+                        category=data.get("category"), title=data.get("title"), owner=data.get("owner", ""))
+        if op not in cls._ops:
+            operation.error = f"Invalid operation: {data.get('op')}, allowed operations: {cls._ops}"
+            return operation
+        if op == cls.CREATE:
+            if not operation.title:
+                operation.error = "Missing title"
+            operation.category = operation.category or "Feature"
+            return operation
+        try:
+            operation.task_id = cls._task_num(data["task_id"])
+        except (KeyError, ValueError, IndexError):
+            operation.error = f"Invalid task id: {data.get('task_id')}"
+            return operation
+        if op == cls.MOVE and not operation.board:
+            operation.error = "Missing board"
+        if op == cls.UPDATE and not (operation.priority or operation.category):
+            operation.error = "Missing priority or category"
+        return operation
+
+    @staticmethod
+    def _task_num(task_id) -> int:
+        task_id = str(task_id)
+        if task_id.upper().startswith(Task._prefix):
+            return Task.task_num_from_id(task_id)
+        return int(task_id)
+
+    def __str__(self):
+        if self.op == self.CREATE:
+            return f"create {self.title}"
+        target = Task.task_id_from_string(self.task_id) if self.task_id is not None else ""
+        if self.op == self.MOVE:
+            return f"move {target} to {self.board}"
+        if self.op == self.UPDATE:
+            changes = [value for value in (self.priority, self.category) if value]
+            return f"update {target} to {', '.join(changes)}"
+        return f"{self.op} {target}".strip()
+
+
+@dataclass
+class OperationResult:
+    operation: Operation
+    ok: bool
+    message: str = ""
+
+
+def parse_operations(lines: Iterable[str], fmt: str = "ndjson") -> Iterator[Operation]:
+    if fmt == "ndjson":
+        return _parse_ndjson(lines)
+    if fmt == "csv":
+        return _parse_csv(lines)
+    raise ValueError(f"Invalid operations format: {fmt}")
+
+
+def _parse_ndjson(lines: Iterable[str]) -> Iterator[Operation]:
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield Operation(line=line_number, op="", error=f"Invalid JSON: {e}")
+            continue
+        yield Operation.from_dict(line_number, data)
+
+
+def _parse_csv(lines: Iterable[str]) -> Iterator[Operation]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield Operation.from_dict(reader.line_num, row)
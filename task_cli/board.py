@@ -1,17 +1,41 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Board:
     name: str
     acronym: str
 
     @classmethod
-    def from_allowed_boards(cls, board_name: str, allowed_boards: list):
-        for board in allowed_boards:
-            if board == board_name:
-                return board
-        raise ValueError(f"Invalid board: {board_name}")
+    def from_string(cls, board: str):
+        """A board written as `Name (ACRONYM)`, or just `Name` which is its own acronym."""
+        name, separator, acronym = board.strip().partition(" (")
+        if separator and not acronym.endswith(")"):
+            raise ValueError(f"Invalid board: {board}, use Name (ACRONYM)")
+        acronym = acronym[:-1].strip() if separator else name
+        if not name or not acronym:
+            raise ValueError(f"Invalid board: {board}, use Name (ACRONYM)")
+        return cls(name, acronym)
+
+    @classmethod
+    def from_allowed_boards(cls, board_name: str, allowed_boards):
+        """The board with this name or acronym, `allowed_boards` is a list or its `lookup_table`."""
+        if not isinstance(allowed_boards, dict):
+            allowed_boards = cls.lookup_table(allowed_boards)
+        board = allowed_boards.get(board_name.casefold())
+        if board is None:
+            raise ValueError(f"Invalid board: {board_name}")
+        return board
+
+    @staticmethod
+    def lookup_table(boards) -> dict:
+        """The boards by case-folded name and acronym."""
+        table = {}
+        for board in boards:
+            for key in (board.name.casefold(), board.acronym.casefold()):
+                if table.setdefault(key, board) is not board:
+                    raise ValueError(f"Duplicate board name or acronym: {key}")
+        return table
 
     def __eq__(self, other):
         other_name = ""
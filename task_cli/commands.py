@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from task_cli.batch import Operation
+from task_cli.output import format_tasks
+from task_cli.task_manager import TaskManager
+
+# The CLI commands that can be served by `task daemon`. Arguments and results are plain values so
+# they can be sent over the daemon socket, except the lines of list and search which are streamed.
+COMMANDS = ("list", "search", "explain", "summary", "create", "move", "update_priority", "update_category",
+            "delete", "apply", "archive", "restore", "edit", "fold", "sync", "migrate_layout")
+# The commands that only read the tasks, the others change them.
+QUERIES = ("list", "search", "explain", "summary")
+
+
+def execute(manager: TaskManager, command: str, args: dict):
+    if command == "list":
+        args = dict(args)
+        output_format = args.pop("output_format", "table")
+        fields = args.pop("fields", None)
+        return format_tasks(manager.iter_tasks(**args), output_format, fields)
+    if command == "search":
+        args = dict(args)
+        output_format = args.pop("output_format", "table")
+        fields = args.pop("fields", None)
+        return format_tasks(manager.search_tasks(**args), output_format, fields)
+    if command == "explain":
+        return manager.explain_query(**args)
+    if command == "summary":
+        return manager.summarize(**args)
+    if command == "create":
+        return manager.create_task(**args)
+    if command == "move":
+        task = manager.move_task(**args)
+        return {"task_id": task.task_id, "title": task.title, "board": task.board.name}
+    if command == "update_priority":
+        return manager.update_task_priority(**args)
+    if command == "update_category":
+        return manager.update_task_category(**args)
+    if command == "delete":
+        return manager.delete_task(**args)
+    if command == "apply":
+        results = manager.apply_operations(Operation(**operation) for operation in args["operations"])
+        return [{"line": result.operation.line, "operation": str(result.operation), "ok": result.ok,
+                 "message": result.message} for result in results]
+    if command == "archive":
+        before = datetime.strptime(args["before"], "%Y-%m-%d") if args.get("before") else None
+        return manager.archive_tasks(before)
+    if command == "restore":
+        return manager.restore_task(**args).task_id_with_title
+    if command == "edit":
+        # The journal is folded so the editor shows the whole task.
+        task_file = manager.task_location(**args)
+        manager.fold_journal()
+        return str(task_file.resolve())
+    if command == "fold":
+        return manager.fold_journal()
+    if command == "sync":
+        manager.sync(**args)
+        return str(manager.tasks_dir)
+    if command == "migrate_layout":
+        return manager.migrate_layout(**args)
+    raise ValueError(f"Invalid command: {command}, allowed commands: {COMMANDS}")
@@ -0,0 +1,137 @@
+import configparser
+import os
+from pathlib import Path
+
+from task_cli.sort_order import SortOrder
+from task_cli.workflow import DEFAULT_BOARDS, DEFAULT_CATEGORIES, Workflow, compile_workflow
+
+
+class WorkspaceConfig:
+    FILES = "files"
+    SQLITE = "sqlite"
+
+    _storage_engines = (FILES, SQLITE)
+
+    _defaults = {
+        "storage": {
+            "engine": FILES,
+        },
+        "journal": {
+            "enabled": "false",
+            "fold_threshold": "500",
+        },
+        "layout": {
+            "shard_size": "0",
+        },
+        "refresh": {
+            "git": "auto",
+        },
+        "workflow": {
+            "boards": DEFAULT_BOARDS,
+            "categories": DEFAULT_CATEGORIES,
+        },
+        "list": {
+            "sort": "board,id",
+        },
+    }
+
+    def __init__(self, config_file: Path):
+        self.config_file = config_file
+        self._parser = None
+
+    @property
+    def parser(self) -> configparser.ConfigParser:
+        if self._parser is None:
+            self._parser = configparser.ConfigParser()
+            self._parser.read_dict(self._defaults)
+            try:
+                self._parser.read_string(self.config_file.read_text(), source=str(self.config_file))
+            except FileNotFoundError:
+                pass
+            except configparser.Error as e:
+                raise ValueError(f"Invalid workspace config {self.config_file}: {e}")
+        return self._parser
+
+    def set(self, section: str, option: str, value=None):
+        """Writes an option to the config file, or removes it when the value is None."""
+        parser = configparser.ConfigParser()
+        try:
+            parser.read_string(self.config_file.read_text(), source=str(self.config_file))
+        except FileNotFoundError:
+            pass
+        except configparser.Error as e:
+            raise ValueError(f"Invalid workspace config {self.config_file}: {e}")
+        if value is None:
+            if parser.has_section(section):
+                parser.remove_option(section, option)
+        else:
+            if not parser.has_section(section):
+                parser.add_section(section)
+            parser.set(section, option, str(value))
+        tmp_file = self.config_file.with_name(f"{self.config_file.name}.{os.getpid()}.tmp")
+        with tmp_file.open("w") as f:
+            parser.write(f)
+        os.replace(tmp_file, self.config_file)
+        self._parser = None
+
+    @property
+    def storage_engine(self) -> str:
+        engine = self.parser.get("storage", "engine")
+        if engine not in self._storage_engines:
+            raise ValueError(f"Invalid value for storage.engine in {self.config_file}: {engine}, "
+                             f"allowed engines: {self._storage_engines}")
+        return engine
+
+    @property
+    def layout_shard_size(self) -> int:
+        shard_size = self._get(self.parser.getint, "layout", "shard_size")
+        if shard_size < 0:
+            raise ValueError(f"Invalid value for layout.shard_size in {self.config_file}: {shard_size}")
+        return shard_size
+
+    @property
+    def layout_previous_shard_size(self):
+        # Only set while the workspace is migrated to a new layout.
+        if not self.parser.has_option("layout", "previous_shard_size"):
+            return None
+        return self._get(self.parser.getint, "layout", "previous_shard_size")
+
+    @property
+    def journal_enabled(self) -> bool:
+        return self._get(self.parser.getboolean, "journal", "enabled")
+
+    @property
+    def journal_fold_threshold(self) -> int:
+        return self._get(self.parser.getint, "journal", "fold_threshold")
+
+    @property
+    def refresh_git(self):
+        """Whether caches ask git which task files changed, True, False or None to decide by workspace size."""
+        if self.parser.get("refresh", "git").lower() == "auto":
+            return None
+        return self._get(self.parser.getboolean, "refresh", "git")
+
+    @property
+    def workflow(self) -> Workflow:
+        """The boards and categories of the workspace, compiled once per process."""
+        options = {option: self.parser.get("workflow", option)
+                   for option in ("boards", "categories", "start", "done", "list_order")
+                   if self.parser.has_option("workflow", option)}
+        try:
+            return compile_workflow(**options)
+        except ValueError as e:
+            raise ValueError(f"Invalid value for workflow in {self.config_file}: {e}")
+
+    @property
+    def list_sort(self) -> SortOrder:
+        """The default order of `task list`, kept up to date in the task index."""
+        try:
+            return SortOrder.parse(self.parser.get("list", "sort"), self.workflow)
+        except ValueError as e:
+            raise ValueError(f"Invalid value for list.sort in {self.config_file}: {e}")
+
+    def _get(self, getter, section: str, option: str):
+        try:
+            return getter(section, option)
+        except ValueError as e:
+            raise ValueError(f"Invalid value for {section}.{option} in {self.config_file}: {e}")
@@ -0,0 +1,123 @@
+import json
+import os
+import socketserver
+import sys
+import threading
+
+from task_cli.commands import execute
+from task_cli.daemon_client import DaemonUnavailable, request, socket_path
+from task_cli.gitignore import ignore_local_files
+from task_cli.task_manager import TaskManager
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # Every request gets an answer, a client that gets none can't tell whether the command was applied.
+        try:
+            message = json.loads(self.rfile.readline())
+            result = self.server.daemon.handle(message["command"], message.get("args", {}))
+            response = {"ok": True, "result": result}
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"ok": False, "error": str(e)}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class TaskDaemon:
+    def __init__(self, root_dir: str = ".", poll_interval: float = 1.0):
+        self.root_dir = root_dir
+        self.manager = self._task_manager()
+        self.socket_path = socket_path(root_dir)
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._server = None
+        # False until the in-memory state matches the files again, eg after a failed refresh.
+        self._synced = False
+        self._refresh_error = None
+
+    def serve_forever(self):
+        if not self.manager.tasks_dir.exists():
+            raise ValueError(f"No task workspace in {self.manager.root_dir}, run `task init` first")
+        self._remove_stale_socket()
+        ignore_local_files(self.manager.workspace)
+        self.refresh()
+        self._server = socketserver.UnixStreamServer(str(self.socket_path), _RequestHandler)
+        self._server.daemon = self
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stopped.set()
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def shutdown(self):
+        self._stopped.set()
+        if self._server:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def refresh(self):
+        with self._lock:
+            self._sync()
+
+    def handle(self, command: str, args: dict):
+        if command == "ping":
+            return os.getpid()
+        if command == "shutdown":
+            self.shutdown()
+            return None
+        with self._lock:
+            if not self._synced:
+                self._sync()
+            try:
+                result = execute(self.manager, command, args)
+                if command in ("list", "search"):
+                    result = [line for line in result]
+            except ValueError:
+                raise
+            except Exception:
+                # A command that failed half way, eg on a write error, may have left the in-memory
+                # index or an open transaction out of step with the files, they are read again.
+                self.manager.close()
+                self.manager = self._task_manager()
+                self._synced = False
+                raise
+            return result
+
+    def _task_manager(self) -> TaskManager:
+        manager = TaskManager(self.root_dir)
+        # The watcher keeps the index fresh, requests don't have to stat the workspace.
+        manager.auto_refresh = False
+        return manager
+
+    def _sync(self):
+        self._synced = False
+        self.manager.sync()
+        self._synced = True
+
+    def _watch(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Reported once and retried at the next poll, eg a task file that can't be read yet.
+                # Requests sync first until a refresh succeeds, they don't see stale tasks.
+                error = f"{type(e).__name__}: {e}"
+                if error != self._refresh_error:
+                    print(f"⚠️ Refreshing {self.manager.tasks_dir} failed: {error}", file=sys.stderr, flush=True)
+                self._refresh_error = error
+            else:
+                self._refresh_error = None
+
+    def _remove_stale_socket(self):
+        if not self.socket_path.exists():
+            return
+        try:
+            request("ping", str(self.manager.root_dir))
+        except DaemonUnavailable:
+            self.socket_path.unlink(missing_ok=True)
+            return
+        raise ValueError(f"A task daemon is already listening on {self.socket_path}")
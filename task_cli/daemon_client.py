@@ -0,0 +1,48 @@
+import json
+import socket
+from pathlib import Path
+
+_socket_name = "daemon.sock"
+_connect_timeout = 5
+# Long enough for a large batch or a layout migration, a daemon that takes longer is considered stuck.
+_response_timeout = 120
+
+
+class DaemonUnavailable(Exception):
+    """No daemon could be reached, the command was not sent and can run on the files directly."""
+
+
+class DaemonError(Exception):
+    """The command was sent but no answer came back, the daemon may or may not have applied it."""
+
+
+def socket_path(root_dir: str = ".") -> Path:
+    return Path(root_dir) / ".tasks" / _socket_name
+
+
+def request(command: str, root_dir: str = ".", **args):
+    path = socket_path(root_dir)
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        raise DaemonUnavailable(f"No task daemon is listening on {path}")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.settimeout(_connect_timeout)
+            client.connect(str(path))
+        except OSError as e:
+            raise DaemonUnavailable(f"No task daemon is listening on {path}: {e}")
+        try:
+            client.settimeout(_response_timeout)
+            client.sendall(json.dumps({"command": command, "args": args}).encode() + b"\n")
+            with client.makefile("rb") as f:
+                response = f.readline()
+        except OSError as e:
+            raise DaemonError(f"Task daemon on {path} did not answer {command}: {e or type(e).__name__}")
+    try:
+        response = json.loads(response)
+    except ValueError:
+        response = None
+    if not isinstance(response, dict):
+        raise DaemonError(f"Task daemon on {path} closed the connection without answering {command}")
+    if not response["ok"]:
+        raise ValueError(response["error"])
+    return response["result"]
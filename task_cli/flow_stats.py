@@ -0,0 +1,166 @@
+import math
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+
+from task_cli.task import PackedHistory, Task
+from task_cli.workflow import Workflow
+
+_day = 86_400_000_000
+_week = 7 * _day
+# Timestamps are microseconds since 1970-01-01, a Thursday, weeks start on the Monday before it.
+_week_offset = 3 * _day
+_epoch = datetime(1970, 1, 1)
+
+
+class _BoardChanges:
+    """The board changes of all tasks, as flat arrays in the order of each task's history."""
+
+    def __init__(self, tasks: list, workflow: Workflow):
+        self.workflow = workflow
+        self.board_codes = {board.name: code for code, board in enumerate(self.workflow.boards)}
+        initial = self.board_codes[self.workflow.initial.name]
+        self.times = array("q")
+        self.tasks = array("l")
+        self.boards = array("b")
+        for i, task in enumerate(tasks):
+            timestamps, actions, payloads = task.history.columns
+            for timestamp, action, payload in zip(timestamps, actions, payloads):
+                if action == PackedHistory.CREATED:
+                    board = initial
+                elif action == PackedHistory.MOVED:
+                    board = self.board_codes.get(payload, -1)
+                else:
+                    continue
+                if board >= 0:
+                    self.times.append(timestamp)
+                    self.tasks.append(i)
+                    self.boards.append(board)
+
+    def milestones(self, count: int) -> tuple:
+        # When every task was created, first started and last finished, -1 when it wasn't.
+        in_progress = {self.board_codes[board.name] for board in self.workflow.in_progress}
+        done = self.board_codes[self.workflow.done.name]
+        created = array("q", [-1]) * count
+        started = array("q", [-1]) * count
+        finished = array("q", [-1]) * count
+        for time, i, board in zip(self.times, self.tasks, self.boards):
+            if created[i] < 0:
+                created[i] = time
+            if board in in_progress and started[i] < 0:
+                started[i] = time
+            finished[i] = time if board == done else -1
+        return created, started, finished
+
+    def weekly_boards(self, count: int):
+        # Sweeps the changes in time order and yields the tasks on every board at the end of each week.
+        if not self.times:
+            return
+        weeks = array("q", ((time + _week_offset) // _week for time in self.times))
+        order = sorted(range(len(self.times)), key=self.times.__getitem__)
+        current = array("b", [-1]) * count
+        counts = [0] * len(self.board_codes)
+        week = weeks[order[0]]
+        for change in order:
+            while week < weeks[change]:
+                yield week, list(counts)
+                week += 1
+            i = self.tasks[change]
+            if current[i] >= 0:
+                counts[current[i]] -= 1
+            current[i] = self.boards[change]
+            counts[current[i]] += 1
+        yield week, counts
+
+
+def flow_stats(tasks, by: str = None, workflow: Workflow = Task.DEFAULT_WORKFLOW) -> dict:
+    """Lead time, cycle time, weekly throughput, WIP and cumulative flow of the tasks.
+
+    Lead time goes from creation to the last move to the done board, cycle time from the
+    first move to a work in progress board to the last move to the done board, both in days
+    and only for tasks that are done. WIP counts the tasks on the work in progress boards,
+    the boards are those of `workflow`.
+    """
+    tasks = list(tasks)
+    changes = _BoardChanges(tasks, workflow)
+    created, started, finished = changes.milestones(len(tasks))
+    throughput = Counter((time + _week_offset) // _week for time in finished if time >= 0)
+    weekly = []
+    for week, counts in changes.weekly_boards(len(tasks)):
+        flow = {board.name: counts[code] for code, board in enumerate(changes.workflow.boards)}
+        weekly.append({
+            "week": _week_start(week),
+            "throughput": throughput[week],
+            "wip": sum(flow[board.name] for board in changes.workflow.in_progress),
+            "cumulative_flow": flow,
+        })
+    stats = _summary(range(len(tasks)), created, started, finished)
+    stats["weekly"] = weekly
+    if by:
+        groups = {}
+        for i, task in enumerate(tasks):
+            groups.setdefault(getattr(task, by), []).append(i)
+        stats["groups"] = [{by: group, **_summary(indexes, created, started, finished)}
+                           for group, indexes in sorted(groups.items(), key=lambda item: (item[0] is None, str(item[0])))]
+    return stats
+
+
+def format_table(stats: dict, by: str = None) -> list:
+    lines = [f"Tasks: {stats['tasks']}, done: {stats['done']}"]
+    for name, key in (("Lead time", "lead_time"), ("Cycle time", "cycle_time")):
+        durations = stats[key]
+        if durations["count"]:
+            lines.append(f"{name} (days): median {durations['median']}, mean {durations['mean']}, "
+                         f"85th percentile {durations['p85']} over {durations['count']} tasks")
+        else:
+            lines.append(f"{name} (days): no done tasks")
+    if stats["weekly"]:
+        boards = list(stats["weekly"][0]["cumulative_flow"])
+        lines.append("")
+        lines.append(_row(["Week", "Throughput", "WIP", *boards]))
+        for week in stats["weekly"]:
+            lines.append(_row([week["week"], week["throughput"], week["wip"],
+                               *(week["cumulative_flow"][board] for board in boards)]))
+    if by and stats.get("groups"):
+        lines.append("")
+        lines.append(_row([by.capitalize(), "Tasks", "Done", "Lead median", "Lead p85", "Cycle median", "Cycle p85"]))
+        for group in stats["groups"]:
+            lines.append(_row([group[by] or "-", group["tasks"], group["done"],
+                               group["lead_time"]["median"], group["lead_time"]["p85"],
+                               group["cycle_time"]["median"], group["cycle_time"]["p85"]]))
+    return lines
+
+
+def _summary(indexes, created: array, started: array, finished: array) -> dict:
+    done = [i for i in indexes if finished[i] >= 0]
+    return {
+        "tasks": len(indexes),
+        "done": len(done),
+        "lead_time": _durations([finished[i] - created[i] for i in done]),
+        "cycle_time": _durations([finished[i] - started[i] for i in done if started[i] >= 0]),
+    }
+
+
+def _durations(durations: list) -> dict:
+    if not durations:
+        return {"count": 0, "mean": None, "median": None, "p85": None}
+    days = sorted(duration / _day for duration in durations)
+    count = len(days)
+    middle = count // 2
+    median = days[middle] if count % 2 else (days[middle - 1] + days[middle]) / 2
+    return {
+        "count": count,
+        "mean": round(sum(days) / count, 2),
+        "median": round(median, 2),
+        # nearest rank percentile
+        "p85": round(days[math.ceil(0.85 * count) - 1], 2),
+    }
+
+
+def _week_start(week: int) -> str:
+    return (_epoch + timedelta(microseconds=week * _week - _week_offset)).date().isoformat()
+
+
+def _row(values: list) -> str:
+    first, *others = ("-" if value is None else str(value) for value in values)
+    return f"{first:<14}" + "".join(f"{value:>14}" for value in others)
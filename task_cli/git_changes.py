@@ -0,0 +1,145 @@
+import os
+import re
+from pathlib import Path
+
+from task_cli import trace
+from task_cli.layout import TaskLayout
+
+# Below this many task files a stat of every file is cheaper than running git.
+_auto_threshold = 1000
+
+# Set by git while it runs a hook, they would point the commands at the wrong repository.
+_hook_variables = ("GIT_DIR", "GIT_WORK_TREE", "GIT_INDEX_FILE")
+
+_hooks = ("post-checkout", "post-merge", "post-rewrite")
+_hook_marker = "# task-cli: refresh the task caches"
+# The script the hooks call, next to them in the hooks directory.
+_sync_script = "task-sync"
+# Hooks run by one of these can call the script, any other interpreter is left alone.
+_shells = ("sh", "bash", "dash", "ksh", "zsh")
+# The command earlier versions appended to the hooks, where an exit before it skipped it.
+_appended_command = re.compile(rf"\n*{re.escape(_hook_marker)}\ncommand -v task [^\n]*\ntrue\n")
+
+
+class GitChanges:
+    """Asks git which task files may have changed since a cache was refreshed.
+
+    A refresh records the HEAD commit and the task files that differed from it then:
+    changed in the working tree, staged, untracked or ignored. The files that may have
+    changed since are those that differ between that commit and the working tree, the
+    untracked and ignored ones, and those that differed at the last refresh. The caches
+    still compare the modification time and size of these files before reading them.
+    """
+
+    def __init__(self, tasks_dir: Path, enabled: bool = None):
+        self.tasks_dir = tasks_dir
+        # None decides by the number of task files.
+        self.enabled = enabled
+
+    def changes(self, state: dict, file_count: int) -> tuple:
+        """The paths of the task files that may have changed since `state`, and the state to keep.
+
+        The paths are None when every task file has to be checked: git is not used for this
+        workspace, it is not in a git repository, or `state` is from no known commit.
+        """
+        if self.enabled is False or (self.enabled is None and file_count < _auto_threshold):
+            return None, None
+        import subprocess
+
+        with trace.phase("git.changes"):
+            try:
+                toplevel, head = self._git("rev-parse", "--show-toplevel", "HEAD").splitlines()[:2]
+                others = self._paths("ls-files", "-z", "--others", "--full-name", "--", ".")
+                dirty = self._paths("diff", "-z", "--name-only", "--no-renames", head, "--", ".") | others
+                new_state = {"commit": head, "dirty": sorted(dirty)}
+                if not state or not state.get("commit"):
+                    return None, new_state
+                if state["commit"] == head:
+                    changed = set(dirty)
+                else:
+                    changed = self._paths("diff", "-z", "--name-only", "--no-renames", state["commit"], "--", ".")
+                    changed |= others
+            except (OSError, ValueError, subprocess.CalledProcessError):
+                return None, None
+        changed.update(state.get("dirty", ()))
+        trace.count("git_candidates", len(changed))
+        return [Path(toplevel, path) for path in sorted(changed)], new_state
+
+    def _paths(self, *args) -> set:
+        # Paths relative to the top of the repository, only those of task files.
+        return {path for path in self._git(*args).split("\0") if path and TaskLayout.is_task_file(Path(path).name)}
+
+    def _git(self, *args) -> str:
+        return _git(self.tasks_dir, *args)
+
+
+def install_hooks(root_dir: Path) -> tuple:
+    """Runs `task sync` from the post-checkout, post-merge and post-rewrite hooks of the git repository.
+
+    The command is in a `task-sync` script in the hooks directory, called right after the
+    shebang of the hooks so an `exit` or `exec` of an existing hook can't skip it. Hooks that
+    are not shell scripts, eg run by python or node, are left alone. Returns the hooks that
+    were changed and a dict of the skipped hooks with the reason, a hook that already calls
+    the script is in neither.
+    """
+    import subprocess
+
+    root_dir = root_dir.resolve()
+    try:
+        toplevel, hooks_dir = _git(root_dir, "rev-parse", "--show-toplevel", "--git-path", "hooks").splitlines()[:2]
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        raise ValueError(f"{root_dir} is not in a git repository")
+    hooks_dir = root_dir / hooks_dir
+    hooks_dir.mkdir(parents=True, exist_ok=True)
+    # Hooks run at the top of the working tree.
+    workspace = os.path.relpath(root_dir, toplevel)
+    sync_script = hooks_dir / _sync_script
+    sync_script.write_text(f"#!/bin/sh\n{_hook_marker}\n"
+                           f"command -v task >/dev/null 2>&1 && (cd \"{workspace}\" && task sync >/dev/null 2>&1)\n"
+                           f"exit 0\n")
+    _make_executable(sync_script)
+    call = f"{_hook_marker}\n\"$(dirname \"$0\")/{_sync_script}\"\n"
+    installed = []
+    skipped = {}
+    for hook in _hooks:
+        hook_file = hooks_dir / hook
+        try:
+            content = hook_file.read_text()
+        except FileNotFoundError:
+            content = ""
+        if call in content:
+            continue
+        content = _appended_command.sub("\n", content)
+        if not content.strip():
+            content = "#!/bin/sh\n"
+        shebang, _, rest = content.partition("\n")
+        interpreter = _interpreter(shebang)
+        if interpreter not in _shells:
+            skipped[hook] = f"run by {interpreter}" if interpreter else "no #! line"
+            continue
+        hook_file.write_text(f"{shebang}\n{call}{rest}")
+        _make_executable(hook_file)
+        installed.append(hook)
+    return installed, skipped
+
+
+def _interpreter(shebang: str) -> str:
+    # "#!/usr/bin/env bash" -> "bash", "#!/usr/bin/python3 -u" -> "python3"
+    if not shebang.startswith("#!"):
+        return ""
+    words = shebang[2:].split()
+    if words and Path(words[0]).name == "env":
+        words = [word for word in words[1:] if not word.startswith("-")]
+    return Path(words[0]).name if words else ""
+
+
+def _make_executable(path: Path):
+    path.chmod(path.stat().st_mode | 0o111)
+
+
+def _git(cwd: Path, *args) -> str:
+    import subprocess
+
+    env = {name: value for name, value in os.environ.items() if name not in _hook_variables}
+    return subprocess.run(["git", "-C", str(cwd), *args], env=env, capture_output=True, text=True,
+                          check=True).stdout
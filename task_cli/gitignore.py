@@ -0,0 +1,23 @@
+from pathlib import Path
+
+# Files of a workspace that are local caches, locks or sockets, never tracked by git.
+LOCAL_FILES = ("index", "search", "daemon.sock", "tasks.db*", "journal.lock", "journal.seq", "*.tmp")
+
+
+def ignore_local_files(workspace: Path):
+    """Adds the local files missing from `.tasks/.gitignore`, eg of a workspace created by an older version.
+
+    Called by the commands that create one of them, the lines already there are kept.
+    """
+    gitignore_file = workspace / ".gitignore"
+    try:
+        content = gitignore_file.read_text()
+    except FileNotFoundError:
+        content = ""
+    lines = content.splitlines()
+    missing = [pattern for pattern in LOCAL_FILES if pattern not in lines]
+    if not missing:
+        return
+    if content and not content.endswith("\n"):
+        content += "\n"
+    gitignore_file.write_text(content + "".join(f"{pattern}\n" for pattern in missing))
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from task_cli import file_lock
+
+
+class IdAllocator:
+    def __init__(self, counter_file: Path):
+        self.counter_file = counter_file
+
+    def reserve(self, count: int = 1) -> int:
+        if count < 1:
+            raise ValueError(f"Invalid number of ids to reserve: {count}")
+        # The lock is only held for the read-increment-write of the counter.
+        with self.counter_file.open("r+") as f:
+            file_lock.lock(f)
+            try:
+                counter = int(f.read() or 0)
+                f.seek(0)
+                f.write(str(counter + count))
+                f.truncate()
+                f.flush()
+            finally:
+                file_lock.unlock(f)
+        return counter + 1
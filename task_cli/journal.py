@@ -0,0 +1,156 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from task_cli import file_lock, trace
+from task_cli.gitignore import ignore_local_files
+from task_cli.task import Task
+from task_cli.task_parser import parse_timestamp
+from task_cli.task_priority import TaskPriority
+
+
+class JournalEvent(NamedTuple):
+    timestamp: datetime
+    field: str
+    value: str
+    # Tells apart identical events of the same second, 0 for the events of journals without it.
+    seq: int = 0
+
+    def to_string(self, task_id: str) -> str:
+        return (f"{task_id}\t{self.timestamp.strftime("%Y-%m-%d %H:%M:%S")}\t{self.field}\t{self.value}"
+                f"\t{self.seq}\n")
+
+
+class Journal:
+    BOARD = "board"
+    PRIORITY = "priority"
+    CATEGORY = "category"
+
+    _fields = (BOARD, PRIORITY, CATEGORY)
+
+    def __init__(self, journal_file: Path):
+        self.journal_file = journal_file
+        # Held by appends and rewrites, so a rewrite never drops an event another process appended.
+        self.lock_file = journal_file.with_name(f"{journal_file.name}.lock")
+        # The last sequence number, not reset when the journal is folded.
+        self.seq_file = journal_file.with_name(f"{journal_file.name}.seq")
+        self._events = None
+        self._locked = False
+
+    @property
+    def events(self) -> Dict[str, List[JournalEvent]]:
+        if self._events is None:
+            with trace.phase("journal.load"):
+                self._events = self._load()
+        return self._events
+
+    def reload(self):
+        self._events = None
+
+    def __len__(self):
+        return sum(len(events) for events in self.events.values())
+
+    def append(self, task_id: str, field: str, value: str, timestamp: datetime):
+        if field not in self._fields:
+            raise ValueError(f"Invalid journal field: {field}")
+        events = self.events.setdefault(task_id, [])
+        with self.locked():
+            event = JournalEvent(timestamp, field, value, self._next_seq())
+            with self.journal_file.open("a") as f:
+                f.write(event.to_string(task_id))
+        events.append(event)
+
+    @contextmanager
+    def locked(self):
+        """Holds the journal lock, the appends and rewrites of other processes wait for it."""
+        if self._locked:
+            yield
+            return
+        if not self.lock_file.exists():
+            ignore_local_files(self.journal_file.parent)
+        with file_lock.locked(self.lock_file):
+            self._locked = True
+            try:
+                yield
+            finally:
+                self._locked = False
+
+    def discard(self, *task_ids: str):
+        """Removes the events of these tasks that were read, once they are part of their task files.
+
+        The journal is read again under the lock, events appended since by other processes are kept,
+        even when identical to a discarded one as their sequence numbers differ.
+        """
+        if not any(self.events.get(task_id) for task_id in task_ids):
+            return
+        with self.locked():
+            discarded = {task_id: self.events.get(task_id, []) for task_id in task_ids}
+            events = self._load()
+            for task_id, task_events in discarded.items():
+                remaining = [event for event in events.pop(task_id, []) if event not in task_events]
+                if remaining:
+                    events[task_id] = remaining
+            self._events = events
+            self._rewrite()
+
+    def clear(self):
+        """Removes every event, those read under the lock are part of the task files."""
+        with self.locked():
+            self.journal_file.unlink(missing_ok=True)
+            self._events = {}
+
+    @classmethod
+    def apply(cls, task: Task, events: List[JournalEvent]) -> Task:
+        for event in events:
+            if event.field == cls.BOARD:
+                task.move_to_board(event.value, event.timestamp)
+            elif event.field == cls.PRIORITY:
+                task.update_priority(TaskPriority.from_name(event.value), event.timestamp)
+            elif event.field == cls.CATEGORY:
+                task.update_category(event.value, event.timestamp)
+        return task
+
+    @staticmethod
+    def apply_to_entry(entry: dict, events: List[JournalEvent]) -> dict:
+        entry = dict(entry)
+        for event in events:
+            entry[event.field] = event.value
+        return entry
+
+    def _rewrite(self):
+        lines = [event.to_string(task_id) for task_id, events in self.events.items() for event in events]
+        if not lines:
+            self.journal_file.unlink(missing_ok=True)
+            return
+        tmp_file = self.journal_file.with_name(f"{self.journal_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text("".join(lines))
+        tmp_file.replace(self.journal_file)
+
+    def _next_seq(self) -> int:
+        try:
+            seq = int(self.seq_file.read_text() or 0) + 1
+        except FileNotFoundError:
+            seq = 1
+        self.seq_file.write_text(str(seq))
+        return seq
+
+    def _load(self) -> Dict[str, List[JournalEvent]]:
+        events = {}
+        try:
+            lines = self.journal_file.read_text().splitlines()
+        except FileNotFoundError:
+            return events
+        for line_number, line in enumerate(lines, start=1):
+            if not line:
+                continue
+            try:
+                fields = line.split("\t")
+                # The events of journals written before the sequence numbers have four fields.
+                task_id, timestamp, field, value, seq = fields + ["0"] if len(fields) == 4 else fields
+                event = JournalEvent(parse_timestamp(timestamp), field, value, int(seq))
+            except ValueError:
+                raise ValueError(f"Invalid journal entry at {self.journal_file}:{line_number}: {line}")
+            events.setdefault(task_id, []).append(event)
+        return events
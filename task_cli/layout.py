@@ -0,0 +1,123 @@
+import os
+from pathlib import Path
+from typing import Callable
+
+from task_cli.task import Task
+
+
+class TaskLayout:
+    """Where the task files are kept in `.tasks/tasks`.
+
+    With a `shard_size` of 0 every task file is in the tasks directory, otherwise task
+    files are kept in a directory per range of `shard_size` ids, eg `tasks/12/TASK-12345.md`
+    with a shard size of 1000. While a workspace is migrated from `previous_shard_size`,
+    task files are looked up in both places.
+    """
+
+    def __init__(self, tasks_dir: Path, shard_size: int = 0, previous_shard_size: int = None):
+        self.tasks_dir = tasks_dir
+        self.shard_size = shard_size
+        self.previous_shard_size = previous_shard_size
+
+    @classmethod
+    def is_task_file(cls, file_name: str) -> bool:
+        return file_name.startswith(Task._prefix) and file_name.endswith(".md")
+
+    def path(self, file_name: str, shard_size: int = None) -> Path:
+        shard_size = self.shard_size if shard_size is None else shard_size
+        if not shard_size:
+            return self.tasks_dir / file_name
+        task_num = Task.task_num_from_id(file_name[:-len(".md")])
+        return self.tasks_dir / str(task_num // shard_size) / file_name
+
+    def task_file(self, task_id) -> Path:
+        return self.path(f"{Task.task_id_from_string(task_id)}.md")
+
+    def find(self, file_name: str) -> Path:
+        # The path of an existing task file, or where it is written when there is none.
+        path = self.path(file_name)
+        if self.previous_shard_size is None or path.exists():
+            return path
+        previous_path = self.path(file_name, self.previous_shard_size)
+        return previous_path if previous_path.exists() else path
+
+    def find_task_file(self, task_id) -> Path:
+        return self.find(f"{Task.task_id_from_string(task_id)}.md")
+
+    def scan(self):
+        """Yields an `os.DirEntry` for every task file, in the tasks directory or in a shard."""
+        shards = []
+        with os.scandir(self.tasks_dir) as entries:
+            for entry in entries:
+                if self.is_task_file(entry.name):
+                    yield entry
+                elif entry.name.isdigit() and entry.is_dir():
+                    shards.append(entry.path)
+        for shard in shards:
+            with os.scandir(shard) as entries:
+                for entry in entries:
+                    if self.is_task_file(entry.name):
+                        yield entry
+
+    def changed_files(self, known: dict, stamp: Callable, candidates: list = None) -> tuple:
+        """The task files that are new or changed since they were cached in `known`, by file name.
+
+        A file changed when its modification time and size differ from `stamp(known[name])`.
+        Only the `candidates` paths are checked when given, eg those git reports as changed,
+        otherwise every task file is. Returns the (name, path, stat) of the changed files,
+        the names in `known` of the removed files and the number of checked files.
+        """
+        changed = []
+        seen = set()
+        missing = set()
+        if candidates is None:
+            files = ((task_file.name, task_file.path, task_file.stat) for task_file in self.scan())
+        else:
+            files = ((path.name, path, path.stat) for path in candidates if self.is_task_file(path.name))
+        for name, path, stat in files:
+            try:
+                stat = stat()
+            except FileNotFoundError:
+                missing.add(name)
+                continue
+            seen.add(name)
+            cached = known.get(name)
+            if cached is None or stamp(cached) != (stat.st_mtime_ns, stat.st_size):
+                changed.append((name, Path(path), stat))
+        if candidates is None:
+            removed = known.keys() - seen
+        else:
+            # A file moved to another shard is missing at its old path only.
+            removed = {name for name in missing - seen if name in known}
+        return changed, removed, len(seen)
+
+    def migrate(self, batch: int = None) -> tuple:
+        """Moves up to `batch` task files to their place in this layout.
+
+        Returns the number of moved files and of files still to move. Files are renamed, so
+        they keep their modification time and the index entries stay valid.
+        """
+        moved = remaining = 0
+        for task_file in list(self.scan()):
+            path = self.path(task_file.name)
+            if Path(task_file.path) == path:
+                continue
+            if batch is not None and moved >= batch:
+                remaining += 1
+                continue
+            if path.parent != self.tasks_dir:
+                path.parent.mkdir(exist_ok=True)
+            os.replace(task_file.path, path)
+            moved += 1
+        if not remaining:
+            self._remove_empty_shards()
+        return moved, remaining
+
+    def _remove_empty_shards(self):
+        with os.scandir(self.tasks_dir) as entries:
+            shards = [entry.path for entry in entries if entry.name.isdigit() and entry.is_dir()]
+        for shard in shards:
+            try:
+                os.rmdir(shard)
+            except OSError:
+                pass
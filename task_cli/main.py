@@ -1,20 +1,88 @@
+import os
+import time
+
 import click
 
-from task_cli.task import Task
+# Commands import what they need, so `task --help`, `task --version` and shell
+# completion don't pay for loading the task modules.
+
+
+def _run(command: str, **args):
+    # Served by `task daemon` when it is running, otherwise directly on the workspace files.
+    # Profiled commands always run here, so that their phases are recorded.
+    from . import trace
+    from .daemon_client import DaemonError, DaemonUnavailable, request
+
+    if not trace.enabled:
+        try:
+            return request(command, **args)
+        except DaemonUnavailable:
+            pass
+        except DaemonError as e:
+            # The daemon may have applied the command already, it is not run a second time here.
+            raise click.ClickException(str(e))
+    with trace.phase("import"):
+        from .commands import QUERIES, execute
+        from .task_manager import TaskManager
+
+    result = execute(TaskManager(), command, args)
+    if command not in QUERIES:
+        _sync_daemon()
+    return result
+
+
+def _sync_daemon():
+    # A running daemon picks up changes made here right away instead of at its next poll.
+    from .daemon_client import DaemonError, DaemonUnavailable, request
+
+    try:
+        request("sync")
+    except DaemonUnavailable:
+        pass
+    except (DaemonError, ValueError) as e:
+        click.echo(f"⚠️ The task daemon did not sync: {e}", err=True)
+
+
+def _report_trace(summary: bool, output: str):
+    from . import trace
 
-from .task_manager import TaskManager
+    trace.disable()
+    if output:
+        trace.write(output)
+    if summary:
+        for line in trace.format_summary():
+            click.echo(line, err=True)
 
 
 @click.group()
 @click.version_option()
-def cli():
-    """Task management system"""
-    pass
+@click.option("--profile", is_flag=True, help="Print the time spent in every phase of the command to stderr")
+@click.option("--profile-output", default=None, type=click.Path(dir_okay=False, writable=True),
+              help="Write the phases as a Chrome trace JSON file")
+@click.pass_context
+def cli(ctx, profile, profile_output):
+    """Task management system
+
+    TASK_CLI_TRACE=1 profiles every command like --profile, TASK_CLI_TRACE=<file> like --profile-output.
+    """
+    trace_variable = os.environ.get("TASK_CLI_TRACE", "")
+    if trace_variable and trace_variable != "0":
+        if trace_variable == "1":
+            profile = True
+        else:
+            profile_output = profile_output or trace_variable
+    if profile or profile_output:
+        from . import trace
+
+        trace.enable()
+        ctx.call_on_close(lambda: _report_trace(profile, profile_output))
 
 
 @cli.command()
 def init():
     """Initialize the task management system"""
+    from .task_manager import TaskManager
+
     manager = TaskManager()
     manager.init_workspace()
 
@@ -25,8 +93,7 @@ def init():
 @click.option("--owner", default="", help="Task owner")
 def create(title, category, owner):
     """Create a new task"""
-    manager = TaskManager()
-    task_id = manager.create_task(title, category, owner)
+    task_id = _run("create", title=title, category=category, owner=owner)
     click.echo(f"✨ Task created: {task_id}")
 
 
@@ -35,9 +102,8 @@ def create(title, category, owner):
 @click.argument("to_board")
 def move(task_id, to_board):
     """Move a task to a different board"""
-    manager = TaskManager()
-    task = manager.move_task(task_id, to_board)
-    click.echo(f"➡️ Moved task {task.task_id} - {task.title} to {task.board.name}")
+    task = _run("move", task_id=task_id, board=to_board)
+    click.echo(f"➡️ Moved task {task['task_id']} - {task['title']} to {task['board']}")
 
 
 @cli.command()
@@ -46,44 +112,287 @@ def move(task_id, to_board):
 @click.option("--category", default=None, help="Category name")
 def update(task_id, priority, category):
     """Update task priority"""
-    manager = TaskManager()
     if priority:
-        manager.update_task_priority(task_id, priority)
+        _run("update_priority", task_id=task_id, priority=priority)
         click.echo(f"🔝 Updated priority for task {task_id}")
     if category:
-        manager.update_task_category(task_id, category)
+        _run("update_category", task_id=task_id, category=category)
         click.echo(f"🏷 Updated category for task {task_id}")
 
 
 @cli.command()
+@click.argument("query", required=False)
 @click.option("--board", default=None, help="Board name")
 @click.option("--priority", default=None, help="Priority level")
 @click.option("--category", default=None, help="Category name")
-def list(board, priority, category):
-    """List tasks based on board, priority, and category"""
-    manager = TaskManager()
-    tasks = manager.list_tasks(board=board, priority=priority, category=category)
-    for task in tasks:
-        click.echo(task)
+@click.option("--owner", default=None, help="Owner name")
+@click.option("--limit", default=None, type=click.IntRange(min=0), help="Maximum number of tasks to list")
+@click.option("--offset", default=0, type=click.IntRange(min=0), help="Number of tasks to skip")
+@click.option("--sort", "order", default=None,
+              help="Comma separated fields to sort by, - for descending, eg board,-priority,created")
+@click.option("--unsorted", is_flag=True, help="Print tasks as they are found, without sorting")
+@click.option("--jobs", default=None, type=click.IntRange(min=1), help="Number of workers used to read changed task files")
+@click.option("--archived", is_flag=True, help="Also list the archived tasks")
+@click.option("--explain", is_flag=True, help="Show how the tasks are found instead of listing them")
+@click.option("--format", "output_format", default="table", type=click.Choice(["table", "json", "ndjson", "csv"]),
+              help="Output format, ndjson and csv are written one task at a time")
+@click.option("--fields", default=None, help="Comma separated fields to output, eg id,title,board,history")
+def list(query, board, priority, category, owner, limit, offset, order, unsorted, jobs, archived, explain,
+         output_format, fields):
+    """List tasks based on board, priority, category and owner, or a QUERY
+
+    eg `task list 'priority<=Medium and owner=alice and created>2024-11-01 and title~"cli"'`
+    """
+    if order and unsorted:
+        raise click.BadParameter("can't be used with --unsorted", param_hint="--sort")
+    if explain:
+        lines = _run("explain", board=board, priority=priority, category=category, owner=owner,
+                     query=query, archived=archived)
+    else:
+        if fields:
+            from .output import parse_fields
+
+            try:
+                fields = parse_fields(fields)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--fields")
+        lines = _run("list", board=board, priority=priority, category=category, owner=owner, query=query,
+                     limit=limit, offset=offset, sort=not unsorted, order=order, jobs=jobs, archived=archived,
+                     output_format=output_format, fields=fields)
+    from . import trace
+
+    with trace.phase("output"):
+        for line in lines:
+            click.echo(line)
+
+
+@cli.command()
+@click.argument("text")
+@click.option("--board", default=None, help="Board name")
+@click.option("--priority", default=None, help="Priority level")
+@click.option("--category", default=None, help="Category name")
+@click.option("--owner", default=None, help="Owner name")
+@click.option("--limit", default=None, type=click.IntRange(min=0), help="Maximum number of tasks to list")
+@click.option("--jobs", default=None, type=click.IntRange(min=1), help="Number of workers used to read changed task files")
+@click.option("--format", "output_format", default="table", type=click.Choice(["table", "json", "ndjson", "csv"]),
+              help="Output format")
+@click.option("--fields", default=None, help="Comma separated fields to output, eg id,title,board")
+def search(text, board, priority, category, owner, limit, jobs, output_format, fields):
+    """Search the title, description and notes of the tasks, best matches first
+
+    Tasks with every word of TEXT are listed, a word ending in * is a prefix, eg `task search "login timeout*"`.
+    """
+    if fields:
+        from .output import parse_fields
+
+        try:
+            fields = parse_fields(fields)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--fields")
+    lines = _run("search", text=text, board=board, priority=priority, category=category, owner=owner,
+                 limit=limit, jobs=jobs, output_format=output_format, fields=fields)
+    from . import trace
+
+    with trace.phase("output"):
+        for line in lines:
+            click.echo(line)
+
+
+@cli.command()
+@click.option("--by", default=None, help="Field to count by, or two comma separated fields for a pivot table, eg board,priority")
+@click.option("--board", default=None, help="Only tasks on this board")
+@click.option("--priority", default=None, help="Only tasks with this priority")
+@click.option("--category", default=None, help="Only tasks in this category")
+@click.option("--owner", default=None, help="Only tasks of this owner")
+@click.option("--format", "output_format", default="table", type=click.Choice(["table", "json"]), help="Output format")
+def summary(by, board, priority, category, owner, output_format):
+    """Count the tasks per board, category, priority and owner, without reading them
+
+    eg `task summary --by board,priority --category Bug` for a pivot table of the bugs.
+    """
+    if by is not None:
+        by = [field.strip() for field in by.split(",") if field.strip()]
+    result = _run("summary", by=by, board=board, category=category, priority=priority, owner=owner)
+    if output_format == "json":
+        import json
+
+        click.echo(json.dumps(result, indent=2))
+        return
+    from .summary import format_table
+
+    for line in format_table(result):
+        click.echo(line)
+
+
+@cli.command()
+@click.argument("operations", type=click.File("r"), default="-")
+@click.option("--format", "fmt", default="ndjson", type=click.Choice(["ndjson", "csv"]), help="Format of the operations")
+def apply(operations, fmt):
+    """Apply a batch of operations read from a file or stdin"""
+    from dataclasses import asdict
+
+    from .batch import parse_operations
+
+    operations = [asdict(operation) for operation in parse_operations(operations, fmt)]
+    start = time.perf_counter()
+    results = _run("apply", operations=operations)
+    elapsed = time.perf_counter() - start
+    failed = 0
+    for result in results:
+        if result["ok"]:
+            click.echo(f"✅ {result['line']}: {result['operation']} - {result['message']}")
+        else:
+            failed += 1
+            click.echo(f"❌ {result['line']}: {result['operation']} - {result['message']}", err=True)
+    rate = len(results) / elapsed if elapsed else 0
+    click.echo(f"📦 Applied {len(results) - failed}/{len(results)} operations in {elapsed:.3f}s ({rate:.0f} ops/s)")
+    if failed:
+        raise SystemExit(1)
 
 
 @cli.command()
 @click.argument("task_id")
 def delete(task_id):
     """Delete a task"""
-    manager = TaskManager()
-    task_title = manager.delete_task(task_id)
+    task_title = _run("delete", task_id=task_id)
     click.echo(f"🗑 Deleted task {task_title}")
 
 
+@cli.command()
+@click.option("--priority", default=None, help="Only tasks with this priority")
+@click.option("--category", default=None, help="Only tasks in this category")
+@click.option("--by", default=None, type=click.Choice(["category", "owner"]), help="Also report per category or owner")
+@click.option("--format", "output_format", default="table", type=click.Choice(["table", "json"]), help="Output format")
+@click.option("--archived", is_flag=True, help="Also count the archived tasks")
+def stats(priority, category, by, output_format, archived):
+    """Report lead time, cycle time, throughput, WIP and cumulative flow from the task history"""
+    import json
+
+    from .flow_stats import flow_stats, format_table
+    from .task_manager import TaskManager
+
+    manager = TaskManager()
+    tasks = manager.iter_tasks(priority=priority, category=category, sort=False, archived=archived)
+    result = flow_stats(tasks, by, manager.storage.workflow)
+    if output_format == "json":
+        click.echo(json.dumps(result, indent=2))
+        return
+    for line in format_table(result, by):
+        click.echo(line)
+
+
+@cli.command()
+@click.option("--before", default=None, type=click.DateTime(formats=["%Y-%m-%d"]), help="Only tasks finished before this date")
+def archive(before):
+    """Pack the tasks on the done board into the archive"""
+    task_ids = _run("archive", before=before.strftime("%Y-%m-%d") if before else None)
+    click.echo(f"🗄️ Archived {len(task_ids)} tasks")
+
+
+@cli.command()
+@click.argument("task_id")
+def restore(task_id):
+    """Restore an archived task to its task file"""
+    task_id_with_title = _run("restore", task_id=task_id)
+    click.echo(f"📤 Restored task {task_id_with_title}")
+
+
 @cli.command()
 @click.argument("task_id")
 @click.option("--editor", default="code", help="Editor to use")
 def edit(task_id, editor):
     """Edit a task"""
-    manager = TaskManager()
-    task_path = manager.task_location(task_id)
+    task_path = _run("edit", task_id=task_id)
     click.edit(filename=task_path, editor=editor)
+    _run("sync")
+
+
+@cli.group()
+def daemon():
+    """Serve commands from a resident process that keeps the workspace in memory"""
+    pass
+
+
+@daemon.command()
+@click.option("--poll-interval", default=1.0, type=click.FloatRange(min=0.05), help="Seconds between checks for changed task files")
+def start(poll_interval):
+    """Run the task daemon in the foreground"""
+    from .daemon import TaskDaemon
+
+    task_daemon = TaskDaemon(poll_interval=poll_interval)
+    click.echo(f"👂 Task daemon listening on {task_daemon.socket_path}")
+    try:
+        task_daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+@daemon.command()
+def stop():
+    """Stop the running task daemon"""
+    from .daemon_client import DaemonError, DaemonUnavailable, request
+
+    try:
+        request("shutdown")
+    except (DaemonError, DaemonUnavailable) as e:
+        raise click.ClickException(str(e))
+    click.echo("🛑 Task daemon stopped")
+
+
+@daemon.command()
+def status():
+    """Show whether a task daemon is running"""
+    from .daemon_client import DaemonError, DaemonUnavailable, request
+
+    try:
+        pid = request("ping")
+    except (DaemonError, DaemonUnavailable) as e:
+        raise click.ClickException(str(e))
+    click.echo(f"👂 Task daemon is running with pid {pid}")
+
+
+@cli.command()
+def fold():
+    """Fold the history journal back into the task files"""
+    folded = _run("fold")
+    click.echo(f"📒 Folded journal into {folded} tasks")
+
+
+@cli.command()
+@click.option("--jobs", default=None, type=click.IntRange(min=1), help="Number of workers reading changed task files")
+def sync(jobs):
+    """Pick up task files changed outside of task, eg by git"""
+    tasks_dir = _run("sync", jobs=jobs)
+    click.echo(f"🔄 Synced {tasks_dir}")
+
+
+@cli.command("install-hooks")
+def install_hooks():
+    """Run task sync from the git post-checkout, post-merge and post-rewrite hooks"""
+    from pathlib import Path
+
+    from .git_changes import install_hooks
+
+    hooks, skipped = install_hooks(Path("."))
+    if hooks:
+        click.echo(f"🪝 Installed the {', '.join(hooks)} hooks")
+    elif not skipped:
+        click.echo("🪝 The hooks are already installed")
+    for hook, reason in skipped.items():
+        click.echo(f"⚠️ Skipped the {hook} hook, it is not a shell script ({reason}), "
+                   f"run task-sync of the hooks directory from it to refresh the task caches", err=True)
+
+
+@cli.command("migrate-layout")
+@click.option("--shard-size", default=1000, type=click.IntRange(min=0), help="Task ids per shard directory, 0 for a flat tasks directory")
+@click.option("--batch", default=None, type=click.IntRange(min=1), help="Move at most this many task files, run again to resume")
+def migrate_layout(shard_size, batch):
+    """Move the task files to a sharded or flat layout"""
+    moved, remaining = _run("migrate_layout", shard_size=shard_size, batch=batch)
+    if remaining:
+        click.echo(f"🗂️ Moved {moved} task files, {remaining} left, run again to resume")
+    else:
+        click.echo(f"🗂️ Moved {moved} task files, the migration is complete")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+
+from task_cli.task import Task
+
+# Output formats of `task list`. Lines are produced one task at a time, so ndjson and csv
+# are written while the tasks are still being loaded. Only the requested fields are
+# read from the tasks, the body of a task is not loaded unless one of its fields is.
+
+FORMATS = ("table", "json", "ndjson", "csv")
+
+_timestamp_format = "%Y-%m-%d %H:%M:%S"
+
+_getters = {
+    "id": lambda task: task.task_id,
+    "title": lambda task: task.title,
+    "created": lambda task: task.created.strftime(_timestamp_format),
+    "priority": lambda task: task.priority.name,
+    "category": lambda task: task.category,
+    "owner": lambda task: task.owner or "",
+    "board": lambda task: task.board.name,
+    "description": lambda task: task.description,
+    "notes": lambda task: task.notes,
+    "history": lambda task: [{"timestamp": entry.timestamp.strftime(_timestamp_format), "action": entry.action}
+                             for entry in task.history],
+}
+
+FIELDS = tuple(_getters)
+# The front matter fields, listed without loading any task body.
+DEFAULT_FIELDS = FIELDS[:7]
+
+
+def parse_fields(fields: str) -> list:
+    """The fields of a comma separated list, eg `id,title,board`."""
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    for name in names:
+        if name not in _getters:
+            raise ValueError(f"Invalid field: {name}, allowed fields: {FIELDS}")
+    if not names:
+        raise ValueError(f"No fields given, allowed fields: {FIELDS}")
+    return names
+
+
+def task_record(task: Task, fields) -> dict:
+    return {field: _getters[field](task) for field in fields}
+
+
+def format_tasks(tasks, output_format: str = "table", fields=None):
+    """Yields the lines of the tasks in `output_format`, one or more lines per task."""
+    if output_format not in FORMATS:
+        raise ValueError(f"Invalid output format: {output_format}, allowed formats: {FORMATS}")
+    if output_format == "table" and not fields:
+        return (str(task) for task in tasks)
+    fields = fields or DEFAULT_FIELDS
+    records = (task_record(task, fields) for task in tasks)
+    if output_format == "ndjson":
+        return (json.dumps(record, separators=(",", ":")) for record in records)
+    if output_format == "json":
+        return _json_lines(records)
+    if output_format == "csv":
+        return _csv_lines(records, fields)
+    return _table_lines(records, fields)
+
+
+def _json_lines(records):
+    # A JSON array with one task per line, each line is written once the next task is known.
+    yield "["
+    previous = None
+    for record in records:
+        if previous is not None:
+            yield f"  {previous},"
+        previous = json.dumps(record, separators=(",", ":"))
+    if previous is not None:
+        yield f"  {previous}"
+    yield "]"
+
+
+def _csv_lines(records, fields):
+    # Values with line breaks are quoted, the writer has to know its line terminator for that.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(fields)
+    yield _take(buffer)
+    for record in records:
+        writer.writerow([_cell(record[field]) for field in fields])
+        yield _take(buffer)
+
+
+def _table_lines(records, fields):
+    # Columns are as wide as their longest value, so the whole listing is kept.
+    rows = [[_cell(record[field]).replace("\n", " ") for field in fields] for record in records]
+    widths = [max([len(field)] + [len(row[i]) for row in rows]) for i, field in enumerate(fields)]
+    for row in [[field.capitalize() for field in fields], *rows]:
+        yield "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+
+
+def _cell(value) -> str:
+    if isinstance(value, list):
+        return "\n".join(f"{entry['timestamp']} - {entry['action']}" for entry in value)
+    return value
+
+
+def _take(buffer: io.StringIO) -> str:
+    line = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return line[:-1]
@@ -0,0 +1,389 @@
+import json
+import re
+from datetime import datetime, timedelta
+
+from task_cli.task import Task
+from task_cli.task_priority import PriorityLevel, TaskPriority
+from task_cli.workflow import Workflow
+
+# Filters on the task fields, eg `priority<=Medium and owner=alice and title~"cli"`, with
+# `and`, `or`, `not` and parentheses. Conditions are evaluated on index entries, the
+# front matter of a task, so no task body is ever read to filter tasks.
+
+FIELDS = ("id", "title", "created", "priority", "category", "owner", "board")
+OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "~")
+
+_token = re.compile(r'\s*(?:(<=|>=|!=|=|<|>|~)|([()])|"((?:[^"\\]|\\.)*)"|([^\s()"=!<>~]+))')
+_keywords = ("and", "or", "not")
+_timestamp_format = "%Y-%m-%d %H:%M:%S"
+
+# Priorities from the least to the most important, `priority<=Medium` is Low and Medium.
+_priorities = [level.display_name for level in sorted(PriorityLevel, key=lambda level: -level.value)]
+
+
+class Condition:
+    """`field op value`, with the value converted to what the index entries hold.
+
+    Boards and categories are checked against `workflow`.
+    """
+
+    def __init__(self, field: str, op: str, value: str, workflow: Workflow = Task.DEFAULT_WORKFLOW):
+        if field not in FIELDS:
+            raise ValueError(f"Invalid query field: {field}, allowed fields: {FIELDS}")
+        self.field = field
+        self.op = op
+        self.text = value
+        self.workflow = workflow
+        # Board, category and priority conditions are the set of values they accept.
+        self.values = None
+        if field in ("board", "category", "priority"):
+            self.values = frozenset(self._accepted_values(field, op, value))
+        elif field == "created":
+            self._check_operator(OPERATORS[:-1])
+            self.start, self.end = _interval(value)
+        elif field == "id":
+            self._check_operator(OPERATORS[:-1])
+            try:
+                self.value = int(value.removeprefix(Task._prefix))
+            except ValueError:
+                raise ValueError(f"Invalid task id: {value}")
+        else:
+            self._check_operator(("=", "!=", "~"))
+            self.value = value.lower() if op == "~" else value
+            if field == "owner" and op == "=":
+                self.values = frozenset((value,))
+
+    def matches(self, entry: dict) -> bool:
+        value = entry[self.field]
+        if self.values is not None:
+            return (value or "") in self.values
+        if self.field == "created":
+            if self.op in ("=", "!="):
+                return (self.start <= value < self.end) == (self.op == "=")
+            if self.op in ("<", "<="):
+                return value < (self.start if self.op == "<" else self.end)
+            return value >= (self.end if self.op == ">" else self.start)
+        if self.field == "id":
+            return _compare(value, self.op, self.value)
+        value = value or ""
+        if self.op == "~":
+            return self.value in value.lower()
+        return (value == self.value) == (self.op == "=")
+
+    def sql(self) -> tuple:
+        if self.field == "owner" and self.op == "=":
+            return ("owner = ?", [self.value]) if self.value else ("COALESCE(owner, '') = ''", [])
+        if self.values is not None:
+            if not self.values:
+                return "0", []
+            return f"{self.field} IN ({', '.join('?' * len(self.values))})", sorted(self.values)
+        if self.field == "created":
+            if self.op in ("=", "!="):
+                clause = "created >= ? AND created < ?"
+                return (clause if self.op == "=" else f"NOT ({clause})"), [self.start, self.end]
+            return {"<": ("created < ?", [self.start]), "<=": ("created < ?", [self.end]),
+                    ">": ("created >= ?", [self.end]), ">=": ("created >= ?", [self.start])}[self.op]
+        if self.field == "id":
+            return f"id {self.op} ?", [self.value]
+        column = f"COALESCE({self.field}, '')"
+        if self.op == "~":
+            # py_lower is str.lower, SQLite's lower only folds ASCII letters.
+            return f"instr(py_lower({column}), ?) > 0", [self.value]
+        return f"{column} {self.op} ?", [self.value]
+
+    def __str__(self):
+        if self.values is not None and self.field != "owner":
+            return f"{self.field} in ({', '.join(_ordered(self.field, self.values, self.workflow))})"
+        if self.field == "created":
+            return f"{self.field} {self.op} {self.text}"
+        return f"{self.field} {self.op} {_quote(self.text)}"
+
+    def _accepted_values(self, field: str, op: str, value: str) -> list:
+        if field == "board":
+            self._check_operator(("=", "!="))
+            value = self.workflow.board(value).name
+        elif field == "category":
+            self._check_operator(("=", "!="))
+            value = self.workflow.category(value)
+        else:
+            self._check_operator(OPERATORS[:-1])
+            value = TaskPriority.from_name(value).name
+        names = _values(field, self.workflow)
+        rank = names.index(value)
+        return [name for i, name in enumerate(names) if _compare(i, op, rank)]
+
+    def _check_operator(self, allowed: tuple):
+        if self.op not in allowed:
+            raise ValueError(f"Invalid operator {self.op} for {self.field}, allowed operators: {allowed}")
+
+
+class TaskIds:
+    """The tasks with one of the given numbers, eg found by `task search`."""
+
+    def __init__(self, task_nums):
+        self.task_nums = frozenset(task_nums)
+
+    def matches(self, entry: dict) -> bool:
+        return entry["id"] in self.task_nums
+
+    def sql(self) -> tuple:
+        # A single parameter, however many tasks there are.
+        return "id IN (SELECT value FROM json_each(?))", [json.dumps(sorted(self.task_nums))]
+
+    def __str__(self):
+        return f"id in ({len(self.task_nums)} tasks)"
+
+
+class Not:
+    def __init__(self, operand):
+        self.operand = operand
+
+    def matches(self, entry: dict) -> bool:
+        return not self.operand.matches(entry)
+
+    def sql(self) -> tuple:
+        clause, parameters = self.operand.sql()
+        return f"NOT ({clause})", parameters
+
+    def __str__(self):
+        return f"not ({self.operand})"
+
+
+class BooleanOperation:
+    def __init__(self, keyword: str, operands: list):
+        self.keyword = keyword
+        self.operands = operands
+
+    def matches(self, entry: dict) -> bool:
+        if self.keyword == "and":
+            return all(operand.matches(entry) for operand in self.operands)
+        return any(operand.matches(entry) for operand in self.operands)
+
+    def sql(self) -> tuple:
+        clauses = []
+        parameters = []
+        for operand in self.operands:
+            clause, operand_parameters = operand.sql()
+            clauses.append(f"({clause})")
+            parameters.extend(operand_parameters)
+        return f" {self.keyword.upper()} ".join(clauses), parameters
+
+    def __str__(self):
+        return f" {self.keyword} ".join(
+            f"({operand})" if isinstance(operand, BooleanOperation) else str(operand) for operand in self.operands)
+
+
+class TaskQuery:
+    """A filter compiled once into a plan.
+
+    The conditions that must all hold and that a posting list of the index answers, on
+    board, category, priority or `owner=`, become `lookups`. The other conditions are
+    the `residual`, checked on the index entries of the tasks found by the lookups.
+    Boards and categories are those of `workflow`.
+    """
+
+    def __init__(self, expression=None, workflow: Workflow = Task.DEFAULT_WORKFLOW):
+        self.expression = expression
+        self.workflow = workflow
+        conjuncts = _conjuncts(expression)
+        self.lookups = {}
+        residual = []
+        for condition in conjuncts:
+            if isinstance(condition, Condition) and condition.values is not None:
+                values = self.lookups.get(condition.field, condition.values)
+                self.lookups[condition.field] = values & condition.values
+            else:
+                residual.append(condition)
+        self.residual = _conjunction(residual)
+
+    @classmethod
+    def parse(cls, text: str, workflow: Workflow = Task.DEFAULT_WORKFLOW):
+        if not text or not text.strip():
+            return cls(workflow=workflow)
+        return cls(_Parser(text, workflow).parse(), workflow)
+
+    @classmethod
+    def from_filters(cls, workflow: Workflow = Task.DEFAULT_WORKFLOW, **values):
+        """The query for the exact `--board`, `--category`, `--priority` and `--owner` filters."""
+        return cls(_conjunction([Condition(field, "=", value, workflow) for field, value in values.items() if value]),
+                   workflow)
+
+    @classmethod
+    def from_ids(cls, task_nums, workflow: Workflow = Task.DEFAULT_WORKFLOW):
+        return cls(TaskIds(task_nums), workflow)
+
+    def and_(self, other):
+        return TaskQuery(_conjunction(_conjuncts(self.expression) + _conjuncts(other.expression)), self.workflow)
+
+    def matches(self, entry: dict) -> bool:
+        return self.expression is None or self.expression.matches(entry)
+
+    def residual_matches(self, entry: dict) -> bool:
+        return self.residual is None or self.residual.matches(entry)
+
+    def accepts(self, field: str, value: str) -> bool:
+        # Whether the lookups leave any task with this value, eg archived tasks are all Done.
+        return field not in self.lookups or value in self.lookups[field]
+
+    def sql(self) -> tuple:
+        if self.expression is None:
+            return "", []
+        return self.expression.sql()
+
+    def explain(self) -> list:
+        lookups = " and ".join(
+            f"{field} = {_quote(next(iter(values)))}" if field == "owner"
+            else f"{field} in ({', '.join(_ordered(field, values, self.workflow))})"
+            for field, values in self.lookups.items())
+        return [
+            f"Filter: {self.expression or 'none'}",
+            f"Index lookup: {lookups or 'none, every task is a candidate'}",
+            f"Header filter: {self.residual or 'none'}",
+        ]
+
+    def __str__(self):
+        return str(self.expression or "")
+
+
+class _Parser:
+    def __init__(self, text: str, workflow: Workflow):
+        self.text = text
+        self.workflow = workflow
+        self.tokens = self._tokenize(text)
+        self.position = 0
+
+    def parse(self):
+        expression = self._or()
+        if self.position < len(self.tokens):
+            raise self._error(f"unexpected {self.tokens[self.position][1]!r}")
+        return expression
+
+    def _or(self):
+        operands = [self._and()]
+        while self._accept_keyword("or"):
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else BooleanOperation("or", operands)
+
+    def _and(self):
+        operands = [self._not()]
+        while self._accept_keyword("and"):
+            operands.append(self._not())
+        return operands[0] if len(operands) == 1 else BooleanOperation("and", operands)
+
+    def _not(self):
+        if self._accept_keyword("not"):
+            return Not(self._not())
+        return self._atom()
+
+    def _atom(self):
+        kind, value = self._next("a condition")
+        if kind == "paren" and value == "(":
+            expression = self._or()
+            kind, value = self._next("')'")
+            if (kind, value) != ("paren", ")"):
+                raise self._error(f"expected ')' instead of {value!r}")
+            return expression
+        if kind != "word" or value.lower() in _keywords:
+            raise self._error(f"expected a field instead of {value!r}")
+        field = value.lower()
+        kind, op = self._next("an operator")
+        if kind != "op":
+            raise self._error(f"expected an operator after {field} instead of {op!r}")
+        kind, operand = self._next("a value")
+        if kind not in ("word", "string"):
+            raise self._error(f"expected a value after {field} {op} instead of {operand!r}")
+        return Condition(field, op, operand, self.workflow)
+
+    def _accept_keyword(self, keyword: str) -> bool:
+        if self.position < len(self.tokens) and self.tokens[self.position][0] == "word" \
+                and self.tokens[self.position][1].lower() == keyword:
+            self.position += 1
+            return True
+        return False
+
+    def _next(self, expected: str) -> tuple:
+        if self.position >= len(self.tokens):
+            raise self._error(f"expected {expected} at the end")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid query {self.text!r}: {message}")
+
+    def _tokenize(self, text: str) -> list:
+        tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = _token.match(text, position)
+            if match is None or match.end() == position:
+                raise self._error(f"unexpected {text[position:].strip()[:1]!r}")
+            op, paren, string, word = match.groups()
+            if op is not None:
+                tokens.append(("op", op))
+            elif paren is not None:
+                tokens.append(("paren", paren))
+            elif string is not None:
+                tokens.append(("string", re.sub(r"\\(.)", r"\1", string)))
+            else:
+                tokens.append(("word", word))
+            position = match.end()
+        return tokens
+
+
+def _conjuncts(expression) -> list:
+    if expression is None:
+        return []
+    if isinstance(expression, BooleanOperation) and expression.keyword == "and":
+        return [conjunct for operand in expression.operands for conjunct in _conjuncts(operand)]
+    return [expression]
+
+
+def _conjunction(conditions: list):
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else BooleanOperation("and", conditions)
+
+
+def _values(field: str, workflow: Workflow) -> list:
+    if field == "board":
+        return [board.name for board in workflow.boards]
+    if field == "category":
+        return workflow.categories
+    return _priorities
+
+
+def _ordered(field: str, values, workflow: Workflow) -> list:
+    return [value for value in _values(field, workflow) if value in values]
+
+
+def _interval(value: str) -> tuple:
+    # A date stands for the whole day, a timestamp for its second, as index entry strings.
+    for value_format, length in ((_timestamp_format, timedelta(seconds=1)), ("%Y-%m-%d", timedelta(days=1))):
+        try:
+            start = datetime.strptime(value, value_format)
+        except ValueError:
+            continue
+        return start.strftime(_timestamp_format), (start + length).strftime(_timestamp_format)
+    raise ValueError(f"Invalid date: {value}, use YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
+
+
+def _compare(left, op: str, right) -> bool:
+    if op == "=":
+        return left == right
+    if op == "!=":
+        return left != right
+    if op == "<":
+        return left < right
+    if op == "<=":
+        return left <= right
+    if op == ">":
+        return left > right
+    return left >= right
+
+
+def _quote(value: str) -> str:
+    if value and re.fullmatch(r'[^\s()"=!<>~]+', value) and value.lower() not in _keywords:
+        return value
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
@@ -0,0 +1,205 @@
+import json
+import math
+import os
+import re
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+
+from task_cli import task_loader, trace
+from task_cli.git_changes import GitChanges
+from task_cli.gitignore import ignore_local_files
+from task_cli.layout import TaskLayout
+from task_cli.task import Task
+from task_cli.task_parser import parse_body, parse_front_matter
+
+_word = re.compile(r"\w+")
+
+# Words of the title count as this many words of the description or notes.
+_title_weight = 3
+
+# BM25 parameters, how fast repeated words saturate and how much long tasks are penalized.
+_k1 = 1.2
+_b = 0.75
+
+
+def tokenize(text: str) -> list:
+    return _word.findall(text.lower())
+
+
+class SearchIndex:
+    """An inverted index of the words in the title, description and notes of every task file.
+
+    Every word has a posting list of the task numbers it occurs in with its count, persisted
+    in `.tasks/search` as a string of numbers and decoded only for the words of a search or
+    of a changed task. Like `TaskIndex`, only the task files whose modification time or size
+    changed are read again by `refresh`, and with `git` only those git reports as changed
+    are checked.
+    """
+
+    _version = 1
+
+    def __init__(self, index_file: Path, layout: TaskLayout, git: GitChanges = None):
+        self.index_file = index_file
+        self.layout = layout
+        self.git = git
+        self._files = None
+        self._postings = None
+        self._git_state = None
+        self._vocabulary = None
+        self._total_length = 0
+        self._dirty = False
+
+    @property
+    def files(self) -> dict:
+        if self._files is None:
+            with trace.phase("search.load"):
+                self._files, self._postings = self._load()
+                self._total_length = sum(length for _, _, length, _ in self._files.values())
+        return self._files
+
+    def refresh(self, jobs: int = None):
+        files = self.files
+        candidates, git_state = self.git.changes(self._git_state, len(files)) if self.git else (None, None)
+        with trace.phase("search.scan"):
+            changed, removed, _ = self.layout.changed_files(files, lambda file: (file[0], file[1]), candidates)
+        trace.count("search_files_read", len(changed))
+        with trace.phase("search.read"):
+            paths = [path for _, path, _ in changed]
+            for (file_name, _, stat), terms in zip(changed, task_loader.load(paths, read_terms, jobs)):
+                self._put(file_name, terms, stat)
+        for file_name in removed:
+            self._pop(file_name)
+        if git_state != self._git_state:
+            self._git_state = git_state
+            self._dirty = True
+
+    def search(self, text: str) -> dict:
+        """The score of every task with all the words of `text`, a word ending in `*` is a prefix.
+
+        Tasks are scored with BM25 over the title, description and notes, the title words
+        counting more. A prefix scores as the best of the words it matches in a task.
+        """
+        words = self.parse(text)
+        files = self.files
+        if not files:
+            return {}
+        average_length = self._total_length / len(files)
+        scores = []
+        for word, prefix in words:
+            word_scores = {}
+            for term in self._expand(word) if prefix else [word]:
+                posting = self._posting(term)
+                idf = math.log(1 + (len(files) - len(posting) + 0.5) / (len(posting) + 0.5))
+                for task_num, (count, length) in posting.items():
+                    score = idf * count * (_k1 + 1) / (count + _k1 * (1 - _b + _b * length / average_length))
+                    if score > word_scores.get(task_num, 0):
+                        word_scores[task_num] = score
+            scores.append(word_scores)
+        # The tasks with every word, starting from the rarest one.
+        scores.sort(key=len)
+        return {task_num: sum(word_scores[task_num] for word_scores in scores)
+                for task_num in scores[0] if all(task_num in word_scores for word_scores in scores[1:])}
+
+    def save(self):
+        if not self._dirty:
+            return
+        if not self.index_file.exists():
+            ignore_local_files(self.index_file.parent)
+        with trace.phase("search.save"):
+            postings = {term: ",".join(f"{task_num},{count}" for task_num, (count, _) in posting.items())
+                        if isinstance(posting, dict) else posting
+                        for term, posting in self._postings.items()}
+            tmp_file = self.index_file.with_name(f"{self.index_file.name}.{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps({"version": self._version, "files": self.files, "postings": postings,
+                                            "git": self._git_state}, separators=(",", ":")))
+            os.replace(tmp_file, self.index_file)
+        self._dirty = False
+
+    @staticmethod
+    def parse(text: str) -> list:
+        """The words of a search as (word, prefix) pairs, eg `cli fla*` is cli and the prefix fla."""
+        words = []
+        for part in text.split():
+            tokens = tokenize(part)
+            words.extend((token, False) for token in tokens[:-1])
+            if tokens:
+                words.append((tokens[-1], part.endswith("*")))
+        if not words:
+            raise ValueError(f"Invalid search {text!r}: no words to search for")
+        return words
+
+    def _expand(self, prefix: str) -> list:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        terms = []
+        for i in range(bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            if not self._vocabulary[i].startswith(prefix):
+                break
+            terms.append(self._vocabulary[i])
+        return terms
+
+    def _posting(self, term: str) -> dict:
+        # Task numbers with the count of the term and the length of the task, in words.
+        posting = self._postings.get(term)
+        if posting is None:
+            return {}
+        if not isinstance(posting, dict):
+            # "task_num,count,task_num,count,..."
+            files = self.files
+            numbers = [int(number) for number in posting.split(",")]
+            posting = self._postings[term] = {
+                task_num: (count, files[f"{Task._prefix}{task_num}.md"][2])
+                for task_num, count in zip(numbers[::2], numbers[1::2])}
+        return posting
+
+    def _put(self, file_name: str, terms: dict, stat: os.stat_result):
+        self._pop(file_name)
+        task_num = Task.task_num_from_id(file_name[:-len(".md")])
+        length = sum(terms.values())
+        for term, count in terms.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._vocabulary = None
+            self._posting(term)[task_num] = (count, length)
+        # The words of the file are kept to remove it from their posting lists.
+        self.files[file_name] = [stat.st_mtime_ns, stat.st_size, length, " ".join(terms)]
+        self._total_length += length
+        self._dirty = True
+
+    def _pop(self, file_name: str):
+        file = self.files.get(file_name)
+        if file is None:
+            return
+        task_num = Task.task_num_from_id(file_name[:-len(".md")])
+        _, _, length, terms = file
+        for term in terms.split():
+            posting = self._posting(term)
+            posting.pop(task_num, None)
+            if not posting:
+                del self._postings[term]
+                self._vocabulary = None
+        del self.files[file_name]
+        self._total_length -= length
+        self._dirty = True
+
+    def _load(self) -> tuple:
+        try:
+            data = json.loads(self.index_file.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}, {}
+        if not isinstance(data, dict) or data.get("version") != self._version:
+            return {}, {}
+        self._git_state = data.get("git")
+        return data.get("files", {}), data.get("postings", {})
+
+
+def read_terms(task_file: Path) -> dict:
+    """The number of times every word occurs in a task file, title words counting `_title_weight` times."""
+    metadata, body = parse_front_matter(task_file.read_text())
+    description, notes, _ = parse_body(body)
+    terms = Counter(tokenize(description))
+    terms.update(tokenize(notes))
+    for term in tokenize(str(metadata["title"])):
+        terms[term] += _title_weight
+    return dict(terms)
@@ -0,0 +1,103 @@
+from task_cli.query import FIELDS
+from task_cli.task_priority import PriorityLevel
+from task_cli.workflow import Workflow
+
+# Priorities are ordered from Low to High, like in queries.
+_priority_ranks = {level.display_name: len(PriorityLevel) - 1 - level.value for level in PriorityLevel}
+
+# "2024-11-01 09:30:00" -> 20241101093000
+_timestamp_digits = str.maketrans("", "", "- :")
+
+
+class SortOrder:
+    """The fields tasks are listed by, eg `board,-priority,id`, a `-` sorts a field in descending order.
+
+    Boards are in the listing order of the workflow, categories in the order of its config and
+    priorities from Low to High. The task id is always the last key, so no two tasks tie.
+    `key` turns an index entry into a tuple of ints and strings, computed once per task.
+    """
+
+    def __init__(self, keys: list, workflow: Workflow):
+        self.keys = keys
+        self.workflow = workflow
+        self.key = self._compile()
+
+    @classmethod
+    def parse(cls, spec: str, workflow: Workflow):
+        keys = []
+        for part in spec.split(","):
+            part = part.strip()
+            field = part.lstrip("-").strip().lower()
+            if field not in FIELDS:
+                raise ValueError(f"Invalid sort field: {part}, allowed fields: {FIELDS}")
+            if field in (key for key, _ in keys):
+                raise ValueError(f"Duplicate sort field: {field}")
+            keys.append((field, part.startswith("-")))
+        if "id" not in (field for field, _ in keys):
+            keys.append(("id", False))
+        return cls(keys, workflow)
+
+    @property
+    def signature(self) -> list:
+        """What the order depends on, a persisted order is only valid for the same signature."""
+        return [str(self), list(self.workflow.sort_order), self.workflow.categories]
+
+    def sql(self) -> tuple:
+        """The ORDER BY expressions of the tasks table and their parameters."""
+        expressions = []
+        parameters = []
+        for field, descending in self.keys:
+            ranks = self._ranks(field)
+            if ranks is not None:
+                cases = " ".join(f"WHEN ? THEN {rank}" for rank in ranks.values())
+                expression = f"CASE {field} {cases} ELSE {len(ranks)} END"
+                parameters.extend(ranks)
+            elif field in ("title", "owner"):
+                expression = f"coalesce({field}, '') COLLATE NOCASE"
+            else:
+                expression = field
+            expressions.append(f"{expression} DESC" if descending else expression)
+        return ", ".join(expressions), parameters
+
+    def _compile(self):
+        getters = [self._getter(field, descending) for field, descending in self.keys]
+        if len(getters) == 2:
+            first, second = getters
+            return lambda entry: (first(entry), second(entry))
+        return lambda entry: tuple([getter(entry) for getter in getters])
+
+    def _getter(self, field: str, descending: bool):
+        sign = -1 if descending else 1
+        ranks = self._ranks(field)
+        if ranks is not None:
+            last = len(ranks)
+            return lambda entry: sign * ranks.get(entry[field], last)
+        if field == "id":
+            return lambda entry: sign * entry["id"]
+        if field == "created":
+            return lambda entry: sign * int(entry["created"].translate(_timestamp_digits))
+        if descending:
+            return lambda entry: _descending_text((entry[field] or "").casefold())
+        return lambda entry: (entry[field] or "").casefold()
+
+    def _ranks(self, field: str):
+        if field == "board":
+            return self.workflow.sort_order
+        if field == "category":
+            return {category: rank for rank, category in enumerate(self.workflow.categories)}
+        if field == "priority":
+            return _priority_ranks
+        return None
+
+    def __eq__(self, other):
+        if isinstance(other, SortOrder):
+            return self.keys == other.keys and self.workflow is other.workflow
+        return NotImplemented
+
+    def __str__(self):
+        return ",".join(f"-{field}" if descending else field for field, descending in self.keys)
+
+
+def _descending_text(text: str) -> tuple:
+    # Negated code points sort in reverse, the end marker puts "ab" after "abc".
+    return tuple([-ord(char) for char in text]) + (1,)
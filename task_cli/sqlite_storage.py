@@ -0,0 +1,321 @@
+import json
+import sqlite3
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from task_cli import task_loader, trace
+from task_cli.config import WorkspaceConfig
+from task_cli.gitignore import ignore_local_files
+from task_cli.query import TaskQuery
+from task_cli.sort_order import SortOrder
+from task_cli.storage import TaskStorage
+from task_cli.task import Task, TaskHistory
+from task_cli.task_parser import parse_timestamp
+from task_cli.task_priority import TaskPriority
+from task_cli.workflow import Workflow
+
+_schema = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    created TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    category TEXT NOT NULL,
+    owner TEXT,
+    board TEXT NOT NULL,
+    description TEXT NOT NULL,
+    notes TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_board ON tasks (board);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority);
+CREATE INDEX IF NOT EXISTS tasks_category ON tasks (category);
+CREATE INDEX IF NOT EXISTS tasks_owner ON tasks (owner);
+CREATE TABLE IF NOT EXISTS history (
+    task_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    action TEXT NOT NULL,
+    PRIMARY KEY (task_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS task_counts (
+    board TEXT NOT NULL,
+    category TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (board, category, priority, owner)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS tasks_count_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO task_counts VALUES (new.board, new.category, new.priority, coalesce(new.owner, ''), 1)
+        ON CONFLICT DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_count_delete AFTER DELETE ON tasks BEGIN
+    UPDATE task_counts SET count = count - 1 WHERE board = old.board AND category = old.category
+        AND priority = old.priority AND owner = coalesce(old.owner, '');
+    DELETE FROM task_counts WHERE count = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_count_update AFTER UPDATE OF board, category, priority, owner ON tasks BEGIN
+    UPDATE task_counts SET count = count - 1 WHERE board = old.board AND category = old.category
+        AND priority = old.priority AND owner = coalesce(old.owner, '');
+    INSERT INTO task_counts VALUES (new.board, new.category, new.priority, coalesce(new.owner, ''), 1)
+        ON CONFLICT DO UPDATE SET count = count + 1;
+    DELETE FROM task_counts WHERE count = 0;
+END;
+"""
+
+# Rebuilds the counts of a database created before they were kept up to date by the triggers.
+_count_tasks = """
+BEGIN;
+DELETE FROM task_counts;
+INSERT INTO task_counts
+    SELECT board, category, priority, coalesce(owner, ''), count(*) FROM tasks GROUP BY 1, 2, 3, 4;
+INSERT OR REPLACE INTO state (key, value) VALUES ('counts', '1');
+COMMIT;
+"""
+
+_timestamp_format = "%Y-%m-%d %H:%M:%S"
+
+_columns = "id, title, created, priority, category, owner, board"
+_upsert_columns = ", ".join(f"{column} = excluded.{column}" for column in
+                            ("title", "created", "priority", "category", "owner", "board", "description", "notes"))
+
+
+class SqliteStorage(TaskStorage):
+    """Tasks and their history rows in `.tasks/tasks.db`.
+
+    Every change is also written to the task's Markdown file in `.tasks/tasks`, so the
+    workspace can still be tracked by git. Task files changed outside of the workspace,
+    eg by `git pull`, are imported by `refresh`, which queries run first like the files engine,
+    and a task file changed since its import is imported again before the task is read.
+    """
+
+    def __init__(self, workspace: Path, config: WorkspaceConfig):
+        super().__init__(workspace, config)
+        self.db_file = workspace / "tasks.db"
+        self._connection = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if not self.workspace.exists():
+                raise ValueError(f"No task workspace in {self.workspace.parent}, run `task init` first")
+            new = not self.db_file.exists()
+            if new:
+                ignore_local_files(self.workspace)
+            # The daemon shares the connection between its threads under its own lock.
+            self._connection = sqlite3.connect(self.db_file, timeout=5, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            # Queries fold case like the files engine, eg for `title~émile`.
+            self._connection.create_function("py_lower", 1, str.lower, deterministic=True)
+            self._connection.executescript(_schema)
+            if self._connection.execute("SELECT value FROM state WHERE key = 'counts'").fetchone() is None:
+                self._connection.executescript(_count_tasks)
+            if new:
+                # Switching a workspace to SQLite imports its task files.
+                self.refresh()
+                self.flush()
+        return self._connection
+
+    def read_task(self, task_id: int) -> Task:
+        task_num = Task.task_num_from_id(Task.task_id_from_string(task_id))
+        # A change is never written over a task file edited since it was imported.
+        self._refresh_task_file(task_num)
+        row = self.connection.execute(
+            f"SELECT {_columns}, description, notes FROM tasks WHERE id = ?", (task_num,)).fetchone()
+        if row is None:
+            raise ValueError(f"Task {task_id} not found")
+        history = [TaskHistory(parse_timestamp(timestamp), action) for timestamp, action in self._history(task_num)]
+        return self._task_from_row(row, description=row[7], notes=row[8], history=history)
+
+    def write_task(self, task: Task, new: bool = False):
+        self._write_task_file(task, new)
+        self._write_row(task)
+
+    def save_change(self, task: Task, field: str, value: str, timestamp: datetime):
+        # Only the changed column and the new history entry are written.
+        if field not in ("board", "priority", "category"):
+            raise ValueError(f"Invalid task field: {field}")
+        self._write_task_file(task)
+        task_num = Task.task_num_from_id(task.task_id)
+        self.connection.execute(f"UPDATE tasks SET {field} = ? WHERE id = ?", (value, task_num))
+        self.connection.execute(
+            "INSERT INTO history (task_id, position, timestamp, action) VALUES (?, ?, ?, ?)",
+            (task_num, len(task.history) - 1, timestamp.strftime(_timestamp_format), task.history[-1].action))
+
+    def delete_task(self, task_id: int) -> Task:
+        task = self.read_task(task_id)
+        task_num = Task.task_num_from_id(task.task_id)
+        self._delete_row(task_num)
+        task_file = self.layout.find_task_file(task_num)
+        task_file.unlink(missing_ok=True)
+        self.connection.execute("DELETE FROM files WHERE name = ?", (task_file.name,))
+        return task
+
+    def query(self, where: TaskQuery = None, limit: int = None, offset: int = 0, sort: bool = True,
+              jobs: int = None, refresh: bool = True, order: SortOrder = None):
+        if refresh:
+            self.refresh(jobs)
+            self.flush()
+        sql, parameters = self._select(where, limit, offset, (order or self.default_order) if sort else None)
+        with trace.phase("sqlite.query"):
+            rows = self.connection.execute(sql, parameters)
+        for row in rows:
+            trace.count("tasks_listed")
+            task = self._task_from_row(row)
+            task.defer_body(lambda task_num=row[0]: self._body(task_num))
+            yield task
+
+    def explain(self, where: TaskQuery) -> list:
+        # The whole filter is pushed down to SQLite, its plan shows the indexes it uses.
+        sql, parameters = self._select(where, order=self.default_order)
+        plan = [row[-1] for row in self.connection.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+        return where.explain()[:1] + [f"SQL: {sql}"] + [f"Plan: {step}" for step in plan]
+
+    def counts(self, refresh: bool = True) -> dict:
+        if refresh:
+            self.refresh()
+            self.flush()
+        rows = self.connection.execute("SELECT board, category, priority, owner, count FROM task_counts")
+        return {tuple(row[:-1]): row[-1] for row in rows}
+
+    def refresh(self, jobs: int = None):
+        connection = self.connection
+        synced = dict((name, (mtime, size)) for name, mtime, size in connection.execute("SELECT * FROM files"))
+        row = connection.execute("SELECT value FROM state WHERE key = 'git'").fetchone()
+        previous_git_state = json.loads(row[0]) if row else None
+        candidates, git_state = self.git.changes(previous_git_state, len(synced))
+        with trace.phase("sqlite.scan"):
+            changed, removed, checked = self.layout.changed_files(synced, lambda stamp: stamp, candidates)
+        if trace.enabled:
+            trace.count("files_scanned", checked)
+            trace.count("files_read", len(changed))
+        with trace.phase("sqlite.import"):
+            paths = [path for _, path, _ in changed]
+            for task_file, task in zip(paths, task_loader.load(paths, partial(_read_task_file, workflow=self.workflow), jobs)):
+                self._write_row(task)
+                self._synced(task_file)
+        # Task files removed outside of the workspace delete their tasks.
+        for file_name in removed:
+            self._delete_row(Task.task_num_from_id(file_name[:-len(".md")]))
+            connection.execute("DELETE FROM files WHERE name = ?", (file_name,))
+        if git_state != previous_git_state:
+            connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('git', ?)", (json.dumps(git_state),))
+
+    def flush(self):
+        if self._connection is not None:
+            self._connection.commit()
+
+    def close(self):
+        if self._connection is not None:
+            # Closing without a commit rolls back the open transaction.
+            self._connection.close()
+            self._connection = None
+
+    def task_location(self, task_id: int) -> Path:
+        task = self.read_task(task_id)
+        task_file = self.layout.find_task_file(task_id)
+        if not task_file.exists():
+            self._write_task_file(task)
+            self.flush()
+        return task_file
+
+    def _select(self, where: TaskQuery = None, limit: int = None, offset: int = 0, order: SortOrder = None) -> tuple:
+        clause, parameters = where.sql() if where else ("", [])
+        sql = f"SELECT {_columns} FROM tasks"
+        if clause:
+            sql += f" WHERE {clause}"
+        if order is not None:
+            order_by, order_parameters = order.sql()
+            sql += f" ORDER BY {order_by}"
+            parameters.extend(order_parameters)
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            parameters.extend((-1 if limit is None else limit, offset))
+        return sql, parameters
+
+    def _write_task_file(self, task: Task, new: bool = False):
+        # A new task never replaces an existing file, eg when the counter is behind after a merge.
+        file_name = f"{task.task_id}.md"
+        task_file = self.layout.path(file_name) if new else self.layout.find(file_name)
+        if task_file.parent != self.tasks_dir:
+            task_file.parent.mkdir(exist_ok=True)
+        try:
+            with task_file.open("x" if new else "w") as f:
+                f.write(task.to_string())
+        except FileExistsError:
+            raise ValueError(f"Task file {task_file.name} already exists")
+        self._synced(task_file)
+
+    def _write_row(self, task: Task):
+        task_num = Task.task_num_from_id(task.task_id)
+        # An upsert, unlike a replace, runs the update trigger that keeps the counts.
+        self.connection.execute(
+            f"INSERT INTO tasks ({_columns}, description, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            f"ON CONFLICT (id) DO UPDATE SET {_upsert_columns}",
+            (task_num, task.title, task.created.strftime(_timestamp_format), task.priority.name,
+             task.category, task.owner, task.board.name, task.description, task.notes))
+        self.connection.execute("DELETE FROM history WHERE task_id = ?", (task_num,))
+        self.connection.executemany(
+            "INSERT INTO history (task_id, position, timestamp, action) VALUES (?, ?, ?, ?)",
+            ((task_num, position, entry.timestamp.strftime(_timestamp_format), entry.action)
+             for position, entry in enumerate(task.history)))
+
+    def _refresh_task_file(self, task_num: int):
+        task_file = self.layout.find_task_file(task_num)
+        try:
+            stat = task_file.stat()
+        except FileNotFoundError:
+            return
+        synced = self.connection.execute("SELECT mtime, size FROM files WHERE name = ?", (task_file.name,)).fetchone()
+        if synced == (stat.st_mtime_ns, stat.st_size):
+            return
+        self._write_row(_read_task_file(task_file, self.workflow))
+        self._synced(task_file)
+
+    def _synced(self, task_file: Path):
+        stat = task_file.stat()
+        self.connection.execute("INSERT OR REPLACE INTO files (name, mtime, size) VALUES (?, ?, ?)",
+                                (task_file.name, stat.st_mtime_ns, stat.st_size))
+
+    def _delete_row(self, task_num: int):
+        self.connection.execute("DELETE FROM tasks WHERE id = ?", (task_num,))
+        self.connection.execute("DELETE FROM history WHERE task_id = ?", (task_num,))
+
+    def _history(self, task_num: int) -> list:
+        return self.connection.execute(
+            "SELECT timestamp, action FROM history WHERE task_id = ? ORDER BY position", (task_num,)).fetchall()
+
+    def _body(self, task_num: int) -> str:
+        description, notes = self.connection.execute(
+            "SELECT description, notes FROM tasks WHERE id = ?", (task_num,)).fetchone()
+        history = "\n\n".join(f"{timestamp} - {action}" for timestamp, action in self._history(task_num))
+        return f"## Description\n{description}\n\n## Notes\n{notes}\n\n## History\n{history}\n"
+
+    def _task_from_row(self, row, description: str = "", notes: str = "", history: list = None) -> Task:
+        task_num, title, created, priority, category, owner, board = row[:7]
+        return Task(
+            task_id=task_num,
+            title=title,
+            description=description,
+            priority=TaskPriority.from_name(priority),
+            category=category,
+            owner=owner,
+            created=parse_timestamp(created),
+            board=board,
+            notes=notes,
+            history=history,
+            workflow=self.workflow)
+
+
+def _read_task_file(task_file: Path, workflow: Workflow) -> Task:
+    return Task.from_string(task_file.read_text(), workflow=workflow)
@@ -0,0 +1,298 @@
+import heapq
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from task_cli import trace
+from task_cli.config import WorkspaceConfig
+from task_cli.git_changes import GitChanges
+from task_cli.journal import Journal
+from task_cli.layout import TaskLayout
+from task_cli.query import TaskQuery
+from task_cli.sort_order import SortOrder
+from task_cli.task import Task
+from task_cli.task_index import TaskIndex
+from task_cli.task_parser import parse_front_matter, parse_timestamp
+from task_cli.task_priority import TaskPriority
+
+
+class TaskStorage:
+    """Keeps the tasks of a workspace, `TaskManager` implements the commands on top of it.
+
+    Changes are written by `write_task`, `save_change` and `delete_task` and are only
+    guaranteed to be persisted once `flush` is called.
+    """
+
+    def __init__(self, workspace: Path, config: WorkspaceConfig):
+        self.workspace = workspace
+        self.tasks_dir = workspace / "tasks"
+        self.config = config
+        self.layout = TaskLayout(self.tasks_dir, config.layout_shard_size, config.layout_previous_shard_size)
+        self.git = GitChanges(self.tasks_dir, config.refresh_git)
+        # Tasks are validated against the boards and categories of the workspace.
+        self.workflow = config.workflow
+        self.default_order = config.list_sort
+
+    def read_task(self, task_id: int) -> Task:
+        raise NotImplementedError
+
+    def write_task(self, task: Task, new: bool = False):
+        raise NotImplementedError
+
+    def save_change(self, task: Task, field: str, value: str, timestamp: datetime):
+        self.write_task(task)
+
+    def delete_task(self, task_id: int) -> Task:
+        raise NotImplementedError
+
+    def query(self, where: TaskQuery = None, limit: int = None, offset: int = 0, sort: bool = True,
+              jobs: int = None, refresh: bool = True, order: SortOrder = None):
+        """The tasks matching `where`, sorted by `order` or else the default order when `sort`."""
+        raise NotImplementedError
+
+    def explain(self, where: TaskQuery) -> list:
+        """How `query` finds the tasks matching `where`, one line per step."""
+        return where.explain()
+
+    def counts(self, refresh: bool = True) -> dict:
+        """The number of tasks of every (board, category, priority, owner), kept up to date by every change."""
+        raise NotImplementedError
+
+    def refresh(self, jobs: int = None):
+        pass
+
+    def fold(self) -> int:
+        return 0
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Releases the storage, changes that were not flushed are dropped."""
+        pass
+
+    def task_location(self, task_id: int) -> Path:
+        raise NotImplementedError
+
+
+class FileStorage(TaskStorage):
+    """One Markdown file per task in `.tasks/tasks`, with the index and the history journal."""
+
+    def __init__(self, workspace: Path, config: WorkspaceConfig):
+        super().__init__(workspace, config)
+        self.index = TaskIndex(workspace / "index", self.tasks_dir, self.layout, self.git, self.default_order,
+                               self.workflow)
+        self.journal = Journal(workspace / "journal")
+        self._journal_stat = None
+
+    def read_task(self, task_id: int) -> Task:
+        task_file = self.layout.find_task_file(task_id)
+        try:
+            task_content = task_file.read_text()
+        except FileNotFoundError:
+            raise ValueError(f"Task {task_id} not found")
+        task = Task.from_string(task_content, lazy=True, workflow=self.workflow)
+        return Journal.apply(task, self.journal.events.get(task_file.stem, []))
+
+    def write_task(self, task: Task, new: bool = False):
+        file_name = f"{task.task_id}.md"
+        task_file = self.layout.path(file_name) if new else self.layout.find(file_name)
+        if not self.journal.events.get(task_file.stem):
+            self._write_task_file(task_file, task, new)
+            return
+        # The task was read with its journal events applied, they are discarded under the same lock
+        # as the file is written so a fold in between never applies them a second time.
+        with self.journal.locked():
+            self._write_task_file(task_file, task, new)
+            self.journal.discard(task_file.stem)
+
+    def save_change(self, task: Task, field: str, value: str, timestamp: datetime):
+        if not self.config.journal_enabled:
+            self.write_task(task)
+            return
+        self.journal.append(task.task_id, field, value, timestamp)
+        if len(self.journal) >= self.config.journal_fold_threshold:
+            self.fold()
+
+    def delete_task(self, task_id: int) -> Task:
+        task_file = self.layout.find_task_file(task_id)
+        try:
+            task = Task.from_string(task_file.read_text(), lazy=True, workflow=self.workflow)
+            task_file.unlink()
+        except FileNotFoundError:
+            raise ValueError(f"Task {task_id} not found")
+        self.journal.discard(task_file.stem)
+        self.index.remove(task_file)
+        return task
+
+    def query(self, where: TaskQuery = None, limit: int = None, offset: int = 0, sort: bool = True,
+              jobs: int = None, refresh: bool = True, order: SortOrder = None):
+        where = where or TaskQuery(workflow=self.workflow)
+        order = order or self.default_order
+        # The whole index is in memory, only the tasks yielded are built from their entries.
+        entries = self.index.refresh(jobs) if refresh else self.index.entries
+        candidates = self._candidates(entries, where.lookups)
+        # The index keeps every task in the default order, walking it beats sorting unless
+        # the lookups leave less than a quarter of the tasks.
+        in_order = sort and order == self.default_order and len(candidates) * 4 >= len(entries)
+        ordered = self.index.ordered() if in_order else None
+        self.index.save()
+        if in_order:
+            matches = self._filter_entries(self._ordered_entries(ordered, candidates, order), where)
+        else:
+            matches = self._filter_entries(self._journaled_entries(candidates), where)
+            if sort:
+                with trace.phase("query.filter_sort"):
+                    matches = self._sort_entries(matches, order, limit, offset)
+        end = None if limit is None else offset + limit
+        for file_name, entry in islice(matches, offset, end):
+            trace.count("tasks_listed")
+            yield self._task_from_entry(file_name, entry)
+
+    def counts(self, refresh: bool = True) -> dict:
+        if refresh:
+            self.refresh()
+        counts = self.index.counts
+        self.index.save()
+        events = self.journal.events
+        if not events:
+            return counts
+        # The journal changed the fields of a few tasks since their entries were counted.
+        counts = dict(counts)
+        for task_id, task_events in events.items():
+            entry = self.index.entries.get(f"{task_id}.md")
+            if entry is None:
+                continue
+            for values, change in ((self.index.counted_values(entry), -1),
+                                   (self.index.counted_values(Journal.apply_to_entry(entry, task_events)), 1)):
+                counts[values] = counts.get(values, 0) + change
+        return {values: count for values, count in counts.items() if count}
+
+    def refresh(self, jobs: int = None):
+        journal_stat = self._stat(self.journal.journal_file)
+        if journal_stat != self._journal_stat:
+            self.journal.reload()
+            self._journal_stat = journal_stat
+        self.index.refresh(jobs)
+        self.index.save()
+
+    def fold(self) -> int:
+        folded = 0
+        # Under the lock, so no other process appends an event between reading the journal and removing it.
+        with self.journal.locked():
+            self.journal.reload()
+            for task_id, events in self.journal.events.items():
+                task_file = self.layout.find(f"{task_id}.md")
+                try:
+                    task_content = task_file.read_text()
+                except FileNotFoundError:
+                    continue
+                task = Journal.apply(Task.from_string(task_content, lazy=True, workflow=self.workflow), events)
+                self._write_task_file(task_file, task)
+                folded += 1
+            self.journal.clear()
+        self.index.save()
+        return folded
+
+    def flush(self):
+        self.index.save()
+        self._journal_stat = self._stat(self.journal.journal_file)
+
+    def task_location(self, task_id: int) -> Path:
+        task_file = self.layout.find_task_file(task_id)
+        if not task_file.exists():
+            raise ValueError(f"Task {task_id} not found")
+        return task_file
+
+    def explain(self, where: TaskQuery) -> list:
+        entries = self.index.refresh()
+        self.index.save()
+        candidates = self._candidates(entries, where.lookups)
+        return where.explain() + [f"Candidates: {len(candidates)} of {len(entries)} tasks"]
+
+    def _candidates(self, entries: dict, lookups: dict) -> dict:
+        # Only the tasks in the posting lists of the lookups are checked, and those with journal
+        # events as the events may have changed the indexed fields.
+        if not lookups:
+            return entries
+        file_names = self.index.lookup(**lookups)
+        journaled = [f"{task_id}.md" for task_id in self.journal.events]
+        if journaled:
+            file_names = sorted(set(file_names).union(journaled),
+                                key=lambda file_name: Task.task_num_from_id(file_name[:-len(".md")]))
+        return {file_name: entries[file_name] for file_name in file_names if file_name in entries}
+
+    def _journaled_entries(self, entries: dict):
+        events = self.journal.events
+        if not events:
+            yield from entries.items()
+            return
+        for file_name, entry in entries.items():
+            task_events = events.get(file_name[:-len(".md")])
+            if task_events:
+                entry = Journal.apply_to_entry(entry, task_events)
+            yield file_name, entry
+
+    def _filter_entries(self, entries, where: TaskQuery):
+        # The index lookups already hold for the candidates, unless a journal event changed them.
+        events = self.journal.events
+        for file_name, entry in entries:
+            matches = where.matches if file_name[:-len(".md")] in events else where.residual_matches
+            if matches(entry):
+                yield file_name, entry
+
+    def _ordered_entries(self, ordered: list, candidates: dict, order: SortOrder):
+        # Tasks with journal events may have moved in the order, they are sorted apart and merged in.
+        events = self.journal.events
+        if not events:
+            for file_name in ordered:
+                entry = candidates.get(file_name)
+                if entry is not None:
+                    yield file_name, entry
+            return
+        journaled = [f"{task_id}.md" for task_id in events]
+        journaled = self._sort_entries(self._journaled_entries(
+            {file_name: candidates[file_name] for file_name in journaled if file_name in candidates}), order)
+        entries = ((file_name, candidates[file_name]) for file_name in ordered
+                   if file_name in candidates and file_name[:-len(".md")] not in events)
+        yield from heapq.merge(entries, journaled, key=lambda item: order.key(item[1]))
+
+    def _sort_entries(self, entries, order: SortOrder, limit: int = None, offset: int = 0):
+        key = lambda item: order.key(item[1])
+        if limit is None:
+            return iter(sorted(entries, key=key))
+        # Only the first offset + limit entries are ever kept, on a bounded heap.
+        return iter(heapq.nsmallest(offset + limit, entries, key=key))
+
+    def _task_from_entry(self, file_name: str, entry: dict) -> Task:
+        task = Task(
+            task_id=entry["id"],
+            title=entry["title"],
+            description="",
+            priority=TaskPriority.from_name(entry["priority"]),
+            category=entry["category"],
+            owner=entry["owner"],
+            created=parse_timestamp(entry["created"]),
+            board=entry["board"],
+            workflow=self.workflow)
+        task.defer_body(lambda: parse_front_matter(self.layout.find(file_name).read_text())[1])
+        return Journal.apply(task, self.journal.events.get(file_name[:-len(".md")], []))
+
+    def _write_task_file(self, task_file: Path, task: Task, new: bool = False):
+        # A new task never replaces an existing file, eg when the counter is behind after a merge.
+        if new and task_file.parent != self.tasks_dir:
+            task_file.parent.mkdir(exist_ok=True)
+        try:
+            with task_file.open("x" if new else "w") as f:
+                f.write(task.to_string())
+        except FileExistsError:
+            raise ValueError(f"Task file {task_file.name} already exists")
+        self.index.update(task_file, task)
+
+    @staticmethod
+    def _stat(path: Path):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,85 @@
+from task_cli.task_priority import PriorityLevel
+from task_cli.workflow import Workflow
+
+# The fields tasks are counted by, in the order of the values of the storage counts.
+DIMENSIONS = ("board", "category", "priority", "owner")
+
+_priorities = [level.display_name for level in PriorityLevel]
+
+
+def summarize(counts: dict, workflow: Workflow, by: list = None, filters: dict = None) -> dict:
+    """The number of tasks per value of every dimension, or a pivot table of the two `by` dimensions.
+
+    `counts` holds the number of tasks of every (board, category, priority, owner), so the
+    work depends on the number of distinct combinations and not on the number of tasks.
+    Only the combinations with the exact values of `filters` are counted.
+    """
+    if by:
+        for dimension in by:
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Invalid summary field: {dimension}, allowed fields: {DIMENSIONS}")
+        if len(by) > 2 or len(set(by)) != len(by):
+            raise ValueError(f"Summarize by one field, or two different fields for a pivot table, not {by}")
+    else:
+        by = list(DIMENSIONS)
+    positions = [DIMENSIONS.index(dimension) for dimension in by]
+    conditions = [(DIMENSIONS.index(dimension), value) for dimension, value in (filters or {}).items()
+                  if value is not None]
+    counted = [(values, count) for values, count in counts.items()
+               if all(values[position] == value for position, value in conditions)]
+    result = {"total": sum(count for _, count in counted)}
+    if len(by) == 2:
+        rows, columns = positions
+        pivot = {row: dict.fromkeys(_values(by[1], workflow, counted, columns), 0)
+                 for row in _values(by[0], workflow, counted, rows)}
+        for values, count in counted:
+            pivot[values[rows]][values[columns]] += count
+        result.update(rows=by[0], columns=by[1], pivot=pivot)
+        return result
+    result["counts"] = {}
+    for dimension, position in zip(by, positions):
+        totals = dict.fromkeys(_values(dimension, workflow, counted, position), 0)
+        for values, count in counted:
+            totals[values[position]] += count
+        result["counts"][dimension] = totals
+    return result
+
+
+def format_table(summary: dict) -> list:
+    lines = [f"Tasks: {summary['total']}"]
+    if "pivot" in summary:
+        pivot = summary["pivot"]
+        columns = list(next(iter(pivot.values()), {}))
+        lines.append("")
+        lines.append(_row([summary["rows"].capitalize(), *columns, "Total"]))
+        for row, counts in pivot.items():
+            lines.append(_row([row, *counts.values(), sum(counts.values())]))
+        lines.append(_row(["Total", *(sum(counts[column] for counts in pivot.values()) for column in columns),
+                           summary["total"]]))
+        return lines
+    for dimension, totals in summary["counts"].items():
+        lines.append("")
+        lines.append(_row([dimension.capitalize(), "Tasks"]))
+        for value, count in totals.items():
+            lines.append(_row([value, count]))
+    return lines
+
+
+def _values(dimension: str, workflow: Workflow, counted: list, position: int) -> list:
+    # Every board, category and priority in their usual order, even without tasks, then the
+    # other counted values, eg the owners, by name.
+    if dimension == "board":
+        known = [board.name for board in workflow.boards]
+    elif dimension == "category":
+        known = list(workflow.categories)
+    elif dimension == "priority":
+        known = _priorities
+    else:
+        known = []
+    others = {values[position] for values, _ in counted}.difference(known)
+    return known + sorted(others, key=str.casefold)
+
+
+def _row(values: list) -> str:
+    first, *others = (str(value) if value != "" else "-" for value in values)
+    return f"{first:<14}" + "".join(f"{value:>14}" for value in others)
@@ -1,14 +1,17 @@
+import sys
+from array import array
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List
-
-import frontmatter
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List
 
+from task_cli import trace
 from task_cli.board import Board
+from task_cli.task_parser import parse_body, parse_front_matter, parse_timestamp
 from task_cli.task_priority import TaskPriority
+from task_cli.workflow import DEFAULT_CATEGORIES, Workflow
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskHistory:
     timestamp: datetime
     action: str
@@ -16,28 +19,117 @@ class TaskHistory:
     @classmethod
     def from_string(cls, history_entry: str):
         timestamp_str, action = history_entry.split(" - ")
-        timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
+        timestamp = parse_timestamp(timestamp_str)
         return cls(timestamp=timestamp, action=action)
 
     def to_string(self):
         return f"{self.timestamp.strftime("%Y-%m-%d %H:%M:%S")} - {self.action}"
-    
+
+
+class PackedHistory:
+    """History entries of a task packed in arrays, instead of an object per entry.
+
+    Timestamps are kept as microseconds since the epoch and actions as a small code
+    plus the board, priority or category name they refer to, shared between tasks.
+    `TaskHistory` objects are only created when the entries are accessed.
+    """
+
+    __slots__ = ("_timestamps", "_actions", "_payloads")
+
+    CREATED = 0
+    MOVED = 1
+    PRIORITY_UPDATED = 2
+    CATEGORY_UPDATED = 3
+    OTHER = 4
+
+    _epoch = datetime(1970, 1, 1)
+    _microsecond = timedelta(microseconds=1)
+
+    # Action codes are indexes in this tuple, any other action is stored whole as the payload.
+    _prefixes = ("Created", "Moved to ", "Priority updated to ", "Category updated to ", "")
+
+    def __init__(self, entries: Iterable[TaskHistory] = ()):
+        self._timestamps = array("q")
+        self._actions = array("B")
+        self._payloads = []
+        self.extend(entries)
+
+    @classmethod
+    def from_string(cls, history: str):
+        packed = cls()
+        for entry in history.split("\n\n"):
+            packed.append(TaskHistory.from_string(entry))
+        return packed
+
+    @property
+    def columns(self) -> tuple:
+        """The timestamps in microseconds since the epoch, action codes and payloads, not copied."""
+        return self._timestamps, self._actions, self._payloads
+
+    def add(self, timestamp: datetime, action: str):
+        code, payload = self._encode(action)
+        self._timestamps.append((timestamp - self._epoch) // self._microsecond)
+        self._actions.append(code)
+        self._payloads.append(payload)
+
+    def append(self, entry: TaskHistory):
+        self.add(entry.timestamp, entry.action)
+
+    def extend(self, entries: Iterable[TaskHistory]):
+        if isinstance(entries, PackedHistory):
+            self._timestamps.extend(entries._timestamps)
+            self._actions.extend(entries._actions)
+            self._payloads.extend(entries._payloads)
+            return
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self):
+        return len(self._actions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        timestamp = self._epoch + self._timestamps[index] * self._microsecond
+        return TaskHistory(timestamp=timestamp, action=self._prefixes[self._actions[index]] + self._payloads[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if isinstance(other, (PackedHistory, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PackedHistory({list(self)!r})"
+
+    @classmethod
+    def _encode(cls, action: str) -> tuple:
+        if action == cls._prefixes[cls.CREATED]:
+            return cls.CREATED, ""
+        for code in range(cls.MOVED, cls.OTHER):
+            prefix = cls._prefixes[code]
+            if action.startswith(prefix):
+                return code, sys.intern(action[len(prefix):])
+        return cls.OTHER, action
+
 
 class Task:
 
-    _prefix = "TASK-"
+    __slots__ = ("_task_id", "title", "created", "_priority", "_category", "owner", "_board",
+                 "_description", "_notes", "_history", "_load_body", "_raw_history", "_workflow")
 
-    _categories = ["Bug", "Feature", "Documentation", "Maintenance", "UI/UX", "Security"]
+    _prefix = "TASK-"
 
+    # The boards of the default workflow.
     BACK_LOG = Board("Backlog", "BL")
     IN_PROGRESS = Board("In Progress", "IP")
     DONE = Board("Done", "DN")
-    
-    _boards = [
-        BACK_LOG, 
-        IN_PROGRESS, 
-        DONE
-    ]
+
+    # Tasks of a workspace are validated against the workflow of its config, this one without it.
+    DEFAULT_WORKFLOW = Workflow([BACK_LOG, IN_PROGRESS, DONE], DEFAULT_CATEGORIES.split(", "))
 
     _task_template = """---
 id: {prefix}{task_id}
@@ -67,57 +159,78 @@ board: {board}
                  category: str, 
                  owner: str,
                  created: datetime = None, 
-                 board: str = "Backlog",
+                 board: str = None,
                  notes: str = "",
-                 history: List[TaskHistory] = []):
+                 history: List[TaskHistory] = [],
+                 workflow: Workflow = None):
+        self._workflow: Workflow = workflow or self.DEFAULT_WORKFLOW
         self._task_id: int = task_id
         self.title: str = title
         self.created: datetime = created or datetime.now()
         self._priority: TaskPriority = priority
         self._category: str = self._validate_category(category)
-        self.owner: str = owner
-        self._board: Board = self._validate_board(board)
-        self.description: str = description
-        self.notes: str = notes
-        self.history: List[TaskHistory] = history or [TaskHistory(timestamp=self.created, action="Created")]
+        self.owner: str = sys.intern(owner) if owner else owner
+        self._board: Board = self._validate_board(board) if board is not None else self._workflow.initial
+        self._description: str = description
+        self._notes: str = notes
+        self._history: PackedHistory = PackedHistory(history or [TaskHistory(timestamp=self.created, action="Created")])
+        # Body that was not split into sections yet, and history entries that were not decoded yet.
+        self._load_body: Callable[[], str] = None
+        self._raw_history: str = None
 
     @classmethod
-    def from_string(cls, task_str: str):
-        # Read front matter
-        task = frontmatter.loads(task_str)
-        if not task.metadata:
+    def from_string(cls, task_str: str, lazy: bool = False, workflow: Workflow = None):
+        # Read front matter, the fixed header is parsed without YAML when possible
+        trace.count("tasks_parsed")
+        with trace.phase("task.parse"):
+            metadata, content = parse_front_matter(task_str)
+        if not metadata:
             raise ValueError("Invalid task front matter")
-        # extract description and notes
-        description = task.content.split("## Description")[1].split("## Notes")[0].strip()
-        notes = task.content.split("## Notes")[1].split("## History")[0].strip()
-        # extract history
-        history = task.content.split("## History")[1].strip()
-        history = [TaskHistory.from_string(entry) for entry in history.split("\n\n")]
+        task = cls.from_metadata(metadata, workflow)
+        # description, notes and history are extracted on first access
+        task.defer_body(lambda: content)
+        if not lazy:
+            # decode right away so an invalid body is reported here
+            task.history
+        return task
+
+    @classmethod
+    def from_metadata(cls, metadata: dict, workflow: Workflow = None):
         # extract task id
-        task_id = int(task.metadata["id"].split("-")[1])
+        task_id = cls.task_num_from_id(metadata["id"])
         # extract priority
-        priority = TaskPriority.from_name(task.metadata["priority"])
-        created = task.metadata["created"]
+        priority = TaskPriority.from_name(metadata["priority"])
+        created = metadata["created"]
         # Create Task object
         return cls(
             task_id=task_id,
-            title=task.metadata["title"],
-            description=description,
+            title=metadata["title"],
+            description="",
             priority=priority,
-            category=task.metadata["category"],
+            category=metadata["category"],
             created=created,
-            owner=task.metadata["owner"],
-            board=task.metadata["board"],
-            notes=notes,
-            history=history
+            owner=metadata["owner"],
+            board=metadata["board"],
+            workflow=workflow
         )
-    
+
+    @classmethod
+    def task_num_from_id(cls, task_id: str) -> int:
+        return int(task_id.split("-")[1])
+
     @classmethod
     def task_id_from_string(cls, task_num: str):
         return f"{cls._prefix}{task_num}"
     
+    def defer_body(self, load_body: Callable[[], str]):
+        self._load_body = load_body
+        self._history = PackedHistory()
+
     def to_string(self):
-        history = "\n\n".join([entry.to_string() for entry in self.history])
+        self._split_body()
+        history = [self._raw_history] if self._raw_history is not None else []
+        history.extend(entry.to_string() for entry in self._history)
+        history = "\n\n".join(history)
         return self._task_template.format(
             prefix=self._prefix,
             task_id=self._task_id,
@@ -131,6 +244,44 @@ board: {board}
             notes=self.notes,
             history=history)
     
+    @property
+    def description(self) -> str:
+        self._split_body()
+        return self._description
+
+    @description.setter
+    def description(self, description: str):
+        self._split_body()
+        self._description = description
+
+    @property
+    def notes(self) -> str:
+        self._split_body()
+        return self._notes
+
+    @notes.setter
+    def notes(self, notes: str):
+        self._split_body()
+        self._notes = notes
+
+    @property
+    def history(self) -> PackedHistory:
+        self._split_body()
+        if self._raw_history is not None:
+            with trace.phase("task.history"):
+                history = PackedHistory.from_string(self._raw_history)
+            if trace.enabled:
+                trace.count("histories_decoded")
+                trace.count("history_entries", len(history))
+            history.extend(self._history)
+            self._history = history
+            self._raw_history = None
+        return self._history
+
+    @property
+    def workflow(self) -> Workflow:
+        return self._workflow
+
     @property
     def board(self):
         return self._board
@@ -151,31 +302,34 @@ board: {board}
     def task_id_with_title(self):
         return f"{self.task_id} - {self.title}"
     
-    def move_to_board(self, to_board: str):
+    def move_to_board(self, to_board: str, timestamp: datetime = None):
         self._board = self._validate_board(to_board)
-        timestamp = datetime.now()
-        self.history.append(TaskHistory(timestamp=timestamp, action=f"Moved to {self._board.name}"))
+        timestamp = timestamp or datetime.now()
+        self._history.add(timestamp, f"Moved to {self._board.name}")
 
-    def update_priority(self, priority: TaskPriority):
+    def update_priority(self, priority: TaskPriority, timestamp: datetime = None):
         self._priority = priority
-        timestamp = datetime.now()
-        self.history.append(TaskHistory(timestamp=timestamp, action=f"Priority updated to {self._priority.name}"))
+        timestamp = timestamp or datetime.now()
+        self._history.add(timestamp, f"Priority updated to {self._priority.name}")
 
-    def update_category(self, category: str):
+    def update_category(self, category: str, timestamp: datetime = None):
         self._category = self._validate_category(category)
-        timestamp = datetime.now()
-        self.history.append(TaskHistory(timestamp=timestamp, action=f"Category updated to {self._category}"))
+        timestamp = timestamp or datetime.now()
+        self._history.add(timestamp, f"Category updated to {self._category}")
+
+    def _split_body(self):
+        if self._load_body is None:
+            return
+        trace.count("bodies_loaded")
+        with trace.phase("task.body"):
+            self._description, self._notes, self._raw_history = parse_body(self._load_body())
+        self._load_body = None
 
     def _validate_category(self, category: str) -> str:
-        if category not in self._categories:
-            raise ValueError(f"Invalid category: {category}, allowed categories: {self._categories}")
-        return category
-    
+        return self._workflow.category(category)
+
     def _validate_board(self, board: str) -> Board:
-        for _board in self._boards:
-            if _board == board:
-                return _board
-        raise ValueError(f"Invalid board: {board}, allowed boards: {self._boards}")
+        return self._workflow.board(board)
     
     def __str__(self):
         return f"{self.task_id}: {self.title} ({self._priority.name}, {self._category}, {self._board.name})"
\ No newline at end of file
@@ -0,0 +1,272 @@
+import json
+import os
+from bisect import bisect_left, insort
+from functools import partial
+from pathlib import Path
+
+from task_cli import task_loader, trace
+from task_cli.git_changes import GitChanges
+from task_cli.layout import TaskLayout
+from task_cli.sort_order import SortOrder
+from task_cli.task import Task
+from task_cli.task_parser import read_header
+from task_cli.task_priority import TaskPriority
+from task_cli.workflow import Workflow
+
+
+class TaskIndex:
+    """The front matter of every task file, with a posting list per value of the indexed fields.
+
+    Posting lists hold the task numbers of the files with that value, they are persisted
+    with the entries and decoded into sets only when a filter or a change needs them.
+    With `git`, a refresh only checks the task files git reports as changed since the
+    commit of the previous refresh.
+
+    With an `order`, the names of the task files are also kept sorted in that order, so
+    listing the tasks in the default order doesn't sort them. The number of tasks of every
+    combination of the indexed fields is counted as the entries change. Task files are
+    validated against the boards and categories of `workflow`.
+    """
+
+    _version = 2
+
+    # Fields with posting lists, a task without an owner is under "".
+    indexed_fields = ("board", "category", "priority", "owner")
+
+    # Above this many changed task files the order is sorted again instead of updated file by file.
+    _resort_threshold = 256
+
+    def __init__(self, index_file: Path, tasks_dir: Path, layout: TaskLayout = None, git: GitChanges = None,
+                 order: SortOrder = None, workflow: Workflow = Task.DEFAULT_WORKFLOW):
+        self.index_file = index_file
+        self.tasks_dir = tasks_dir
+        self.layout = layout or TaskLayout(tasks_dir)
+        self.git = git
+        self.order = order
+        self.workflow = workflow
+        self._entries = None
+        self._postings = None
+        self._ordered = None
+        self._counts = None
+        self._git_state = None
+        self._dirty = False
+
+    @property
+    def entries(self) -> dict:
+        if self._entries is None:
+            with trace.phase("index.load"):
+                self._entries, self._postings = self._load()
+        return self._entries
+
+    def lookup(self, **values) -> list:
+        """The names of the task files with one of the given values of every field, by task number.
+
+        The posting lists of a field's values are merged, then the fields are intersected
+        starting from the shortest one.
+        """
+        self.entries
+        postings = sorted((set().union(*(self._posting(field, value) for value in field_values))
+                           for field, field_values in values.items()), key=len)
+        task_nums = postings[0].intersection(*postings[1:])
+        return [f"{Task._prefix}{task_num}.md" for task_num in sorted(task_nums)]
+
+    @property
+    def counts(self) -> dict:
+        """The number of tasks of every (board, category, priority, owner), owner "" when unset."""
+        entries = self.entries
+        if self._counts is None or sum(self._counts.values()) != len(entries):
+            # Missing from an older index, or out of date.
+            self._counts = {}
+            for entry in entries.values():
+                self._count(entry, 1)
+            self._dirty = True
+        return self._counts
+
+    def ordered(self) -> list:
+        """The names of the task files sorted by `order`."""
+        entries = self.entries
+        if self._ordered is None:
+            with trace.phase("index.sort"):
+                key = self.order.key
+                self._ordered = sorted(entries, key=lambda file_name: key(entries[file_name]))
+            self._dirty = True
+        return self._ordered
+
+    def refresh(self, jobs: int = None) -> dict:
+        entries = self.entries
+        candidates, git_state = self.git.changes(self._git_state, len(entries)) if self.git else (None, None)
+        with trace.phase("index.scan"):
+            changed, removed, checked = self.layout.changed_files(
+                entries, lambda entry: (entry["mtime"], entry["size"]), candidates)
+        if trace.enabled:
+            trace.count("files_scanned", checked)
+            trace.count("index_hits", checked - len(changed))
+            trace.count("files_read", len(changed))
+            trace.count("bytes_read", sum(stat.st_size for _, _, stat in changed))
+        if len(changed) + len(removed) > self._resort_threshold:
+            self._ordered = None
+        with trace.phase("index.read"):
+            paths = [path for _, path, _ in changed]
+            for (file_name, _, stat), entry in zip(changed, task_loader.load(paths, partial(read_entry, workflow=self.workflow), jobs)):
+                self._put(file_name, entry, stat)
+        for file_name in removed:
+            self._pop(file_name)
+        if git_state != self._git_state:
+            self._git_state = git_state
+            self._dirty = True
+        return entries
+
+    def update(self, task_file: Path, task: Task):
+        self._put(task_file.name, self.entry_from_task(task), task_file.stat())
+
+    def remove(self, task_file: Path):
+        self._pop(task_file.name)
+
+    def save(self):
+        if not self._dirty:
+            return
+        with trace.phase("index.save"):
+            postings = {field: {value: list(task_nums) for value, task_nums in values.items() if task_nums}
+                        for field, values in self._postings.items()}
+            tmp_file = self.index_file.with_name(f"{self.index_file.name}.{os.getpid()}.tmp")
+            order = {"signature": self.order.signature, "tasks": self._ordered} if self._ordered is not None else None
+            counts = [[*values, count] for values, count in self.counts.items()]
+            tmp_file.write_text(json.dumps({"version": self._version, "tasks": self.entries, "postings": postings,
+                                            "order": order, "counts": counts, "git": self._git_state},
+                                           separators=(",", ":")))
+            os.replace(tmp_file, self.index_file)
+        self._dirty = False
+
+    @classmethod
+    def is_task_file(cls, file_name: str) -> bool:
+        return TaskLayout.is_task_file(file_name)
+
+    @staticmethod
+    def entry_from_task(task: Task) -> dict:
+        return {
+            "id": task._task_id,
+            "title": task.title,
+            "created": task.created.strftime("%Y-%m-%d %H:%M:%S"),
+            "priority": task.priority.name,
+            "category": task.category,
+            "owner": task.owner,
+            "board": task.board.name,
+        }
+
+    @staticmethod
+    def entry_from_metadata(metadata: dict, workflow: Workflow = Task.DEFAULT_WORKFLOW) -> dict:
+        if not metadata:
+            raise ValueError("Invalid task front matter")
+        return {
+            "id": Task.task_num_from_id(metadata["id"]),
+            "title": metadata["title"],
+            "created": metadata["created"].strftime("%Y-%m-%d %H:%M:%S"),
+            "priority": TaskPriority.from_name(metadata["priority"]).name,
+            "category": workflow.category(metadata["category"]),
+            "owner": metadata["owner"],
+            "board": workflow.board(metadata["board"]).name,
+        }
+
+    def _put(self, file_name: str, entry: dict, stat: os.stat_result):
+        entry["mtime"] = stat.st_mtime_ns
+        entry["size"] = stat.st_size
+        previous = self.entries.get(file_name)
+        task_num = self._task_num(file_name)
+        for field in self.indexed_fields:
+            if previous is not None and previous[field] != entry[field]:
+                self._posting(field, previous[field]).discard(task_num)
+            self._posting(field, entry[field]).add(task_num)
+        if previous is not None:
+            self._unorder(file_name, previous)
+            self._count(previous, -1)
+        self._count(entry, 1)
+        self.entries[file_name] = entry
+        if self._ordered is not None:
+            insort(self._ordered, file_name, key=self._order_key)
+        self._dirty = True
+
+    def _pop(self, file_name: str):
+        entry = self.entries.get(file_name)
+        if entry is None:
+            return
+        task_num = self._task_num(file_name)
+        for field in self.indexed_fields:
+            self._posting(field, entry[field]).discard(task_num)
+        self._unorder(file_name, entry)
+        self._count(entry, -1)
+        del self.entries[file_name]
+        self._dirty = True
+
+    @classmethod
+    def counted_values(cls, entry: dict) -> tuple:
+        return tuple(entry[field] or "" for field in cls.indexed_fields)
+
+    def _count(self, entry: dict, change: int):
+        if self._counts is None:
+            return
+        values = self.counted_values(entry)
+        count = self._counts.get(values, 0) + change
+        if count:
+            self._counts[values] = count
+        else:
+            del self._counts[values]
+
+    def _order_key(self, file_name: str) -> tuple:
+        return self.order.key(self._entries[file_name])
+
+    def _unorder(self, file_name: str, entry: dict):
+        # The file is found by the key of the entry it was sorted with, still in the entries.
+        if self._ordered is None:
+            return
+        i = bisect_left(self._ordered, self.order.key(entry), key=self._order_key)
+        if i < len(self._ordered) and self._ordered[i] == file_name:
+            del self._ordered[i]
+        else:
+            self._ordered = None
+
+    def _posting(self, field: str, value: str) -> set:
+        values = self._postings[field]
+        task_nums = values.get(value or "")
+        if not isinstance(task_nums, set):
+            # Loaded as a list, or a value without tasks yet.
+            task_nums = values[value or ""] = set(task_nums or ())
+        return task_nums
+
+    @staticmethod
+    def _task_num(file_name: str) -> int:
+        return Task.task_num_from_id(file_name[:-len(".md")])
+
+    def _load(self) -> tuple:
+        empty = {}, {field: {} for field in self.indexed_fields}
+        # No task is in order, the tasks added to a new index are kept in order one by one.
+        self._ordered = [] if self.order is not None else None
+        self._counts = {}
+        try:
+            data = json.loads(self.index_file.read_text())
+        except (FileNotFoundError, ValueError):
+            return empty
+        if not isinstance(data, dict) or data.get("version") not in (1, self._version):
+            return empty
+        entries = data.get("tasks", {})
+        postings = data.get("postings")
+        self._git_state = data.get("git")
+        order = data.get("order")
+        if self.order is not None and isinstance(order, dict) and order.get("signature") == self.order.signature:
+            self._ordered = order["tasks"]
+        else:
+            self._ordered = None
+        counts = data.get("counts")
+        self._counts = {tuple(row[:-1]): row[-1] for row in counts} if isinstance(counts, list) else None
+        if data["version"] == self._version and isinstance(postings, dict):
+            return entries, {field: postings.get(field, {}) for field in self.indexed_fields}
+        # The posting lists of an index written before they existed are built from its entries.
+        postings = {field: {} for field in self.indexed_fields}
+        for file_name, entry in entries.items():
+            for field in self.indexed_fields:
+                postings[field].setdefault(entry[field] or "", set()).add(self._task_num(file_name))
+        self._dirty = True
+        return entries, postings
+
+
+def read_entry(task_file: Path, workflow: Workflow = Task.DEFAULT_WORKFLOW) -> dict:
+    return TaskIndex.entry_from_metadata(read_header(task_file), workflow)
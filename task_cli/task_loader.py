@@ -0,0 +1,55 @@
+import os
+from typing import Callable, List, Sequence, Tuple
+
+SERIAL = "serial"
+THREAD = "thread"
+PROCESS = "process"
+
+# Below this many files the pool start up costs more than it saves.
+_thread_threshold = 64
+# Above this many files parsing dominates over I/O and is worth spreading over processes.
+_process_threshold = 2048
+_chunk_size = 256
+
+
+def choose_backend(file_count: int, jobs: int = None) -> Tuple[str, int]:
+    cpu_count = _available_cpus()
+    if jobs == 1 or file_count < _thread_threshold or (jobs is None and cpu_count == 1):
+        return SERIAL, 1
+    if file_count >= _process_threshold and (jobs or cpu_count) > 1:
+        return PROCESS, jobs or cpu_count
+    return THREAD, jobs or min(32, cpu_count + 4)
+
+
+# Results are returned in the order of paths, whatever the backend. parse has to be a module
+# level function, or a partial of one, so it can be sent to the process pool.
+def load(paths: Sequence, parse: Callable, jobs: int = None, backend: str = None) -> List:
+    if backend is None:
+        backend, workers = choose_backend(len(paths), jobs)
+    else:
+        workers = jobs or _available_cpus()
+    if backend == SERIAL:
+        return [parse(path) for path in paths]
+    if backend == THREAD:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(parse, paths))
+    if backend == PROCESS:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = [(parse, paths[i:i + _chunk_size]) for i in range(0, len(paths), _chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return [result for chunk in executor.map(_parse_chunk, chunks) for result in chunk]
+    raise ValueError(f"Invalid loader backend: {backend}")
+
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _parse_chunk(chunk: tuple) -> List:
+    parse, paths = chunk
+    return [parse(path) for path in paths]
@@ -1,6 +1,22 @@
+import heapq
+from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
 
+from task_cli.archive import TaskArchive
+from task_cli import trace
+from task_cli.batch import Operation, OperationResult
+from task_cli.config import WorkspaceConfig
+from task_cli.gitignore import ignore_local_files
+from task_cli.id_allocator import IdAllocator
+from task_cli.journal import Journal
+from task_cli.query import TaskQuery
+from task_cli.search_index import SearchIndex
+from task_cli.sort_order import SortOrder
+from task_cli.summary import summarize
+from task_cli.storage import FileStorage, TaskStorage
 from task_cli.task import Task
+from task_cli.task_index import TaskIndex
 from task_cli.task_priority import PriorityLevel, TaskPriority
 
 
@@ -10,98 +26,324 @@ class TaskManager:
         self.workspace = self.root_dir / ".tasks"
         self.tasks_dir = self.workspace / "tasks"
         self.task_counter_file = self.workspace / ".task_counter"
-    
+        self.id_allocator = IdAllocator(self.task_counter_file)
+        self.config = WorkspaceConfig(self.workspace / "config")
+        self.auto_refresh = True
+        self._storage = None
+        self._archive = None
+        self._search_index = None
+
+    @property
+    def storage(self) -> TaskStorage:
+        if self._storage is None:
+            if self.config.storage_engine == WorkspaceConfig.SQLITE:
+                # sqlite3 is only imported by the workspaces that use it.
+                from task_cli.sqlite_storage import SqliteStorage
+
+                self._storage = SqliteStorage(self.workspace, self.config)
+            else:
+                self._storage = FileStorage(self.workspace, self.config)
+        return self._storage
+
+    @property
+    def archive(self) -> TaskArchive:
+        if self._archive is None or self._archive.workflow is not self.storage.workflow:
+            self._archive = TaskArchive(self.workspace / "archive", self.storage.workflow)
+        return self._archive
+
+    @property
+    def search_index(self) -> SearchIndex:
+        if self._search_index is None or self._search_index.layout is not self.storage.layout:
+            self._search_index = SearchIndex(self.workspace / "search", self.storage.layout, self.storage.git)
+        return self._search_index
+
     def init_workspace(self):
         self.workspace.mkdir(exist_ok=True)
         self.tasks_dir.mkdir(exist_ok=True)
         self.task_counter_file.touch(exist_ok=True)
         with self.task_counter_file.open("w") as f:
             f.write("0")
+        ignore_local_files(self.workspace)
 
     def create_task(self, title: str, category: str, owner: str) -> int:
-        with self.task_counter_file.open("r+") as f:
-            counter = int(f.read())
-            f.seek(0)
-            f.write(str(counter + 1))
-            f.truncate()
-        task_id = counter + 1
-        task = Task(task_id, title, "", TaskPriority(PriorityLevel.MEDIUM), category, owner)
-        task_file = self.tasks_dir / f"{task.task_id}.md"
-        with task_file.open("w") as f:
-            f.write(task.to_string())
+        storage = self.storage
+        task_id = self._reserve_task_ids(1)
+        task = Task(task_id, title, "", TaskPriority(PriorityLevel.MEDIUM), category, owner,
+                    workflow=storage.workflow)
+        with trace.phase("storage.write"):
+            storage.write_task(task, new=True)
+            storage.flush()
         return task.task_id
 
     def move_task(self, task_id: int, board: str) -> Task:
-        task_file = self.tasks_dir / f"{Task.task_id_from_string(task_id)}.md"
-        try:
-            task_content = task_file.read_text()
-        except FileNotFoundError:
-            raise ValueError(f"Task {task_id} not found")
-        task = Task.from_string(task_content)
-        task.move_to_board(board)
-        with task_file.open("w") as f:
-            f.write(task.to_string())
+        task = self.storage.read_task(task_id)
+        timestamp = self._now()
+        task.move_to_board(board, timestamp)
+        self._save_change(task, Journal.BOARD, task.board.name, timestamp)
         return task
 
     def update_task_priority(self, task_id: int, priority: str):
-        task_file = self.tasks_dir / f"{Task.task_id_from_string(task_id)}.md"
-        try:
-            task_content = task_file.read_text()
-        except FileNotFoundError:
-            raise ValueError(f"Task {task_id} not found")
-        task = Task.from_string(task_content)
-        task.update_priority(TaskPriority.from_name(priority))
-        with task_file.open("w") as f:
-            f.write(task.to_string())
+        task = self.storage.read_task(task_id)
+        timestamp = self._now()
+        task.update_priority(TaskPriority.from_name(priority), timestamp)
+        self._save_change(task, Journal.PRIORITY, task.priority.name, timestamp)
 
     def update_task_category(self, task_id: int, category: str):
-        task_file = self.tasks_dir / f"{Task.task_id_from_string(task_id)}.md"
+        task = self.storage.read_task(task_id)
+        timestamp = self._now()
+        task.update_category(category, timestamp)
+        self._save_change(task, Journal.CATEGORY, task.category, timestamp)
+
+    def apply_operations(self, operations) -> list:
+        operations = list(operations)
+        results = [None] * len(operations)
+        creates = []
+        operations_by_task = {}
+        for i, operation in enumerate(operations):
+            if operation.error:
+                results[i] = OperationResult(operation, False, operation.error)
+            elif operation.op == Operation.CREATE:
+                creates.append(i)
+            else:
+                operations_by_task.setdefault(operation.task_id, []).append(i)
+        if creates:
+            first_task_id = self._reserve_task_ids(len(creates))
+            for task_id, i in enumerate(creates, start=first_task_id):
+                results[i] = self._apply_create(task_id, operations[i])
+        deleted = []
+        timestamp = self._now()
+        for task_id, indexes in operations_by_task.items():
+            try:
+                task = self.storage.read_task(task_id)
+            except ValueError as e:
+                for i in indexes:
+                    results[i] = OperationResult(operations[i], False, str(e))
+                continue
+            changed = is_deleted = False
+            for i in indexes:
+                results[i] = self._apply_operation(task, operations[i], timestamp, is_deleted)
+                if results[i].ok:
+                    changed = True
+                    is_deleted = is_deleted or operations[i].op == Operation.DELETE
+            if is_deleted:
+                deleted.append(task_id)
+            elif changed:
+                self.storage.write_task(task)
+        for task_id in deleted:
+            self.storage.delete_task(task_id)
+        self.storage.flush()
+        return results
+
+    def _apply_create(self, task_id: int, operation: Operation) -> OperationResult:
+        storage = self.storage
+        try:
+            task = Task(task_id, operation.title, "", TaskPriority(PriorityLevel.MEDIUM),
+                        operation.category, operation.owner, workflow=storage.workflow)
+        except ValueError as e:
+            return OperationResult(operation, False, str(e))
+        operation.task_id = task_id
         try:
-            task_content = task_file.read_text()
-        except FileNotFoundError:
-            raise ValueError(f"Task {task_id} not found")
-        task = Task.from_string(task_content)
-        task.update_category(category)
-        with task_file.open("w") as f:
-            f.write(task.to_string())
-
-    def list_tasks(self, board: str = None, category: str = None, priority: str = None):
+            storage.write_task(task, new=True)
+        except ValueError as e:
+            return OperationResult(operation, False, str(e))
+        return OperationResult(operation, True, f"Task created: {task.task_id}")
+
+    def _apply_operation(self, task: Task, operation: Operation, timestamp: datetime,
+                         deleted: bool) -> OperationResult:
+        if deleted:
+            return OperationResult(operation, False, f"Task {operation.task_id} not found")
+        try:
+            if operation.op == Operation.MOVE:
+                task.move_to_board(operation.board, timestamp)
+            elif operation.op == Operation.UPDATE:
+                priority = TaskPriority.from_name(operation.priority) if operation.priority else None
+                category = task.workflow.category(operation.category) if operation.category else None
+                if priority:
+                    task.update_priority(priority, timestamp)
+                if category:
+                    task.update_category(category, timestamp)
+        except ValueError as e:
+            return OperationResult(operation, False, str(e))
+        if operation.op == Operation.DELETE:
+            return OperationResult(operation, True, f"Deleted task {task.task_id_with_title}")
+        return OperationResult(operation, True, str(task))
+
+    def fold_journal(self) -> int:
+        return self.storage.fold()
+
+    def sync(self, jobs: int = None):
+        with trace.phase("storage.refresh"):
+            self.storage.refresh(jobs)
+            self.storage.flush()
+            # The search index is kept fresh once there is one, eg by the daemon or the git hooks.
+            if self._search_index is not None or (self.workspace / "search").exists():
+                self.search_index.refresh(jobs)
+                self.search_index.save()
+
+    def migrate_layout(self, shard_size: int, batch: int = None) -> tuple:
+        """Moves the task files to the layout with `shard_size`, 0 for a flat tasks directory.
+
+        New task files use the new layout right away and task files are found in both layouts
+        until every file was moved. At most `batch` files are moved per call, calling it
+        again resumes the migration. Returns the number of moved files and of files left.
+        """
+        if shard_size < 0:
+            raise ValueError(f"Invalid shard size: {shard_size}")
+        current_shard_size = self.config.layout_shard_size
+        previous_shard_size = self.config.layout_previous_shard_size
+        if shard_size != current_shard_size:
+            if previous_shard_size is not None and previous_shard_size != shard_size:
+                raise ValueError(f"The migration to shard size {current_shard_size} is not complete, "
+                                 f"run `task migrate-layout --shard-size {current_shard_size}` first")
+            self.config.set("layout", "previous_shard_size", current_shard_size)
+            self.config.set("layout", "shard_size", shard_size)
+            self._storage = None
+        moved, remaining = self.storage.layout.migrate(batch)
+        if not remaining and self.config.layout_previous_shard_size is not None:
+            self.config.set("layout", "previous_shard_size", None)
+            self._storage = None
+        return moved, remaining
+
+    def archive_tasks(self, before: datetime = None) -> list:
+        """Moves the tasks on the done board, only those finished before `before` when given, to the archive.
+
+        The archive is written before the task files are removed, a task that is in both
+        after an interruption is archived again by the next call. Returns the archived ids.
+        """
+        tasks = [task for task in self.iter_tasks(board=self.storage.workflow.done.name, sort=False)
+                 if before is None or self._finished_at(task) < before]
+        if not tasks:
+            return []
+        self.archive.write(tasks)
+        for task in tasks:
+            self.storage.delete_task(Task.task_num_from_id(task.task_id))
+        self.storage.flush()
+        return [task.task_id for task in tasks]
+
+    def restore_task(self, task_id: int) -> Task:
+        storage = self.storage
+        task = self.archive.read(task_id)
+        storage.write_task(task, new=True)
+        storage.flush()
+        self.archive.write(remove=[task_id])
+        return task
+
+    def list_tasks(self, board: str = None, category: str = None, priority: str = None, owner: str = None,
+                   query: str = None, jobs: int = None, archived: bool = False):
+        return list(self.iter_tasks(board=board, category=category, priority=priority, owner=owner, query=query,
+                                    jobs=jobs, archived=archived))
+
+    def iter_tasks(self, board: str = None, category: str = None, priority: str = None, owner: str = None,
+                   query: str = None, limit: int = None, offset: int = 0, sort: bool = True, jobs: int = None,
+                   archived: bool = False, order: str = None):
+        """The tasks matching the filters and the `query` expression, eg `priority<=Medium and owner=alice`.
+
+        They are sorted by `order`, eg `board,-priority,created`, or else by the default order
+        of the workspace unless `sort` is false.
+        """
+        where = self._where(board, category, priority, owner, query)
+        order = SortOrder.parse(order, self.storage.workflow) if order else None
+        if not archived:
+            return self.storage.query(where, limit=limit, offset=offset, sort=sort, jobs=jobs,
+                                      refresh=self.auto_refresh, order=order)
+        tasks = self.storage.query(where, sort=sort, jobs=jobs, refresh=self.auto_refresh, order=order)
+        # Archived tasks are all done, they are only read when the filters accept done tasks.
+        if where.accepts("board", self.storage.workflow.done.name):
+            archived_tasks = self.archive.query(where)
+            if sort:
+                # Sorted apart and merged into the tasks, which are already in the same order.
+                order = order or self.storage.default_order
+                key = lambda task: order.key(TaskIndex.entry_from_task(task))
+                tasks = heapq.merge(tasks, sorted(archived_tasks, key=key), key=key)
+            else:
+                tasks = chain(tasks, archived_tasks)
+        return islice(tasks, offset, None if limit is None else offset + limit)
+
+    def explain_query(self, board: str = None, category: str = None, priority: str = None, owner: str = None,
+                      query: str = None, archived: bool = False) -> list:
+        where = self._where(board, category, priority, owner, query)
+        lines = self.storage.explain(where)
+        if archived and where.accepts("board", self.storage.workflow.done.name):
+            lines.append(f"Archive: front matter scan of {len(self.archive)} archived tasks")
+        return lines
+
+    def search_tasks(self, text: str, board: str = None, category: str = None, priority: str = None,
+                     owner: str = None, limit: int = None, jobs: int = None) -> list:
+        """The tasks with every word of `text` in their title, description or notes, best matches first.
+
+        A word ending in `*` matches the words starting with it, eg `migr*`.
+        """
+        if self.auto_refresh or self._search_index is None:
+            self.search_index.refresh(jobs)
+            self.search_index.save()
+        scores = self.search_index.search(text)
+        ranked = sorted(scores, key=lambda task_num: (-scores[task_num], task_num))
+        where = self._where(board, category, priority, owner, None)
+        # Only the best matches are read from the storage, more of them while the filters leave
+        # fewer than `limit` tasks.
         tasks = []
-        for task_file in self.tasks_dir.iterdir():
-            task_content = task_file.read_text()
-            task = Task.from_string(task_content)
-            if board and task.board != board:
-                continue
-            if category and task._category != category:
-                continue
-            if priority and task._priority.name != priority:
-                continue
-            tasks.append(task)
-        return self._sort_tasks(tasks)
-    
-    def _sort_tasks(self, tasks):
-        board_sorting_order = {
-            Task.IN_PROGRESS: 0,
-            Task.BACK_LOG: 1,
-            Task.DONE: 2,
+        start = 0
+        batch = len(ranked) if limit is None else limit
+        refresh = self.auto_refresh
+        while start < len(ranked) and (limit is None or len(tasks) < limit):
+            task_nums = ranked[start:start + batch]
+            where_ids = where.and_(TaskQuery.from_ids(task_nums, self.storage.workflow))
+            tasks.extend(self.storage.query(where_ids, sort=False, jobs=jobs, refresh=refresh))
+            start += batch
+            batch *= 4
+            refresh = False
+        tasks.sort(key=lambda task: (-scores[task._task_id], task._task_id))
+        return tasks[:limit]
+
+    def summarize(self, by: list = None, board: str = None, category: str = None, priority: str = None,
+                  owner: str = None) -> dict:
+        """The number of tasks per board, category, priority and owner, or a pivot table of the two `by` fields.
+
+        The tasks are not read, they are counted from the counts the storage updates with every change.
+        """
+        workflow = self.storage.workflow
+        filters = {
+            "board": workflow.board(board).name if board else None,
+            "category": workflow.category(category) if category else None,
+            "priority": TaskPriority.from_name(priority).name if priority else None,
+            "owner": owner,
         }
-        sorted_tasks = sorted(tasks, key=lambda task: board_sorting_order[task.board]*-1)
-        return sorted_tasks
+        return summarize(self.storage.counts(refresh=self.auto_refresh), workflow, by, filters)
 
-    
     def delete_task(self, task_id: int):
-        task_file = self.tasks_dir / f"{Task.task_id_from_string(task_id)}.md"
-        try:
-            task = Task.from_string(task_file.read_text())
-            task_file.unlink()
-            return task.task_id_with_title
-        except FileNotFoundError:
-            raise ValueError(f"Task {task_id} not found")
-        
+        task = self.storage.delete_task(task_id)
+        self.storage.flush()
+        return task.task_id_with_title
+
     def task_location(self, task_id: int):
-        task_file = self.tasks_dir / f"{Task.task_id_from_string(task_id)}.md"
-        try:
-            task = Task.from_string(task_file.read_text())
-            return task_file
-        except FileNotFoundError:
-            raise ValueError(f"Task {task_id} not found")
+        return self.storage.task_location(task_id)
+
+    def close(self):
+        if self._storage is not None:
+            self._storage.close()
+            self._storage = None
+
+    def _reserve_task_ids(self, count: int) -> int:
+        with trace.phase("id.reserve"):
+            return self.id_allocator.reserve(count)
+
+    def _save_change(self, task: Task, field: str, value: str, timestamp: datetime):
+        with trace.phase("storage.save_change"):
+            self.storage.save_change(task, field, value, timestamp)
+            self.storage.flush()
+
+    def _now(self) -> datetime:
+        return datetime.now().replace(microsecond=0)
+
+    def _where(self, board: str, category: str, priority: str, owner: str, query: str) -> TaskQuery:
+        # Board and category values are checked against the workflow of this workspace.
+        workflow = self.storage.workflow
+        where = TaskQuery.from_filters(workflow, board=board, category=category, priority=priority, owner=owner)
+        return where.and_(TaskQuery.parse(query, workflow)) if query else where
+
+    @staticmethod
+    def _finished_at(task: Task) -> datetime:
+        for entry in reversed(task.history):
+            if entry.action == f"Moved to {task.workflow.done.name}":
+                return entry.timestamp
+        return task.created
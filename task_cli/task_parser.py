@@ -0,0 +1,125 @@
+from datetime import datetime
+from pathlib import Path
+
+from task_cli import trace
+
+_delimiter = "---"
+_header_keys = frozenset(("id", "title", "created", "priority", "category", "owner", "board"))
+_sections = {"## Description": 0, "## Notes": 1, "## History": 2}
+
+# Values YAML would turn into something other than a plain string, these go
+# through the full YAML parser.
+_yaml_indicators = frozenset("'\"[]{}&*!|>%@`#,?-+.0123456789")
+_yaml_keywords = frozenset(("null", "~", "true", "false", "yes", "no", "on", "off"))
+
+_read_chunk_size = 4096
+
+
+def parse_timestamp(value: str) -> datetime:
+    if (len(value) == 19 and value[4] == "-" and value[7] == "-" and value[10] == " "
+            and value[13] == ":" and value[16] == ":" and value.isascii()):
+        return datetime.fromisoformat(value)
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+
+def parse_front_matter(task_str: str) -> tuple[dict, str]:
+    metadata, header_end = _parse_header_fast(task_str)
+    if metadata is None:
+        return _parse_front_matter_yaml(task_str)
+    return metadata, task_str[header_end + len(_delimiter) + 1:].strip()
+
+
+def parse_header(task_str: str) -> dict:
+    metadata, _ = _parse_header_fast(task_str)
+    if metadata is None:
+        return _parse_front_matter_yaml(task_str)[0]
+    return metadata
+
+
+def read_header(task_file: Path) -> dict:
+    with task_file.open() as f:
+        task_str = f.read(_read_chunk_size)
+        while _find_header_end(task_str) == -1:
+            chunk = f.read(_read_chunk_size)
+            if not chunk:
+                break
+            task_str += chunk
+    if _find_header_end(task_str) == -1:
+        return parse_header(task_file.read_text())
+    return parse_header(task_str)
+
+
+def parse_body(content: str) -> tuple[str, str, str]:
+    sections = ([], [], [])
+    seen = 0
+    current = None
+    for line in content.split("\n"):
+        section = _sections.get(line.rstrip())
+        if section is not None:
+            current = sections[section]
+            seen |= 1 << section
+        elif current is not None:
+            current.append(line)
+    if seen != 0b111:
+        raise ValueError("Invalid task body, expected Description, Notes and History sections")
+    description, notes, history = ("\n".join(lines).strip() for lines in sections)
+    return description, notes, history
+
+
+def _find_header_end(task_str: str) -> int:
+    if not task_str.startswith(_delimiter + "\n"):
+        return -1
+    position = len(_delimiter)
+    while True:
+        position = task_str.find("\n" + _delimiter, position)
+        if position == -1:
+            return -1
+        after = position + len(_delimiter) + 1
+        if after == len(task_str) or task_str[after] == "\n":
+            return position
+        position = after
+
+
+def _parse_header_fast(task_str: str):
+    header_end = _find_header_end(task_str)
+    if header_end == -1:
+        return None, header_end
+    return _parse_header_lines(task_str[len(_delimiter) + 1:header_end]), header_end
+
+
+def _parse_header_lines(header: str):
+    metadata = {}
+    for line in header.split("\n"):
+        key, separator, value = line.partition(": ")
+        if not separator:
+            key, separator, value = line.partition(":")
+            if not separator or value:
+                return None
+        if key not in _header_keys or key in metadata:
+            return None
+        if key == "created":
+            try:
+                metadata[key] = parse_timestamp(value)
+            except ValueError:
+                return None
+            continue
+        if not value:
+            metadata[key] = None
+            continue
+        if (value[0] in _yaml_indicators or value.lower() in _yaml_keywords
+                or ": " in value or " #" in value or "\t" in value or value != value.strip()
+                or value.endswith(":")):
+            return None
+        metadata[key] = value
+    if len(metadata) != len(_header_keys):
+        return None
+    return metadata
+
+
+def _parse_front_matter_yaml(task_str: str) -> tuple[dict, str]:
+    import frontmatter
+
+    trace.count("yaml_fallbacks")
+    with trace.phase("parse.yaml"):
+        task = frontmatter.loads(task_str)
+    return task.metadata, task.content
@@ -11,7 +11,7 @@ class PriorityLevel(Enum):
     def display_name(self):
         return self.name.capitalize()
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TaskPriority:
     level: PriorityLevel
 
@@ -27,7 +27,7 @@ class TaskPriority:
     def from_numeric_value(cls, value: int):
         try:
             priority_level = PriorityLevel(value)
-            return cls(level=priority_level)
+            return _priorities[priority_level]
         except ValueError:
             raise ValueError(f"Invalid priority value: {value}")
     
@@ -35,6 +35,10 @@ class TaskPriority:
     def from_name(cls, name: str):
         try:
             priority_level = PriorityLevel[name.upper()]
-            return cls(level=priority_level)
+            return _priorities[priority_level]
         except KeyError:
-            raise ValueError(f"Invalid priority name: {name}")
\ No newline at end of file
+            raise ValueError(f"Invalid priority name: {name}")
+
+
+# Priorities are immutable, every task shares the instance of its level.
+_priorities = {level: TaskPriority(level) for level in PriorityLevel}
\ No newline at end of file
@@ -0,0 +1,109 @@
+import time
+from _thread import get_ident
+from collections import Counter
+
+# Per-phase timings and counters of a command, enabled by `task --profile` or the
+# TASK_CLI_TRACE environment variable. While disabled `phase` returns a shared no-op
+# context manager and `count` returns right away, call sites in hot loops check
+# `trace.enabled` first.
+
+enabled = False
+
+_spans = []
+_counters = Counter()
+_origin = 0
+
+
+class _Phase:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        _spans.append((self.name, self.start, time.perf_counter_ns(), get_ident()))
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_no_phase = _NoPhase()
+
+
+def enable():
+    global enabled, _origin
+    _spans.clear()
+    _counters.clear()
+    _origin = time.perf_counter_ns()
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def phase(name: str):
+    """Times the `with` block as one call of the phase, phases may be nested."""
+    return _Phase(name) if enabled else _no_phase
+
+
+def count(name: str, value: int = 1):
+    if enabled:
+        _counters[name] += value
+
+
+def summary() -> dict:
+    """The calls and the total time of every phase, in the order they first started, and the counters."""
+    phases = {}
+    for name, start, end, _ in sorted(_spans, key=lambda span: span[1]):
+        calls, total = phases.get(name, (0, 0))
+        phases[name] = (calls + 1, total + end - start)
+    return {
+        "total_ms": round((time.perf_counter_ns() - _origin) / 1e6, 3),
+        "phases": {name: {"calls": calls, "total_ms": round(total / 1e6, 3)} for name, (calls, total) in phases.items()},
+        "counters": dict(_counters),
+    }
+
+
+def format_summary(result: dict = None) -> list:
+    result = result or summary()
+    lines = [f"{'Phase':<24}{'Calls':>10}{'Total ms':>12}"]
+    for name, timing in result["phases"].items():
+        lines.append(f"{name:<24}{timing['calls']:>10}{timing['total_ms']:>12.3f}")
+    lines.append(f"{'total':<24}{'':>10}{result['total_ms']:>12.3f}")
+    if result["counters"]:
+        lines.append("")
+        lines.append(f"{'Counter':<24}{'Value':>22}")
+        for name, value in sorted(result["counters"].items()):
+            lines.append(f"{name:<24}{value:>22}")
+    return lines
+
+
+def chrome_trace() -> dict:
+    """The phases as complete events of the Chrome trace format, with the summary as metadata.
+
+    The file opens in chrome://tracing or https://ui.perfetto.dev.
+    """
+    events = [{"name": name, "ph": "X", "pid": 1, "tid": thread,
+               "ts": (start - _origin) / 1000, "dur": (end - start) / 1000}
+              for name, start, end, thread in _spans]
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": summary()}
+
+
+def write(path: str):
+    import json
+
+    with open(path, "w") as f:
+        json.dump(chrome_trace(), f)
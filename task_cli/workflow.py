@@ -0,0 +1,79 @@
+from task_cli.board import Board
+
+DEFAULT_BOARDS = "Backlog (BL), In Progress (IP), Done (DN)"
+DEFAULT_CATEGORIES = "Bug, Feature, Documentation, Maintenance, UI/UX, Security"
+
+
+class Workflow:
+    """The boards and categories of a workspace, compiled into case-folded lookup tables.
+
+    Boards are in workflow order: new tasks start on the first board, cycle time starts on
+    the `start` board and tasks on the `done` board are finished. Boards from `start` up to
+    `done` are work in progress. `task list` shows the boards in `list_order`, by default
+    the done board first and then the others in workflow order.
+    """
+
+    def __init__(self, boards: list, categories: list, start: str = None, done: str = None, list_order: list = None):
+        if not boards:
+            raise ValueError("No boards")
+        if not categories:
+            raise ValueError("No categories")
+        self.boards = boards
+        self.categories = categories
+        self.board_lookup = Board.lookup_table(boards)
+        self.category_lookup = {}
+        for category in categories:
+            if self.category_lookup.setdefault(category.casefold(), category) != category:
+                raise ValueError(f"Duplicate category: {category}")
+        self.initial = boards[0]
+        self.start = self.board(start) if start else boards[min(1, len(boards) - 1)]
+        self.done = self.board(done) if done else boards[-1]
+        first, last = boards.index(self.start), boards.index(self.done)
+        self.in_progress = boards[first:last] if first < last else [self.start]
+        if list_order:
+            ordered = [self.board(name) for name in list_order]
+            missing = [board.name for board in boards if board not in ordered]
+            if missing or len(ordered) != len(boards):
+                raise ValueError(f"The list order has to name every board once, missing: {missing}")
+        else:
+            ordered = [self.done] + [board for board in boards if board is not self.done]
+        self.sort_order = {board.name: position for position, board in enumerate(ordered)}
+
+    @classmethod
+    def parse(cls, boards: str = DEFAULT_BOARDS, categories: str = DEFAULT_CATEGORIES, start: str = None,
+              done: str = None, list_order: str = None):
+        """The workflow of comma separated option values, boards are `Name (ACRONYM)` or just `Name`."""
+        return cls([Board.from_string(board) for board in _split(boards)], _split(categories), start, done,
+                   _split(list_order) if list_order else None)
+
+    def board(self, name: str) -> Board:
+        """The board with this name or acronym, whatever its case."""
+        if isinstance(name, Board):
+            name = name.name
+        board = self.board_lookup.get(name.casefold()) if isinstance(name, str) else None
+        if board is None:
+            raise ValueError(f"Invalid board: {name}, allowed boards: {self.boards}")
+        return board
+
+    def category(self, name: str) -> str:
+        # The shared category string is kept, not the one that was parsed.
+        category = self.category_lookup.get(name.casefold()) if isinstance(name, str) else None
+        if category is None:
+            raise ValueError(f"Invalid category: {name}, allowed categories: {self.categories}")
+        return category
+
+
+# Workflows are compiled once per process for each distinct set of options.
+_compiled = {}
+
+
+def compile_workflow(**options) -> Workflow:
+    key = tuple(sorted(options.items()))
+    workflow = _compiled.get(key)
+    if workflow is None:
+        workflow = _compiled[key] = Workflow.parse(**options)
+    return workflow
+
+
+def _split(value: str) -> list:
+    return [item.strip() for item in value.split(",") if item.strip()]
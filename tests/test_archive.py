@@ -0,0 +1,136 @@
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from task_cli.archive import TaskArchive
+from task_cli.query import TaskQuery
+from task_cli.task import Task
+from task_cli.task_manager import TaskManager
+from task_cli.task_priority import TaskPriority
+
+
+class TaskArchiveTests(unittest.TestCase):
+    def _task(self, task_id, category="Feature"):
+        task = Task(task_id, f"Test Task {task_id}", f"Description {task_id}", TaskPriority.from_name("High"),
+                    category, "Test User", created=datetime(2024, 1, 1))
+        task.move_to_board(Task.DONE.name, datetime(2024, 1, 2))
+        return task
+
+    def test_write_and_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = TaskArchive(Path(tmp) / "archive")
+            tasks = [self._task(3), self._task(1, "Bug")]
+            archive.write(tasks)
+            self.assertEqual(len(archive), 2)
+            self.assertEqual(archive.task_ids(), ["TASK-1", "TASK-3"])
+            self.assertIn(3, archive)
+            self.assertNotIn(2, archive)
+            self.assertEqual(archive.read(3).to_string(), tasks[0].to_string())
+            with self.assertRaises(ValueError):
+                archive.read(2)
+
+    def test_query_decodes_only_the_needed_bodies(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = TaskArchive(Path(tmp) / "archive")
+            archive.write([self._task(1), self._task(2, "Bug"), self._task(3)])
+            tasks = list(TaskArchive(archive.archive_file).query(TaskQuery.parse("category=Feature")))
+            self.assertEqual([task.task_id for task in tasks], ["TASK-1", "TASK-3"])
+            self.assertEqual(tasks[1].description, "Description 3")
+            self.assertEqual(tasks[1].history[-1].action, "Moved to Done")
+
+    def test_rewrite_keeps_and_removes_records(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = TaskArchive(Path(tmp) / "archive")
+            archive.write([self._task(1), self._task(2)])
+            other = TaskArchive(archive.archive_file)
+            other.write([self._task(5)], remove=[1])
+            # The first archive maps the file again after it was replaced.
+            self.assertEqual(archive.task_ids(), ["TASK-2", "TASK-5"])
+            self.assertEqual(archive.read(2).description, "Description 2")
+            archive.write(remove=[2, 5])
+            self.assertFalse(archive.archive_file.exists())
+            self.assertEqual(len(archive), 0)
+
+    def test_invalid_archive(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive_file = Path(tmp) / "archive"
+            archive_file.write_bytes(b"not an archive")
+            with self.assertRaises(ValueError):
+                len(TaskArchive(archive_file))
+
+
+class ArchiveWorkspaceTests(unittest.TestCase):
+    def _task_manager(self, tmp, engine="files"):
+        task_manager = TaskManager(tmp)
+        task_manager.init_workspace()
+        (task_manager.workspace / "config").write_text(f"[storage]\nengine = {engine}\n")
+        for i in range(5):
+            task_manager.create_task(f"Test Task {i + 1}", "Bug" if i % 2 else "Feature", "Test User")
+        return task_manager
+
+    def test_archive_and_restore(self):
+        for engine in ["files", "sqlite"]:
+            with self.subTest(engine=engine), tempfile.TemporaryDirectory() as tmp:
+                task_manager = self._task_manager(tmp, engine)
+                for task_id in (1, 2, 4):
+                    task_manager.move_task(task_id, Task.DONE.name)
+                done = [task.to_string() for task in task_manager.list_tasks(board="dn")]
+
+                self.assertEqual(TaskManager(tmp).archive_tasks(), ["TASK-1", "TASK-2", "TASK-4"])
+                self.assertFalse((task_manager.tasks_dir / "TASK-1.md").exists())
+                task_manager = TaskManager(tmp)
+                self.assertEqual([task.title for task in task_manager.list_tasks()], ["Test Task 3", "Test Task 5"])
+                self.assertEqual(task_manager.list_tasks(board="dn"), [])
+                archived = task_manager.list_tasks(board="dn", archived=True)
+                self.assertEqual([task.to_string() for task in archived], done)
+                self.assertEqual([task.title for task in task_manager.list_tasks(category="Bug", archived=True)],
+                                 ["Test Task 2", "Test Task 4"])
+                # Archived tasks are in the default order too, where Done comes first.
+                self.assertEqual([task.title for task in task_manager.iter_tasks(archived=True)],
+                                 ["Test Task 1", "Test Task 2", "Test Task 4", "Test Task 3", "Test Task 5"])
+                self.assertEqual([task.title for task in task_manager.iter_tasks(archived=True, offset=1, limit=2)],
+                                 ["Test Task 2", "Test Task 4"])
+                self.assertEqual([task.title for task in task_manager.iter_tasks(archived=True, order="-id", limit=2)],
+                                 ["Test Task 5", "Test Task 4"])
+                with self.assertRaises(ValueError):
+                    task_manager.move_task(2, Task.BACK_LOG.name)
+
+                self.assertEqual(task_manager.restore_task(2).title, "Test Task 2")
+                self.assertEqual(TaskManager(tmp).archive.task_ids(), ["TASK-1", "TASK-4"])
+                task_manager = TaskManager(tmp)
+                task_manager.move_task(2, Task.BACK_LOG.name)
+                self.assertEqual(sorted(task.title for task in task_manager.list_tasks(board="bl")),
+                                 ["Test Task 2", "Test Task 3", "Test Task 5"])
+                with self.assertRaises(ValueError):
+                    task_manager.restore_task(2)
+
+    def test_archive_before(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            with mock.patch.object(TaskManager, "_now", return_value=datetime(2024, 1, 1)):
+                task_manager.move_task(1, Task.DONE.name)
+            with mock.patch.object(TaskManager, "_now", return_value=datetime(2024, 3, 1)):
+                task_manager.move_task(2, Task.DONE.name)
+            self.assertEqual(TaskManager(tmp).archive_tasks(before=datetime(2024, 2, 1)), ["TASK-1"])
+            self.assertEqual([task.title for task in TaskManager(tmp).list_tasks(board="dn")], ["Test Task 2"])
+            self.assertEqual(TaskManager(tmp).archive_tasks(before=datetime(2024, 2, 1)), [])
+
+    def test_journaled_changes_are_archived(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            (task_manager.workspace / "config").write_text("[journal]\nenabled = true\n")
+            task_manager = TaskManager(tmp)
+            task_manager.move_task(3, Task.DONE.name)
+            task_manager.update_task_priority(3, "High")
+            self.assertEqual(TaskManager(tmp).archive_tasks(), ["TASK-3"])
+            task = TaskManager(tmp).archive.read(3)
+            self.assertEqual(task.priority.name, "High")
+            self.assertEqual(task.history[-1].action, "Priority updated to High")
+            self.assertEqual(TaskManager(tmp).restore_task(3).board, Task.DONE)
+            self.assertEqual([task.priority.name for task in TaskManager(tmp).list_tasks(board="dn")], ["High"])
+
+
+if __name__ == "__main__":
+    unittest.main()
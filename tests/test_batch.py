@@ -0,0 +1,157 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from task_cli.batch import Operation, parse_operations
+from task_cli.task import Task
+from task_cli.task_manager import TaskManager
+
+
+class ParseOperationsTests(unittest.TestCase):
+    def test_parse_ndjson(self):
+        lines = [
+            '{"op": "move", "task_id": 3, "board": "ip"}\n',
+            "\n",
+            '{"op": "update", "task_id": "TASK-4", "priority": "High"}\n',
+        ]
+        operations = list(parse_operations(lines))
+        self.assertEqual(len(operations), 2)
+        self.assertEqual(operations[0].op, Operation.MOVE)
+        self.assertEqual(operations[0].task_id, 3)
+        self.assertEqual(operations[0].board, "ip")
+        self.assertEqual(operations[1].task_id, 4)
+        self.assertEqual(operations[1].line, 3)
+
+    def test_parse_csv(self):
+        lines = [
+            "op,task_id,board,priority,category,title\n",
+            "create,,,,Bug,New task\n",
+            "update,2,,,Bug,\n",
+        ]
+        operations = list(parse_operations(lines, "csv"))
+        self.assertEqual(operations[0].op, Operation.CREATE)
+        self.assertEqual(operations[0].title, "New task")
+        self.assertEqual(operations[0].category, "Bug")
+        self.assertEqual(operations[1].task_id, 2)
+        self.assertIsNone(operations[1].priority)
+        self.assertIsNone(operations[1].error)
+
+    def test_parse_invalid_operations(self):
+        lines = [
+            "not json\n",
+            '{"op": "rename", "task_id": 1}\n',
+            '{"op": "move", "task_id": "abc", "board": "ip"}\n',
+            '{"op": "move", "task_id": 1}\n',
+            '{"op": "create"}\n',
+            '{"op": "update", "task_id": 1}\n',
+        ]
+        operations = list(parse_operations(lines))
+        self.assertTrue(all(operation.error for operation in operations))
+
+    def test_parse_invalid_format_raises_exception(self):
+        with self.assertRaises(ValueError):
+            parse_operations([], "xml")
+
+
+class ApplyOperationsTests(unittest.TestCase):
+    def test_apply_operations(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Feature", "Test User")
+            results = task_manager.apply_operations(parse_operations([
+                '{"op": "move", "task_id": 1, "board": "ip"}',
+                '{"op": "create", "title": "Test Task 3", "category": "Bug"}',
+                '{"op": "update", "task_id": 1, "priority": "High", "category": "Bug"}',
+                '{"op": "delete", "task_id": 2}',
+            ]))
+            self.assertTrue(all(result.ok for result in results))
+            tasks = {task.title: task for task in task_manager.list_tasks()}
+            self.assertEqual(set(tasks), {"Test Task", "Test Task 3"})
+            self.assertEqual(tasks["Test Task"].board, Task.IN_PROGRESS)
+            self.assertEqual(tasks["Test Task"].priority.name, "High")
+            self.assertEqual(tasks["Test Task"].category, "Bug")
+            self.assertEqual(tasks["Test Task 3"].task_id, "TASK-3")
+            self.assertFalse((task_manager.tasks_dir / "TASK-2.md").exists())
+
+    def test_apply_operations_with_sqlite_storage(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            (task_manager.workspace / "config").write_text("[storage]\nengine = sqlite\n")
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            results = task_manager.apply_operations(parse_operations([
+                '{"op": "move", "task_id": 1, "board": "ip"}',
+                '{"op": "update", "task_id": 1, "priority": "High"}',
+                '{"op": "create", "title": "Test Task 2", "category": "Bug"}',
+            ]))
+            self.assertTrue(all(result.ok for result in results))
+            task = TaskManager(tmp).storage.read_task(1)
+            self.assertEqual((task.board, task.priority.name), (Task.IN_PROGRESS, "High"))
+            self.assertEqual([entry.action for entry in task.history],
+                             ["Created", "Moved to In Progress", "Priority updated to High"])
+            self.assertIn("board: In Progress", (task_manager.tasks_dir / "TASK-1.md").read_text())
+            self.assertEqual(len(TaskManager(tmp).list_tasks(category="Bug")), 1)
+
+    def test_apply_operations_reads_and_writes_each_task_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            with mock.patch.object(task_manager.storage, "_write_task_file", wraps=task_manager.storage._write_task_file) as write, \
+                    mock.patch.object(task_manager.storage.index, "save", wraps=task_manager.storage.index.save) as save:
+                task_manager.apply_operations(parse_operations([
+                    '{"op": "move", "task_id": 1, "board": "ip"}',
+                    '{"op": "update", "task_id": 1, "priority": "High"}',
+                    '{"op": "move", "task_id": 1, "board": "dn"}',
+                ]))
+            self.assertEqual(write.call_count, 1)
+            self.assertEqual(save.call_count, 1)
+            content = (task_manager.tasks_dir / "TASK-1.md").read_text()
+            self.assertIn("board: Done", content)
+            self.assertIn("- Moved to In Progress", content)
+
+    def test_apply_operations_reserves_ids_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            with mock.patch.object(task_manager, "_reserve_task_ids", wraps=task_manager._reserve_task_ids) as reserve:
+                results = task_manager.apply_operations(parse_operations(
+                    [f'{{"op": "create", "title": "Test Task {i}"}}' for i in range(5)]))
+            self.assertEqual(reserve.call_count, 1)
+            self.assertEqual([result.operation.task_id for result in results], [1, 2, 3, 4, 5])
+            self.assertEqual(task_manager.task_counter_file.read_text(), "5")
+
+    def test_apply_operations_reports_failures_in_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            results = task_manager.apply_operations(parse_operations([
+                '{"op": "move", "task_id": 1, "board": "Invalid Board"}',
+                '{"op": "move", "task_id": 7, "board": "ip"}',
+                '{"op": "delete", "task_id": 1}',
+                '{"op": "move", "task_id": 1, "board": "ip"}',
+                '{"op": "create", "title": "Test Task 2", "category": "Invalid Category"}',
+                'not json',
+            ]))
+            self.assertEqual([result.ok for result in results], [False, False, True, False, False, False])
+            self.assertEqual([result.operation.line for result in results], [1, 2, 3, 4, 5, 6])
+            self.assertFalse((task_manager.tasks_dir / "TASK-1.md").exists())
+
+    def test_apply_operations_keeps_journal_of_unchanged_tasks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            (task_manager.workspace / "config").write_text("[journal]\nenabled = true\n")
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Feature", "Test User")
+            task_manager.move_task(1, "ip")
+            task_manager.move_task(2, "ip")
+            task_manager.apply_operations(parse_operations([
+                '{"op": "move", "task_id": 1, "board": "dn"}',
+                '{"op": "move", "task_id": 2, "board": "Invalid Board"}',
+            ]))
+            self.assertIn("board: Done", (task_manager.tasks_dir / "TASK-1.md").read_text())
+            self.assertEqual(set(task_manager.storage.journal.events), {"TASK-2"})
@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+
+from benchmarks import memory, run
+from benchmarks.workspace_generator import generate_workspace
+from task_cli.task_manager import TaskManager
+
+
+class WorkspaceGeneratorTests(unittest.TestCase):
+    def test_generate_workspace_creates_tasks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_workspace(tmp, 20)
+            task_manager = TaskManager(tmp)
+            self.assertEqual(len(task_manager.list_tasks()), 20)
+            self.assertEqual(task_manager.task_counter_file.read_text(), "20")
+
+    def test_generate_workspace_distributions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_workspace(tmp, 10, boards={"In Progress": 1}, priorities={"Low": 1}, categories={"Security": 1})
+            tasks = TaskManager(tmp).list_tasks(board="ip", priority="Low", category="Security")
+            self.assertEqual(len(tasks), 10)
+
+    def test_generate_workspace_history_and_body_size(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_workspace(tmp, 5, history_length=12, body_size=1000)
+            for task in TaskManager(tmp).list_tasks():
+                self.assertEqual(len(task.history), 12)
+                self.assertGreaterEqual(len(task.description), 1000)
+                self.assertEqual(task.history[-1].action, f"Moved to {task.board.name}")
+
+    def test_generate_workspace_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as other_tmp:
+            generate_workspace(tmp, 5, seed=3)
+            generate_workspace(other_tmp, 5, seed=3)
+            first = [task.to_string() for task in TaskManager(tmp).list_tasks()]
+            second = [task.to_string() for task in TaskManager(other_tmp).list_tasks()]
+            self.assertEqual(first, second)
+
+
+class BenchmarkRunTests(unittest.TestCase):
+    def test_run_every_scenario(self):
+        results = run.run([10], repeat=2)
+        self.assertEqual([result["scenario"] for result in results["results"]], list(run.SCENARIOS))
+        self.assertTrue(all(result["median"] > 0 for result in results["results"]))
+
+    def test_run_sqlite_engine(self):
+        results = run.run([10], repeat=1, scenarios=["list_board", "move"], engines=["files", "sqlite"])
+        self.assertEqual([(result["scenario"], result["engine"]) for result in results["results"]],
+                         [("list_board", "files"), ("move", "files"), ("list_board", "sqlite"), ("move", "sqlite")])
+
+    def test_memory_measure(self):
+        result = memory.measure(10, history_length=3)
+        self.assertEqual(result["tasks"], 10)
+        self.assertGreater(result["bytes_per_task"], 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": [{"scenario": "list", "tasks": 10, "median": 1.0},
+                                {"scenario": "move", "tasks": 10, "median": 1.0}]}
+        results = {"results": [{"scenario": "list", "tasks": 10, "median": 2.0},
+                               {"scenario": "move", "tasks": 10, "median": 1.1},
+                               {"scenario": "create", "tasks": 10, "median": 1.0}]}
+        comparison = run.compare(results, baseline, threshold=1.25)
+        self.assertEqual([(row["scenario"], row["regression"]) for row in comparison],
+                         [("list", True), ("move", False)])
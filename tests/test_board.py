@@ -25,4 +25,22 @@ class BoardTests(unittest.TestCase):
     def test_board_from_allowed_boards(self):
         board = Board.from_allowed_boards("In Progress", 
                                           allowed_boards=[Board("In Progress", "IP"), Board("Done", "DN")])
-        self.assertEqual(board, Board("In Progress", "IP"))
\ No newline at end of file
+        self.assertEqual(board, Board("In Progress", "IP"))
+
+    def test_board_from_allowed_boards_lookup_table(self):
+        lookup = Board.lookup_table([Board("In Progress", "IP"), Board("Done", "DN")])
+        self.assertEqual(Board.from_allowed_boards("ip", lookup), Board("In Progress", "IP"))
+        self.assertEqual(Board.from_allowed_boards("DONE", lookup), Board("Done", "DN"))
+        with self.assertRaises(ValueError):
+            Board.from_allowed_boards("Review", lookup)
+
+    def test_board_lookup_table_rejects_duplicates(self):
+        with self.assertRaises(ValueError):
+            Board.lookup_table([Board("Review", "RV"), Board("Rv", "R")])
+
+    def test_board_from_string(self):
+        self.assertEqual(Board.from_string(" In Progress (IP) "), Board("In Progress", "IP"))
+        board = Board.from_string("Blocked")
+        self.assertEqual((board.name, board.acronym), ("Blocked", "Blocked"))
+        with self.assertRaises(ValueError):
+            Board.from_string("Review (RV")
@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from task_cli.config import WorkspaceConfig
+
+
+class WorkspaceConfigTests(unittest.TestCase):
+    def test_defaults_without_config_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = WorkspaceConfig(Path(tmp) / "config")
+            self.assertFalse(config.journal_enabled)
+            self.assertEqual(config.journal_fold_threshold, 500)
+
+    def test_reads_journal_options(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = Path(tmp) / "config"
+            config_file.write_text("[journal]\nenabled = yes\nfold_threshold = 10\n")
+            config = WorkspaceConfig(config_file)
+            self.assertTrue(config.journal_enabled)
+            self.assertEqual(config.journal_fold_threshold, 10)
+
+    def test_storage_engine(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = Path(tmp) / "config"
+            self.assertEqual(WorkspaceConfig(config_file).storage_engine, WorkspaceConfig.FILES)
+            config_file.write_text("[storage]\nengine = sqlite\n")
+            self.assertEqual(WorkspaceConfig(config_file).storage_engine, WorkspaceConfig.SQLITE)
+            config_file.write_text("[storage]\nengine = postgres\n")
+            with self.assertRaises(ValueError):
+                WorkspaceConfig(config_file).storage_engine
+
+    def test_refresh_git(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = Path(tmp) / "config"
+            self.assertIsNone(WorkspaceConfig(config_file).refresh_git)
+            config_file.write_text("[refresh]\ngit = false\n")
+            self.assertFalse(WorkspaceConfig(config_file).refresh_git)
+            config_file.write_text("[refresh]\ngit = sometimes\n")
+            with self.assertRaises(ValueError):
+                WorkspaceConfig(config_file).refresh_git
+
+    def test_invalid_value_raises_exception(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = Path(tmp) / "config"
+            config_file.write_text("[journal]\nenabled = maybe\n")
+            with self.assertRaises(ValueError):
+                WorkspaceConfig(config_file).journal_enabled
+
+    def test_invalid_syntax_raises_exception(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = Path(tmp) / "config"
+            config_file.write_text("enabled = true\n")
+            with self.assertRaises(ValueError):
+                WorkspaceConfig(config_file).journal_enabled
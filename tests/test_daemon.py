@@ -0,0 +1,157 @@
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from task_cli import daemon_client
+from task_cli.daemon import TaskDaemon
+from task_cli.daemon_client import DaemonError, DaemonUnavailable, request, socket_path
+from task_cli.task import Task
+from task_cli.task_manager import TaskManager
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "the task daemon needs unix sockets")
+class TaskDaemonTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root_dir = self.tmp.name
+        TaskManager(self.root_dir).init_workspace()
+        self.daemon = TaskDaemon(self.root_dir, poll_interval=0.05)
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        for _ in range(100):
+            if socket_path(self.root_dir).exists():
+                break
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.thread.join(timeout=5)
+        self.tmp.cleanup()
+
+    def test_ping(self):
+        self.assertIsInstance(request("ping", self.root_dir), int)
+
+    def test_create_move_update_and_list(self):
+        task_id = request("create", self.root_dir, title="Daemon task", category="Feature", owner="alice")
+        task_num = Task.task_num_from_id(task_id)
+        moved = request("move", self.root_dir, task_id=task_num, board="ip")
+        self.assertEqual(moved, {"task_id": task_id, "title": "Daemon task", "board": "In Progress"})
+        request("update_priority", self.root_dir, task_id=task_num, priority="High")
+        request("update_category", self.root_dir, task_id=task_num, category="Bug")
+
+        lines = request("list", self.root_dir, board="ip")
+        self.assertEqual(len(lines), 1)
+        self.assertIn("Daemon task", lines[0])
+        summary = request("summary", self.root_dir, by=["board", "priority"], category="bug")
+        self.assertEqual(summary["pivot"]["In Progress"]["High"], 1)
+        task = TaskManager(self.root_dir).list_tasks()[0]
+        self.assertEqual((task.board.name, task.priority.name, task.category),
+                         ("In Progress", "High", "Bug"))
+
+    def test_errors_are_raised_as_value_errors(self):
+        with self.assertRaises(ValueError):
+            request("move", self.root_dir, task_id=42, board="ip")
+        with self.assertRaises(ValueError):
+            request("unknown", self.root_dir)
+
+    def test_changes_are_served_right_away(self):
+        for title in ["One", "Two", "Three"]:
+            request("create", self.root_dir, title=title, category="Feature", owner="alice")
+        self.assertEqual(request("delete", self.root_dir, task_id=1), "TASK-1 - One")
+        results = request("apply", self.root_dir, operations=[
+            {"line": 1, "op": "move", "task_id": 2, "board": "dn"},
+            {"line": 2, "op": "move", "task_id": 1, "board": "ip"},
+        ])
+        self.assertEqual([(result["line"], result["ok"]) for result in results], [(1, True), (2, False)])
+        self.assertEqual(request("archive", self.root_dir, before=None), ["TASK-2"])
+        lines = request("list", self.root_dir)
+        self.assertEqual(len(lines), 1)
+        self.assertIn("Three", lines[0])
+        with self.assertRaises(ValueError):
+            request("move", self.root_dir, task_id=1, board="ip")
+        self.assertEqual(request("restore", self.root_dir, task_id=2), "TASK-2 - Two")
+        self.assertEqual(len(request("list", self.root_dir)), 2)
+
+    def test_unexpected_errors_are_answered(self):
+        request("create", self.root_dir, title="Daemon task", category="Feature", owner="alice")
+        with mock.patch.object(TaskManager, "move_task", side_effect=OSError("disk full")):
+            with self.assertRaisesRegex(ValueError, "OSError: disk full"):
+                request("move", self.root_dir, task_id=1, board="ip")
+        self.assertEqual(request("move", self.root_dir, task_id=1, board="ip")["board"], "In Progress")
+
+    def test_failed_refresh_keeps_watching(self):
+        with mock.patch.object(TaskManager, "sync", side_effect=OSError("unreadable")) as sync, \
+                mock.patch("sys.stderr"):
+            for _ in range(100):
+                if sync.call_count >= 3:
+                    break
+                time.sleep(0.01)
+            self.assertGreaterEqual(sync.call_count, 3)
+            # Requests don't see stale tasks while the workspace can't be refreshed.
+            with self.assertRaisesRegex(ValueError, "unreadable"):
+                request("list", self.root_dir)
+        TaskManager(self.root_dir).create_task("Created elsewhere", "Bug", None)
+        for _ in range(100):
+            lines = request("list", self.root_dir)
+            if lines:
+                break
+            time.sleep(0.01)
+        self.assertIn("Created elsewhere", lines[0])
+
+    def test_refresh_picks_up_external_changes(self):
+        TaskManager(self.root_dir).create_task("Created elsewhere", "Bug", None)
+        self.daemon.refresh()
+        lines = request("list", self.root_dir)
+        self.assertEqual(len(lines), 1)
+        self.assertIn("Created elsewhere", lines[0])
+
+    def test_second_daemon_refuses_to_start(self):
+        with self.assertRaises(ValueError):
+            TaskDaemon(self.root_dir).serve_forever()
+
+    def test_shutdown_removes_socket(self):
+        request("shutdown", self.root_dir)
+        self.thread.join(timeout=5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(socket_path(self.root_dir).exists())
+        with self.assertRaises(DaemonUnavailable):
+            request("ping", self.root_dir)
+
+
+class DaemonClientTests(unittest.TestCase):
+    def test_no_daemon(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(DaemonUnavailable):
+                request("ping", tmp)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "the task daemon needs unix sockets")
+    def test_daemon_that_does_not_answer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = socket_path(tmp)
+            path.parent.mkdir()
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stuck:
+                stuck.bind(str(path))
+                stuck.listen()
+                with mock.patch.object(daemon_client, "_response_timeout", 0.05):
+                    with self.assertRaises(DaemonError):
+                        request("delete", tmp, task_id=1)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "the task daemon needs unix sockets")
+    def test_stale_socket(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = socket_path(tmp)
+            path.parent.mkdir()
+            stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            stale.bind(str(path))
+            stale.close()
+            with self.assertRaises(DaemonUnavailable):
+                request("ping", tmp)
+            self.assertTrue(Path(path).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from datetime import datetime
+
+from task_cli.flow_stats import flow_stats, format_table
+from task_cli.task import Task, TaskHistory
+from task_cli.task_priority import TaskPriority
+
+
+def _task(task_id: int, category: str, owner: str, history: list) -> Task:
+    history = [TaskHistory(timestamp=timestamp, action=action) for timestamp, action in history]
+    board = Task.BACK_LOG.name
+    for entry in history:
+        if entry.action.startswith("Moved to "):
+            board = entry.action[len("Moved to "):]
+    return Task(task_id, f"Task {task_id}", "", TaskPriority.from_name("Medium"), category, owner,
+                created=history[0].timestamp, board=board, history=history)
+
+
+class FlowStatsTests(unittest.TestCase):
+    def setUp(self):
+        # 2024-01-01 is a Monday.
+        self.tasks = [
+            _task(1, "Bug", "alice", [
+                (datetime(2024, 1, 1, 9), "Created"),
+                (datetime(2024, 1, 2, 9), "Moved to In Progress"),
+                (datetime(2024, 1, 3, 9), "Priority updated to High"),
+                (datetime(2024, 1, 5, 9), "Moved to Done"),
+            ]),
+            _task(2, "Feature", "bob", [
+                (datetime(2024, 1, 2, 9), "Created"),
+                (datetime(2024, 1, 9, 9), "Moved to In Progress"),
+                (datetime(2024, 1, 12, 9), "Moved to Done"),
+            ]),
+            _task(3, "Bug", None, [
+                (datetime(2024, 1, 3, 9), "Created"),
+                (datetime(2024, 1, 10, 9), "Moved to In Progress"),
+            ]),
+            _task(4, "Bug", "alice", [
+                (datetime(2024, 1, 4, 9), "Created"),
+                (datetime(2024, 1, 5, 9), "Moved to Done"),
+                (datetime(2024, 1, 8, 9), "Moved to Backlog"),
+            ]),
+        ]
+
+    def test_lead_and_cycle_time(self):
+        stats = flow_stats(self.tasks)
+        self.assertEqual((stats["tasks"], stats["done"]), (4, 2))
+        self.assertEqual(stats["lead_time"], {"count": 2, "mean": 7.0, "median": 7.0, "p85": 10.0})
+        self.assertEqual(stats["cycle_time"], {"count": 2, "mean": 3.0, "median": 3.0, "p85": 3.0})
+
+    def test_weekly_throughput_and_cumulative_flow(self):
+        weekly = flow_stats(self.tasks)["weekly"]
+        self.assertEqual([week["week"] for week in weekly], ["2024-01-01", "2024-01-08"])
+        self.assertEqual([week["throughput"] for week in weekly], [1, 1])
+        self.assertEqual(weekly[0]["cumulative_flow"], {"Backlog": 2, "In Progress": 0, "Done": 2})
+        self.assertEqual(weekly[1]["cumulative_flow"], {"Backlog": 1, "In Progress": 1, "Done": 2})
+        self.assertEqual([week["wip"] for week in weekly], [0, 1])
+
+    def test_weeks_without_changes_are_reported(self):
+        self.tasks[1].move_to_board("Backlog", datetime(2024, 1, 30, 9))
+        weekly = flow_stats(self.tasks)["weekly"]
+        self.assertEqual([week["week"] for week in weekly], ["2024-01-01", "2024-01-08", "2024-01-15", "2024-01-22",
+                                                             "2024-01-29"])
+        self.assertEqual(weekly[2]["cumulative_flow"], weekly[1]["cumulative_flow"])
+
+    def test_groups(self):
+        groups = flow_stats(self.tasks, by="owner")["groups"]
+        self.assertEqual([(group["owner"], group["tasks"], group["done"]) for group in groups],
+                         [("alice", 2, 1), ("bob", 1, 1), (None, 1, 0)])
+        self.assertEqual(groups[0]["lead_time"]["median"], 4.0)
+        self.assertIsNone(groups[2]["cycle_time"]["median"])
+
+    def test_no_tasks(self):
+        stats = flow_stats([])
+        self.assertEqual((stats["tasks"], stats["weekly"]), (0, []))
+        self.assertEqual(format_table(stats), ["Tasks: 0, done: 0", "Lead time (days): no done tasks",
+                                               "Cycle time (days): no done tasks"])
+
+    def test_format_table(self):
+        lines = format_table(flow_stats(self.tasks, by="category"), by="category")
+        self.assertIn("median 7.0", lines[1])
+        self.assertTrue(any(line.startswith("2024-01-08") for line in lines))
+        self.assertTrue(any(line.startswith("Bug") for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from task_cli import trace
+from task_cli.git_changes import GitChanges, install_hooks
+from task_cli.task_manager import TaskManager
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", "-C", str(cwd), *args], check=True, capture_output=True)
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class GitChangesTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._init_repository("repository")
+
+    def tearDown(self):
+        trace.disable()
+        self._tmp.cleanup()
+
+    def _init_repository(self, name: str):
+        self.root_dir = Path(self._tmp.name) / name
+        self.root_dir.mkdir()
+        _git(self.root_dir, "init", "-q", "-b", "main")
+        _git(self.root_dir, "config", "user.email", "test@example.com")
+        _git(self.root_dir, "config", "user.name", "Test User")
+
+    def _task_manager(self, engine="files"):
+        task_manager = TaskManager(self.root_dir)
+        task_manager.init_workspace()
+        (task_manager.workspace / "config").write_text(f"[storage]\nengine = {engine}\n[refresh]\ngit = true\n")
+        for i in range(3):
+            task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+        self._commit("Add tasks")
+        return task_manager
+
+    def _commit(self, message: str):
+        _git(self.root_dir, "add", "-A")
+        _git(self.root_dir, "commit", "-q", "-m", message)
+
+    def _set_title(self, task_id: int, title: str):
+        task_file = self.root_dir / ".tasks" / "tasks" / f"TASK-{task_id}.md"
+        task_file.write_text(task_file.read_text().replace(f"title: Test Task {task_id}\n", f"title: {title}\n"))
+
+    def _titles(self) -> list:
+        return sorted(task.title for task in TaskManager(self.root_dir).list_tasks())
+
+    def _refresh_counters(self) -> dict:
+        trace.enable()
+        TaskManager(self.root_dir).sync()
+        counters = trace.summary()["counters"]
+        trace.disable()
+        return counters
+
+    def test_only_files_changed_since_the_last_refresh_are_checked(self):
+        for engine in ["files", "sqlite"]:
+            with self.subTest(engine=engine):
+                self._init_repository(engine)
+                self._task_manager(engine).sync()
+                self.assertEqual(self._refresh_counters()["files_scanned"], 0)
+
+                _git(self.root_dir, "checkout", "-q", "-b", "feature")
+                self._set_title(2, "Renamed on a branch")
+                self._commit("Rename")
+                _git(self.root_dir, "checkout", "-q", "main")
+                self.assertEqual(self._titles(), ["Test Task 1", "Test Task 2", "Test Task 3"])
+                _git(self.root_dir, "checkout", "-q", "feature")
+                counters = self._refresh_counters()
+                self.assertEqual((counters["git_candidates"], counters["files_read"]), (1, 1))
+                self.assertEqual(self._titles(), ["Renamed on a branch", "Test Task 1", "Test Task 3"])
+
+    def test_working_tree_changes(self):
+        self._task_manager()
+        self._set_title(3, "Edited")
+        self.assertEqual(self._titles(), ["Edited", "Test Task 1", "Test Task 2"])
+        # Reverted to the committed file, which git no longer reports as changed.
+        _git(self.root_dir, "checkout", "-q", "--", ".tasks/tasks/TASK-3.md")
+        self.assertEqual(self._titles(), ["Test Task 1", "Test Task 2", "Test Task 3"])
+
+        tasks_dir = self.root_dir / ".tasks" / "tasks"
+        content = (tasks_dir / "TASK-1.md").read_text()
+        (tasks_dir / "TASK-9.md").write_text(content.replace("TASK-1", "TASK-9").replace("Test Task 1", "Untracked"))
+        self.assertEqual(self._titles(), ["Test Task 1", "Test Task 2", "Test Task 3", "Untracked"])
+        (tasks_dir / "TASK-9.md").unlink()
+        _git(self.root_dir, "rm", "-q", ".tasks/tasks/TASK-2.md")
+        self.assertEqual(self._titles(), ["Test Task 1", "Test Task 3"])
+
+    def test_falls_back_to_a_scan(self):
+        tasks_dir = self.root_dir / "tasks"
+        self.assertEqual(GitChanges(tasks_dir, enabled=False).changes({"commit": "abc"}, 10), (None, None))
+        self.assertEqual(GitChanges(tasks_dir).changes({"commit": "abc"}, 10), (None, None))
+        # In a repository without commits.
+        self.assertEqual(GitChanges(self.root_dir, enabled=True).changes(None, 10), (None, None))
+        task_manager = self._task_manager()
+        paths, state = task_manager.storage.git.changes({"commit": "0" * 40, "dirty": []}, 10)
+        self.assertIsNone(paths)
+        self.assertIsNone(state)
+
+    def test_install_hooks(self):
+        hooks_dir = self.root_dir / ".git" / "hooks"
+        hooks_dir.mkdir(exist_ok=True)
+        (hooks_dir / "post-merge").write_text("#!/bin/sh\necho merged\nexit 0\n")
+        (hooks_dir / "post-rewrite").write_text("#!/usr/bin/env python3\nprint('rewritten')\n")
+        self.assertEqual(install_hooks(self.root_dir), (["post-checkout", "post-merge"],
+                                                        {"post-rewrite": "run by python3"}))
+        self.assertEqual(install_hooks(self.root_dir), ([], {"post-rewrite": "run by python3"}))
+        # The script is called before the hook can exit.
+        post_merge = (hooks_dir / "post-merge").read_text().splitlines()
+        self.assertEqual(post_merge[0], "#!/bin/sh")
+        self.assertIn("task-sync", post_merge[2])
+        self.assertEqual(post_merge[3:], ["echo merged", "exit 0"])
+        self.assertIn("task sync", (hooks_dir / "task-sync").read_text())
+        self.assertTrue(os.access(hooks_dir / "post-checkout", os.X_OK))
+        self.assertTrue(os.access(hooks_dir / "task-sync", os.X_OK))
+        self.assertEqual((hooks_dir / "post-rewrite").read_text(), "#!/usr/bin/env python3\nprint('rewritten')\n")
+        with tempfile.TemporaryDirectory() as tmp, self.assertRaises(ValueError):
+            install_hooks(Path(tmp))
+
+
+if __name__ == "__main__":
+    unittest.main()
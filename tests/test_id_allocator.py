@@ -0,0 +1,85 @@
+import multiprocessing
+import tempfile
+import unittest
+from pathlib import Path
+
+from task_cli.id_allocator import IdAllocator
+from task_cli.task_manager import TaskManager
+
+
+def _reserve_ids(counter_file: str, rounds: int, count: int) -> list:
+    allocator = IdAllocator(Path(counter_file))
+    ids = []
+    for _ in range(rounds):
+        first_id = allocator.reserve(count)
+        ids.extend(range(first_id, first_id + count))
+    return ids
+
+
+def _create_tasks(root_dir: str, count: int) -> list:
+    task_manager = TaskManager(root_dir)
+    return [task_manager.create_task(f"Test Task {i}", "Feature", "Test User") for i in range(count)]
+
+
+class IdAllocatorTests(unittest.TestCase):
+    def test_reserve_returns_next_id(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            counter_file = Path(tmp) / ".task_counter"
+            counter_file.write_text("0")
+            allocator = IdAllocator(counter_file)
+            self.assertEqual(allocator.reserve(), 1)
+            self.assertEqual(allocator.reserve(), 2)
+            self.assertEqual(counter_file.read_text(), "2")
+
+    def test_reserve_block_of_ids(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            counter_file = Path(tmp) / ".task_counter"
+            counter_file.write_text("4")
+            allocator = IdAllocator(counter_file)
+            self.assertEqual(allocator.reserve(10), 5)
+            self.assertEqual(allocator.reserve(), 15)
+
+    def test_reserve_empty_counter_starts_from_one(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            counter_file = Path(tmp) / ".task_counter"
+            counter_file.touch()
+            self.assertEqual(IdAllocator(counter_file).reserve(), 1)
+
+    def test_reserve_invalid_count_raises_exception(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            counter_file = Path(tmp) / ".task_counter"
+            counter_file.write_text("0")
+            with self.assertRaises(ValueError):
+                IdAllocator(counter_file).reserve(0)
+
+    def test_concurrent_reserve_has_no_duplicates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            counter_file = Path(tmp) / ".task_counter"
+            counter_file.write_text("0")
+            processes, rounds = 8, 50
+            with multiprocessing.Pool(processes) as pool:
+                results = pool.starmap(_reserve_ids, [(str(counter_file), rounds, 1 + i % 3) for i in range(processes)])
+            ids = [task_id for result in results for task_id in result]
+            self.assertEqual(len(ids), len(set(ids)))
+            self.assertEqual(sorted(ids), list(range(1, len(ids) + 1)))
+
+    def test_concurrent_create_task_has_no_duplicates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            TaskManager(tmp).init_workspace()
+            processes, count = 8, 20
+            with multiprocessing.Pool(processes) as pool:
+                results = pool.starmap(_create_tasks, [(tmp, count)] * processes)
+            task_ids = [task_id for result in results for task_id in result]
+            self.assertEqual(len(task_ids), len(set(task_ids)))
+            self.assertEqual(len(list((Path(tmp) / ".tasks" / "tasks").iterdir())), processes * count)
+            self.assertEqual(len(TaskManager(tmp).list_tasks()), processes * count)
+
+    def test_create_task_does_not_overwrite_existing_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.task_counter_file.write_text("0")
+            with self.assertRaises(ValueError):
+                task_manager.create_task("Test Task 2", "Feature", "Test User")
+            self.assertIn("title: Test Task\n", (task_manager.tasks_dir / "TASK-1.md").read_text())
@@ -0,0 +1,178 @@
+from datetime import datetime
+import tempfile
+import unittest
+
+from task_cli.journal import Journal
+from task_cli.task import Task
+from task_cli.task_manager import TaskManager
+
+
+class JournalTests(unittest.TestCase):
+    def _journaled_manager(self, tmp, fold_threshold=500):
+        task_manager = TaskManager(tmp)
+        task_manager.init_workspace()
+        (task_manager.workspace / "config").write_text(
+            f"[journal]\nenabled = true\nfold_threshold = {fold_threshold}\n")
+        return task_manager
+
+    def test_append_and_load_events(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            journal = Journal(task_manager.workspace / "journal")
+            journal.append("TASK-1", Journal.BOARD, "Done", datetime(2021, 1, 1, 12, 0, 1))
+            events = Journal(task_manager.workspace / "journal").events
+            self.assertEqual(len(events["TASK-1"]), 1)
+            self.assertEqual(events["TASK-1"][0].value, "Done")
+            self.assertEqual(events["TASK-1"][0].timestamp, datetime(2021, 1, 1, 12, 0, 1))
+
+    def test_append_invalid_field_raises_exception(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            journal = Journal(task_manager.workspace / "journal")
+            with self.assertRaises(ValueError):
+                journal.append("TASK-1", "title", "New title", datetime.now())
+
+    def test_invalid_journal_entry_raises_exception(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            (task_manager.workspace / "journal").write_text("TASK-1\tnot a timestamp\tboard\tDone\n")
+            with self.assertRaises(ValueError):
+                Journal(task_manager.workspace / "journal").events
+
+    def test_move_task_appends_to_journal_without_rewriting_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_file = task_manager.tasks_dir / "TASK-1.md"
+            content = task_file.read_text()
+            task_manager.move_task(1, "In Progress")
+            self.assertEqual(task_file.read_text(), content)
+            self.assertIn("TASK-1\t", (task_manager.workspace / "journal").read_text())
+
+    def test_journaled_changes_are_listed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Feature", "Test User")
+            task_manager.move_task(1, "In Progress")
+            task_manager.update_task_priority(1, "High")
+            task_manager.update_task_category(1, "Bug")
+            tasks = TaskManager(tmp).list_tasks(board="ip")
+            self.assertEqual(len(tasks), 1)
+            self.assertEqual(tasks[0].priority.name, "High")
+            self.assertEqual(tasks[0].category, "Bug")
+            self.assertEqual([entry.action for entry in tasks[0].history],
+                             ["Created", "Moved to In Progress", "Priority updated to High", "Category updated to Bug"])
+
+    def test_fold_journal_writes_task_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.move_task(1, "In Progress")
+            task_manager.move_task(1, "Done")
+            self.assertEqual(task_manager.fold_journal(), 1)
+            content = (task_manager.tasks_dir / "TASK-1.md").read_text()
+            self.assertIn("board: Done", content)
+            self.assertIn("- Moved to In Progress", content)
+            self.assertFalse((task_manager.workspace / "journal").exists())
+            task = TaskManager(tmp).list_tasks()[0]
+            self.assertEqual(len(task.history), 3)
+
+    def test_journal_is_folded_at_threshold(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp, fold_threshold=2)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.move_task(1, "In Progress")
+            self.assertTrue((task_manager.workspace / "journal").exists())
+            task_manager.move_task(1, "Done")
+            self.assertFalse((task_manager.workspace / "journal").exists())
+            self.assertIn("board: Done", (task_manager.tasks_dir / "TASK-1.md").read_text())
+
+    def test_disabled_journal_writes_pending_events_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.move_task(1, "In Progress")
+            (task_manager.workspace / "config").write_text("[journal]\nenabled = false\n")
+            task_manager = TaskManager(tmp)
+            task_manager.move_task(1, "Done")
+            task = TaskManager(tmp).list_tasks()[0]
+            self.assertEqual([entry.action for entry in task.history],
+                             ["Created", "Moved to In Progress", "Moved to Done"])
+
+    def test_delete_task_discards_journal_events(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Feature", "Test User")
+            task_manager.move_task(1, "In Progress")
+            task_manager.move_task(2, "In Progress")
+            task_manager.delete_task(1)
+            events = Journal(task_manager.workspace / "journal").events
+            self.assertNotIn("TASK-1", events)
+            self.assertIn("TASK-2", events)
+
+    def test_discard_keeps_events_appended_by_other_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            journal_file = task_manager.workspace / "journal"
+            journal = Journal(journal_file)
+            journal.append("TASK-1", Journal.BOARD, "Done", datetime(2021, 1, 1, 12, 0, 1))
+            # Another process appends after this one read the journal.
+            Journal(journal_file).append("TASK-1", Journal.PRIORITY, "High", datetime(2021, 1, 1, 12, 0, 2))
+            Journal(journal_file).append("TASK-2", Journal.BOARD, "Done", datetime(2021, 1, 1, 12, 0, 3))
+            journal.discard("TASK-1")
+            events = Journal(journal_file).events
+            self.assertEqual([event.value for event in events["TASK-1"]], ["High"])
+            self.assertEqual([event.value for event in events["TASK-2"]], ["Done"])
+
+    def test_discard_keeps_identical_events_appended_by_other_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            journal_file = task_manager.workspace / "journal"
+            journal = Journal(journal_file)
+            journal.append("TASK-1", Journal.BOARD, "Done", datetime(2021, 1, 1, 12, 0, 1))
+            # Another process folds the event, then appends the same change in the same second.
+            Journal(journal_file).clear()
+            Journal(journal_file).append("TASK-1", Journal.BOARD, "Done", datetime(2021, 1, 1, 12, 0, 1))
+            journal.discard("TASK-1")
+            self.assertEqual([event.value for event in Journal(journal_file).events["TASK-1"]], ["Done"])
+
+    def test_fold_during_write_applies_events_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.move_task(1, "In Progress")
+            storage = TaskManager(tmp).storage
+            task = storage.read_task(1)
+            task.title = "Renamed"
+            storage.write_task(task)
+            TaskManager(tmp).fold_journal()
+            storage.flush()
+            task = TaskManager(tmp).list_tasks()[0]
+            self.assertEqual(task.title, "Renamed")
+            self.assertEqual([entry.action for entry in task.history], ["Created", "Moved to In Progress"])
+
+    def test_fold_includes_events_appended_by_other_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.move_task(1, "In Progress")
+            TaskManager(tmp).update_task_priority(1, "High")
+            self.assertEqual(task_manager.fold_journal(), 1)
+            content = (task_manager.tasks_dir / "TASK-1.md").read_text()
+            self.assertIn("board: In Progress", content)
+            self.assertIn("priority: High", content)
+            self.assertFalse((task_manager.workspace / "journal").exists())
+
+    def test_move_task_returns_journaled_task(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._journaled_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.move_task(1, "In Progress")
+            task = task_manager.move_task(1, Task.DONE.name)
+            self.assertEqual(task.board, "Done")
+            self.assertEqual(task.history[-2].action, "Moved to In Progress")
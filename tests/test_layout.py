@@ -0,0 +1,101 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from task_cli import task_index
+from task_cli.layout import TaskLayout
+from task_cli.task import Task
+from task_cli.task_manager import TaskManager
+
+
+class TaskLayoutTests(unittest.TestCase):
+    def test_path(self):
+        tasks_dir = Path("tasks")
+        self.assertEqual(TaskLayout(tasks_dir).path("TASK-12345.md"), tasks_dir / "TASK-12345.md")
+        self.assertEqual(TaskLayout(tasks_dir, 1000).path("TASK-12345.md"), tasks_dir / "12" / "TASK-12345.md")
+        self.assertEqual(TaskLayout(tasks_dir, 1000).task_file(7), tasks_dir / "0" / "TASK-7.md")
+
+    def test_scan_and_find_during_migration(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tasks_dir = Path(tmp)
+            (tasks_dir / "1").mkdir()
+            (tasks_dir / "1" / "TASK-1500.md").write_text("")
+            (tasks_dir / "TASK-2.md").write_text("")
+            (tasks_dir / "README.md").write_text("")
+            layout = TaskLayout(tasks_dir, 1000, previous_shard_size=0)
+            self.assertEqual(sorted(entry.name for entry in layout.scan()), ["TASK-1500.md", "TASK-2.md"])
+            self.assertEqual(layout.find("TASK-2.md"), tasks_dir / "TASK-2.md")
+            self.assertEqual(layout.find("TASK-1500.md"), tasks_dir / "1" / "TASK-1500.md")
+            self.assertEqual(layout.find("TASK-3.md"), tasks_dir / "0" / "TASK-3.md")
+
+
+class ShardedWorkspaceTests(unittest.TestCase):
+    def _task_manager(self, tmp, shard_size=10, engine="files"):
+        task_manager = TaskManager(tmp)
+        task_manager.init_workspace()
+        (task_manager.workspace / "config").write_text(
+            f"[storage]\nengine = {engine}\n[layout]\nshard_size = {shard_size}\n")
+        return task_manager
+
+    def test_sharded_workspace(self):
+        for engine in ["files", "sqlite"]:
+            with self.subTest(engine=engine), tempfile.TemporaryDirectory() as tmp:
+                task_manager = self._task_manager(tmp, engine=engine)
+                for i in range(12):
+                    task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+                task_manager.move_task(11, Task.DONE.name)
+                self.assertTrue((task_manager.tasks_dir / "1" / "TASK-11.md").exists())
+                self.assertEqual(task_manager.task_location(5), task_manager.tasks_dir / "0" / "TASK-5.md")
+                self.assertEqual(len(TaskManager(tmp).list_tasks()), 12)
+                self.assertEqual([task.title for task in TaskManager(tmp).list_tasks(board="dn")], ["Test Task 11"])
+                task_manager.delete_task(12)
+                self.assertFalse((task_manager.tasks_dir / "1" / "TASK-12.md").exists())
+                self.assertEqual(len(TaskManager(tmp).list_tasks()), 11)
+
+    def test_migrate_layout_in_batches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp, shard_size=0)
+            for i in range(25):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            task_manager.list_tasks()
+
+            self.assertEqual(task_manager.migrate_layout(10, batch=10), (10, 15))
+            # The workspace can be used while it is migrated.
+            task_manager = TaskManager(tmp)
+            task_manager.move_task(24, Task.IN_PROGRESS.name)
+            task_manager.create_task("Test Task 26", "Bug", "Test User")
+            self.assertTrue((task_manager.tasks_dir / "2" / "TASK-26.md").exists())
+            with mock.patch.object(task_index, "read_header", wraps=task_index.read_header) as read_header:
+                self.assertEqual(len(TaskManager(tmp).list_tasks()), 26)
+                self.assertEqual(read_header.call_count, 0)
+
+            self.assertEqual(TaskManager(tmp).migrate_layout(10), (15, 0))
+            task_manager = TaskManager(tmp)
+            self.assertIsNone(task_manager.config.layout_previous_shard_size)
+            self.assertEqual(sorted(path.name for path in task_manager.tasks_dir.iterdir()), ["0", "1", "2"])
+            self.assertEqual([task.title for task in task_manager.list_tasks(board="ip")], ["Test Task 24"])
+
+    def test_migrate_layout_back_to_flat(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp, shard_size=10)
+            for i in range(15):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            self.assertEqual(TaskManager(tmp).migrate_layout(0), (15, 0))
+            self.assertEqual(len(list(task_manager.tasks_dir.iterdir())), 15)
+            self.assertEqual(len(TaskManager(tmp).list_tasks()), 15)
+
+    def test_unfinished_migration_must_be_resumed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp, shard_size=0)
+            for i in range(5):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            task_manager.migrate_layout(2, batch=1)
+            with self.assertRaises(ValueError):
+                TaskManager(tmp).migrate_layout(3)
+            # Going back to the previous layout is allowed.
+            self.assertEqual(TaskManager(tmp).migrate_layout(0), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+import tempfile
+import unittest
+from datetime import datetime
+
+from task_cli.commands import execute
+from task_cli.output import format_tasks, parse_fields
+from task_cli.task import Task
+from task_cli.task_manager import TaskManager
+from task_cli.task_priority import TaskPriority
+
+
+def _task(task_id, title="Test Task"):
+    task = Task(task_id, title, "Some details", TaskPriority.from_name("High"), "Bug", "alice",
+                created=datetime(2024, 11, 2, 10, 0))
+    task.move_to_board("ip", datetime(2024, 11, 3, 9, 30))
+    return task
+
+
+def _unloadable_task(task_id):
+    # A task whose body fails to load, to check that it is never read.
+    task = _task(task_id)
+
+    def load_body():
+        raise AssertionError("the task body was loaded")
+
+    task.defer_body(load_body)
+    return task
+
+
+class OutputFormatTests(unittest.TestCase):
+    def test_table_is_the_default(self):
+        self.assertEqual(list(format_tasks([_task(1)])), ["TASK-1: Test Task (High, Bug, In Progress)"])
+
+    def test_table_with_fields(self):
+        lines = list(format_tasks([_task(1), _task(12, "Other")], "table", ["id", "title", "board"]))
+        self.assertEqual(lines, [
+            "Id       Title      Board",
+            "TASK-1   Test Task  In Progress",
+            "TASK-12  Other      In Progress",
+        ])
+
+    def test_ndjson(self):
+        lines = list(format_tasks([_unloadable_task(1), _unloadable_task(2)], "ndjson"))
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0]), {
+            "id": "TASK-1", "title": "Test Task", "created": "2024-11-02 10:00:00", "priority": "High",
+            "category": "Bug", "owner": "alice", "board": "In Progress"})
+
+    def test_ndjson_streams_tasks(self):
+        loaded = []
+
+        def tasks():
+            for task_id in range(1, 4):
+                loaded.append(task_id)
+                yield _task(task_id)
+
+        lines = format_tasks(tasks(), "ndjson", ["id"])
+        self.assertEqual(next(lines), '{"id":"TASK-1"}')
+        self.assertEqual(loaded, [1])
+
+    def test_json(self):
+        tasks = [_task(1), _task(2)]
+        data = json.loads("\n".join(format_tasks(tasks, "json", ["id", "description", "history"])))
+        self.assertEqual([record["id"] for record in data], ["TASK-1", "TASK-2"])
+        self.assertEqual(data[0]["description"], "Some details")
+        self.assertEqual(data[0]["history"][-1], {"timestamp": "2024-11-03 09:30:00", "action": "Moved to In Progress"})
+        self.assertEqual(json.loads("\n".join(format_tasks([], "json"))), [])
+
+    def test_csv(self):
+        lines = list(format_tasks([_task(1, 'Fix "quoted", title')], "csv", ["id", "title", "history"]))
+        rows = list(csv.reader(io.StringIO("\n".join(lines) + "\n")))
+        self.assertEqual(rows[0], ["id", "title", "history"])
+        self.assertEqual(rows[1], ["TASK-1", 'Fix "quoted", title',
+                                   "2024-11-02 10:00:00 - Created\n2024-11-03 09:30:00 - Moved to In Progress"])
+
+    def test_unrequested_fields_are_not_read(self):
+        for output_format in ["table", "json", "ndjson", "csv"]:
+            with self.subTest(output_format=output_format):
+                list(format_tasks([_unloadable_task(1)], output_format, ["id", "title", "board"]))
+
+    def test_invalid_fields_and_formats(self):
+        self.assertEqual(parse_fields(" id, title ,board"), ["id", "title", "board"])
+        for fields in ["id,size", "", ","]:
+            with self.subTest(fields=fields), self.assertRaises(ValueError):
+                parse_fields(fields)
+        with self.assertRaises(ValueError):
+            format_tasks([], "xml")
+
+    def test_list_command_formats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "alice")
+            lines = execute(TaskManager(tmp), "list", {"board": "bl", "output_format": "ndjson", "fields": ["id", "owner"]})
+            self.assertEqual(list(lines), ['{"id":"TASK-1","owner":"alice"}'])
+
+
+if __name__ == "__main__":
+    unittest.main()
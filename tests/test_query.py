@@ -0,0 +1,78 @@
+import unittest
+
+from task_cli.query import TaskQuery
+
+
+def _entry(**fields):
+    entry = {"id": 1, "title": "Add CLI flag", "created": "2024-11-02 10:00:00", "priority": "Medium",
+             "category": "Feature", "owner": "alice", "board": "Backlog"}
+    entry.update(fields)
+    return entry
+
+
+class TaskQueryTests(unittest.TestCase):
+    def test_plan_splits_index_lookups_from_header_filters(self):
+        query = TaskQuery.parse('priority<=Medium and owner=alice and created>2024-11-01 and title~"cli"')
+        self.assertEqual(query.lookups, {"priority": {"Low", "Medium"}, "owner": {"alice"}})
+        self.assertEqual(str(query.residual), "created > 2024-11-01 and title ~ cli")
+        self.assertEqual(query.explain(), [
+            "Filter: priority in (Low, Medium) and owner = alice and created > 2024-11-01 and title ~ cli",
+            "Index lookup: priority in (Low, Medium) and owner = alice",
+            "Header filter: created > 2024-11-01 and title ~ cli",
+        ])
+
+    def test_only_top_level_conjunctions_are_looked_up(self):
+        query = TaskQuery.parse("board=ip or category=Bug")
+        self.assertEqual(query.lookups, {})
+        query = TaskQuery.parse("board!=dn and board!=bl and (category=Bug or id>3)")
+        self.assertEqual(query.lookups, {"board": {"In Progress"}})
+        self.assertEqual(str(query.residual), "category in (Bug) or id > 3")
+
+    def test_matches(self):
+        cases = [
+            ("priority<=Medium", _entry(), True),
+            ("priority>Medium", _entry(), False),
+            ("priority>=high", _entry(priority="High"), True),
+            ("board=bl and category!=Bug", _entry(), True),
+            ("created=2024-11-02", _entry(), True),
+            ("created<2024-11-02", _entry(), False),
+            ("created<=2024-11-02", _entry(), True),
+            ('created>"2024-11-02 09:59:59"', _entry(), True),
+            ("created>2024-11-02", _entry(), False),
+            ("id>=TASK-1 and id<2", _entry(), True),
+            ("title~cli", _entry(), True),
+            ('title="Add CLI flag"', _entry(), True),
+            ("owner=bob or not (owner=alice)", _entry(), False),
+            ('owner=""', _entry(owner=None), True),
+            ("owner!=alice", _entry(owner=None), True),
+            ("NOT board=ip AND (priority=Low OR title~flag)", _entry(), True),
+        ]
+        for text, entry, expected in cases:
+            with self.subTest(query=text):
+                self.assertEqual(TaskQuery.parse(text).matches(entry), expected)
+
+    def test_filters_and_query_are_combined(self):
+        query = TaskQuery.from_filters(board="ip", owner="alice").and_(TaskQuery.parse("priority=High or id=3"))
+        self.assertEqual(query.lookups, {"board": {"In Progress"}, "owner": {"alice"}})
+        self.assertTrue(query.matches(_entry(board="In Progress", id=3)))
+        self.assertFalse(query.matches(_entry(board="In Progress", owner="bob", id=3)))
+        self.assertTrue(TaskQuery.from_filters(board=None).matches(_entry()))
+        query = TaskQuery.from_filters(owner="alice").and_(TaskQuery.from_ids([1, 3]))
+        self.assertEqual(str(query.residual), "id in (2 tasks)")
+        self.assertTrue(query.matches(_entry(id=3)))
+        self.assertFalse(query.matches(_entry(id=2)))
+
+    def test_sql(self):
+        clause, parameters = TaskQuery.parse("priority<Medium and created<=2024-11-01 and title~CLI").sql()
+        self.assertEqual(clause, "(priority IN (?)) AND (created < ?) AND (instr(py_lower(COALESCE(title, '')), ?) > 0)")
+        self.assertEqual(parameters, ["Low", "2024-11-02 00:00:00", "cli"])
+
+    def test_invalid_queries(self):
+        for text in ["priority<", "size=3", "board<ip", "title<abc", 'title="abc', "(board=ip",
+                     "board=ip board=dn", "board=nowhere", "created=yesterday", "id=abc", "and"]:
+            with self.subTest(query=text), self.assertRaises(ValueError):
+                TaskQuery.parse(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from task_cli import trace
+from task_cli.layout import TaskLayout
+from task_cli.search_index import SearchIndex
+from task_cli.task_manager import TaskManager
+
+
+def _set_body(task_manager: TaskManager, task_id: int, description: str = "", notes: str = ""):
+    task_file = task_manager.tasks_dir / f"TASK-{task_id}.md"
+    content = task_file.read_text()
+    content = content.replace("## Description\n", f"## Description\n{description}\n", 1)
+    content = content.replace("## Notes\n", f"## Notes\n{notes}\n", 1)
+    task_file.write_text(content)
+
+
+class SearchIndexTests(unittest.TestCase):
+    def _task_manager(self, tmp, engine="files"):
+        task_manager = TaskManager(tmp)
+        task_manager.init_workspace()
+        (task_manager.workspace / "config").write_text(f"[storage]\nengine = {engine}\n")
+        task_manager.create_task("Fix login timeout", "Bug", "alice")
+        task_manager.create_task("Write migration guide", "Documentation", "bob")
+        task_manager.create_task("Redesign settings page", "Feature", "alice")
+        _set_body(task_manager, 2, "Explain how to migrate the workspace.")
+        _set_body(task_manager, 3, notes="The login button moves to the header.")
+        return task_manager
+
+    def _titles(self, tasks) -> list:
+        return [task.title for task in tasks]
+
+    def test_parse(self):
+        self.assertEqual(SearchIndex.parse("Login  migr*"), [("login", False), ("migr", True)])
+        self.assertEqual(SearchIndex.parse("user-guide*"), [("user", False), ("guide", True)])
+        for text in ["", "  ", "* -"]:
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                SearchIndex.parse(text)
+
+    def test_search_ranks_titles_first(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            self.assertEqual(self._titles(task_manager.search_tasks("login")),
+                             ["Fix login timeout", "Redesign settings page"])
+            self.assertEqual(self._titles(task_manager.search_tasks("LOGIN header")), ["Redesign settings page"])
+            self.assertEqual(self._titles(task_manager.search_tasks("migr*")), ["Write migration guide"])
+            self.assertEqual(task_manager.search_tasks("logout"), [])
+            self.assertEqual(self._titles(task_manager.search_tasks("login", limit=1)), ["Fix login timeout"])
+
+    def test_search_with_filters(self):
+        for engine in ["files", "sqlite"]:
+            with self.subTest(engine=engine), tempfile.TemporaryDirectory() as tmp:
+                task_manager = self._task_manager(tmp, engine)
+                task_manager.move_task(1, "Done")
+                self.assertEqual(self._titles(TaskManager(tmp).search_tasks("login", board="bl")),
+                                 ["Redesign settings page"])
+                self.assertEqual(self._titles(TaskManager(tmp).search_tasks("login", category="Bug", limit=1)),
+                                 ["Fix login timeout"])
+                self.assertEqual(TaskManager(tmp).search_tasks("login", owner="bob"), [])
+
+    def test_refresh_reads_only_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.search_tasks("login")
+            trace.enable()
+            try:
+                _set_body(task_manager, 1, "Sessions expire too early.")
+                (task_manager.tasks_dir / "TASK-3.md").unlink()
+                task_manager = TaskManager(tmp)
+                self.assertEqual(self._titles(task_manager.search_tasks("login")), ["Fix login timeout"])
+                self.assertEqual(trace.summary()["counters"]["search_files_read"], 1)
+            finally:
+                trace.disable()
+            self.assertEqual(self._titles(task_manager.search_tasks("sessions")), ["Fix login timeout"])
+            self.assertEqual(task_manager.search_tasks("header"), [])
+
+    def test_index_is_persisted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.search_tasks("login")
+            layout = TaskLayout(task_manager.tasks_dir)
+            search_index = SearchIndex(task_manager.workspace / "search", layout)
+            self.assertEqual(sorted(search_index.search("login")), [1, 3])
+            self.assertEqual(search_index.search("guid*").keys(), {2})
+            self.assertEqual(SearchIndex(Path(tmp) / "missing", layout).search("login"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
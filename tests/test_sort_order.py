@@ -0,0 +1,112 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from task_cli import trace
+from task_cli.sort_order import SortOrder
+from task_cli.task import Task
+from task_cli.task_manager import TaskManager
+
+
+def _entry(task_id: int, title: str, priority: str = "Medium", board: str = "Backlog", owner: str = None,
+           created: str = "2024-01-01 09:00:00") -> dict:
+    return {"id": task_id, "title": title, "created": created, "priority": priority, "category": "Bug",
+            "owner": owner, "board": board}
+
+
+class SortOrderTests(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(str(SortOrder.parse("board, -Priority", Task.DEFAULT_WORKFLOW)), "board,-priority,id")
+        self.assertEqual(str(SortOrder.parse("-id,title", Task.DEFAULT_WORKFLOW)), "-id,title")
+        for spec in ["", "board,,id", "status", "title,-title"]:
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                SortOrder.parse(spec, Task.DEFAULT_WORKFLOW)
+
+    def test_key(self):
+        entries = [_entry(1, "abc", "Low", "Done"), _entry(2, "ab", "High", owner="bob"),
+                   _entry(3, "Abd", "High", "In Progress", created="2023-12-31 23:00:00"), _entry(4, "b", "Medium")]
+        def ids(spec):
+            return [entry["id"] for entry in sorted(entries, key=SortOrder.parse(spec, Task.DEFAULT_WORKFLOW).key)]
+        self.assertEqual(ids("board"), [1, 2, 4, 3])
+        self.assertEqual(ids("-priority,-id"), [3, 2, 4, 1])
+        self.assertEqual(ids("title"), [2, 1, 3, 4])
+        self.assertEqual(ids("-title"), [4, 3, 1, 2])
+        self.assertEqual(ids("created,-owner"), [3, 2, 1, 4])
+
+
+class SortedListTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.addCleanup(trace.disable)
+
+    def _task_manager(self, engine: str = "files", config: str = "") -> TaskManager:
+        root_dir = Path(self._tmp.name) / engine
+        task_manager = TaskManager(root_dir)
+        if not root_dir.exists():
+            root_dir.mkdir()
+            task_manager.init_workspace()
+        (task_manager.workspace / "config").write_text(f"[storage]\nengine = {engine}\n{config}")
+        return task_manager
+
+    def _create_tasks(self, task_manager: TaskManager):
+        for title, priority, board in [("delta", "Low", "ip"), ("alpha", "High", "bl"), ("charlie", "High", "dn"),
+                                       ("bravo", "Medium", "ip"), ("echo", "Medium", "bl")]:
+            task_num = Task.task_num_from_id(task_manager.create_task(title, "Bug", "alice"))
+            task_manager.update_task_priority(task_num, priority)
+            task_manager.move_task(task_num, board)
+
+    def _titles(self, task_manager: TaskManager, **options) -> list:
+        return [task.title for task in task_manager.iter_tasks(**options)]
+
+    def test_sort_on_both_engines(self):
+        for engine in ["files", "sqlite"]:
+            with self.subTest(engine=engine):
+                task_manager = self._task_manager(engine)
+                self._create_tasks(task_manager)
+                task_manager = TaskManager(task_manager.root_dir)
+                self.assertEqual(self._titles(task_manager), ["charlie", "alpha", "echo", "delta", "bravo"])
+                self.assertEqual(self._titles(task_manager, order="-priority,title"),
+                                 ["alpha", "charlie", "bravo", "echo", "delta"])
+                self.assertEqual(self._titles(task_manager, order="-title", limit=2, offset=1), ["delta", "charlie"])
+                self.assertEqual(self._titles(task_manager, order="priority", board="ip"), ["delta", "bravo"])
+
+    def test_default_order_is_kept_in_the_index(self):
+        task_manager = self._task_manager(config="[list]\nsort = -priority,title\n")
+        self._create_tasks(task_manager)
+        index = json.loads((task_manager.workspace / "index").read_text())
+        self.assertEqual(index["order"]["tasks"], ["TASK-2.md", "TASK-3.md", "TASK-4.md", "TASK-5.md", "TASK-1.md"])
+
+        trace.enable()
+        task_manager = TaskManager(task_manager.root_dir)
+        task_manager.move_task(5, "dn")
+        task_manager.update_task_priority(1, "High")
+        task_manager.create_task("aardvark", "Bug", "bob")
+        self.assertEqual(self._titles(task_manager),
+                         ["alpha", "charlie", "delta", "aardvark", "bravo", "echo"])
+        phases = trace.summary()["phases"]
+        self.assertNotIn("index.sort", phases)
+        self.assertNotIn("query.filter_sort", phases)
+
+        # Another default order sorts the index again, once.
+        self._task_manager(config="[list]\nsort = board,id\n")
+        self.assertEqual(self._titles(TaskManager(task_manager.root_dir)),
+                         ["charlie", "echo", "alpha", "aardvark", "delta", "bravo"])
+        self.assertEqual(trace.summary()["phases"]["index.sort"]["calls"], 1)
+
+    def test_journaled_changes_keep_the_order(self):
+        task_manager = self._task_manager(config="[journal]\nenabled = true\n")
+        self._create_tasks(task_manager)
+        self.assertEqual(self._titles(TaskManager(task_manager.root_dir)),
+                         ["charlie", "alpha", "echo", "delta", "bravo"])
+        self.assertEqual(self._titles(TaskManager(task_manager.root_dir), board="bl"), ["alpha", "echo"])
+
+    def test_invalid_default_order(self):
+        task_manager = self._task_manager(config="[list]\nsort = status\n")
+        with self.assertRaises(ValueError):
+            task_manager.list_tasks()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from task_cli.task_manager import TaskManager
+
+# Cold import time budgets in milliseconds, scaled by TASK_CLI_STARTUP_BUDGET_SCALE on slow machines.
+_help_budget_ms = 150
+_list_budget_ms = 250
+
+_root_dir = Path(__file__).resolve().parent.parent
+
+
+class StartupTests(unittest.TestCase):
+    def _import_times(self, args, cwd=None) -> dict:
+        env = dict(os.environ, PYTHONPATH=str(_root_dir))
+        result = subprocess.run([sys.executable, "-X", "importtime", "-m", "task_cli.main", *args],
+                                cwd=cwd, env=env, capture_output=True, text=True, check=True)
+        import_times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_time, _, name = line[len("import time:"):].split("|")
+            import_times[name.strip()] = int(self_time)
+        return import_times
+
+    def _budget_ms(self, budget_ms: int) -> float:
+        return budget_ms * float(os.environ.get("TASK_CLI_STARTUP_BUDGET_SCALE", "1"))
+
+    def test_help_does_not_import_task_modules(self):
+        import_times = self._import_times(["--help"])
+        self.assertIn("click", import_times)
+        for module in ["task_cli.task_manager", "task_cli.task", "frontmatter", "yaml"]:
+            self.assertNotIn(module, import_times)
+
+    def test_help_startup_budget(self):
+        self._import_times(["--help"])
+        total_ms = sum(self._import_times(["--help"]).values()) / 1000
+        self.assertLessEqual(total_ms, self._budget_ms(_help_budget_ms))
+
+    def test_list_does_not_import_yaml(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            import_times = self._import_times(["list"], cwd=tmp)
+            self.assertIn("task_cli.task_manager", import_times)
+            for module in ["frontmatter", "yaml", "concurrent.futures"]:
+                self.assertNotIn(module, import_times)
+
+    def test_list_startup_budget(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            for i in range(10):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            self._import_times(["list"], cwd=tmp)
+            total_ms = sum(self._import_times(["list"], cwd=tmp).values()) / 1000
+            self.assertLessEqual(total_ms, self._budget_ms(_list_budget_ms))
@@ -0,0 +1,122 @@
+import json
+import sqlite3
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from task_cli import trace
+from task_cli.batch import parse_operations
+from task_cli.summary import format_table, summarize
+from task_cli.task import Task
+from task_cli.task_manager import TaskManager
+
+_counts = {
+    ("Backlog", "Bug", "High", "alice"): 2,
+    ("Backlog", "Feature", "Medium", ""): 1,
+    ("In Progress", "Bug", "High", "bob"): 3,
+    ("Done", "Bug", "Low", "alice"): 4,
+}
+
+
+class SummarizeTests(unittest.TestCase):
+    def test_counts_per_field(self):
+        summary = summarize(_counts, Task.DEFAULT_WORKFLOW)
+        self.assertEqual(summary["total"], 10)
+        self.assertEqual(summary["counts"]["board"], {"Backlog": 3, "In Progress": 3, "Done": 4})
+        self.assertEqual(summary["counts"]["priority"], {"High": 5, "Medium": 1, "Low": 4})
+        self.assertEqual(summary["counts"]["owner"], {"": 1, "alice": 6, "bob": 3})
+        self.assertEqual(summarize(_counts, Task.DEFAULT_WORKFLOW, ["owner"], {"category": "Feature"}),
+                         {"total": 1, "counts": {"owner": {"": 1}}})
+
+    def test_pivot(self):
+        summary = summarize(_counts, Task.DEFAULT_WORKFLOW, ["board", "priority"], {"category": "Bug", "owner": None})
+        self.assertEqual(summary["total"], 9)
+        self.assertEqual(summary["pivot"], {"Backlog": {"High": 2, "Medium": 0, "Low": 0},
+                                            "In Progress": {"High": 3, "Medium": 0, "Low": 0},
+                                            "Done": {"High": 0, "Medium": 0, "Low": 4}})
+        lines = format_table(summary)
+        self.assertEqual(lines[2].split(), ["Board", "High", "Medium", "Low", "Total"])
+        self.assertEqual(lines[-1].split(), ["Total", "5", "0", "4", "9"])
+
+    def test_invalid_fields(self):
+        for by in [["status"], ["board", "board"], ["board", "priority", "owner"]]:
+            with self.subTest(by=by), self.assertRaises(ValueError):
+                summarize(_counts, Task.DEFAULT_WORKFLOW, by)
+
+
+class SummaryCountsTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.addCleanup(trace.disable)
+
+    def _task_manager(self, engine: str, config: str = "", name: str = None) -> TaskManager:
+        root_dir = Path(self._tmp.name) / (name or engine)
+        root_dir.mkdir()
+        task_manager = TaskManager(root_dir)
+        task_manager.init_workspace()
+        (task_manager.workspace / "config").write_text(f"[storage]\nengine = {engine}\n{config}")
+        return task_manager
+
+    def _change_tasks(self, task_manager: TaskManager):
+        for i in range(6):
+            task_manager.create_task(f"Task {i + 1}", "Bug" if i % 2 else "Feature", "alice" if i % 3 else "")
+        task_manager.move_task(1, "ip")
+        task_manager.move_task(2, "dn")
+        task_manager.update_task_priority(2, "High")
+        task_manager.update_task_category(3, "Security")
+        task_manager.delete_task(4)
+        task_manager.apply_operations(parse_operations([
+            '{"op": "create", "title": "Task 7", "category": "Bug", "owner": "bob"}',
+            '{"op": "move", "task_id": 5, "board": "dn"}',
+            '{"op": "delete", "task_id": 6}',
+        ], "ndjson"))
+
+    def _assert_counted(self, task_manager: TaskManager):
+        summary = TaskManager(task_manager.root_dir).summarize(["board", "priority"])
+        tasks = TaskManager(task_manager.root_dir).list_tasks()
+        pivot = Counter((task.board.name, task.priority.name) for task in tasks)
+        self.assertEqual(summary["total"], len(tasks))
+        self.assertEqual({(board, priority): count for board, counts in summary["pivot"].items()
+                          for priority, count in counts.items() if count}, pivot)
+
+    def test_changes_update_the_counts(self):
+        for engine, config, name in [("files", "", None), ("sqlite", "", None),
+                                     ("files", "[journal]\nenabled = true\n", "journal")]:
+            with self.subTest(engine=engine, config=config):
+                task_manager = self._task_manager(engine, config, name)
+                self._change_tasks(task_manager)
+                self._assert_counted(task_manager)
+
+                # A task file changed outside of task.
+                task_file = task_manager.tasks_dir / "TASK-7.md"
+                task_file.write_text(task_file.read_text().replace("board: Backlog", "board: Done"))
+                self._assert_counted(task_manager)
+
+                trace.enable()
+                summary = TaskManager(task_manager.root_dir).summarize(["category"], board="done")
+                self.assertEqual(summary["counts"]["category"]["Bug"], 2)
+                self.assertNotIn("tasks_parsed", trace.summary()["counters"])
+                trace.disable()
+
+    def test_stale_counts_are_rebuilt(self):
+        task_manager = self._task_manager("files")
+        self._change_tasks(task_manager)
+        index_file = task_manager.workspace / "index"
+        index = json.loads(index_file.read_text())
+        index["counts"] = [["Done", "Bug", "High", "", 100]]
+        index_file.write_text(json.dumps(index))
+        self._assert_counted(task_manager)
+
+        task_manager = self._task_manager("sqlite")
+        self._change_tasks(task_manager)
+        with sqlite3.connect(task_manager.workspace / "tasks.db") as connection:
+            connection.execute("DELETE FROM state WHERE key = 'counts'")
+            connection.execute("UPDATE task_counts SET count = 100")
+        connection.close()
+        self._assert_counted(task_manager)
+
+
+if __name__ == "__main__":
+    unittest.main()
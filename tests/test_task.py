@@ -1,8 +1,9 @@
 from datetime import datetime
 import unittest
+from unittest import mock
 
 from task_cli.board import Board
-from task_cli.task import Task, TaskHistory
+from task_cli.task import PackedHistory, Task, TaskHistory
 from task_cli.task_priority import TaskPriority
 
 
@@ -16,6 +17,36 @@ class TaskHistoryTests(unittest.TestCase):
         self.assertEqual(history.timestamp, datetime(2021, 1, 1, 12, 0, 1))
         self.assertEqual(history.action, "Created")
 
+
+class PackedHistoryTests(unittest.TestCase):
+    def test_entries_round_trip(self):
+        entries = [
+            TaskHistory(timestamp=datetime(2021, 1, 1, 12, 0, 0, 123456), action="Created"),
+            TaskHistory(timestamp=datetime(2021, 1, 2, 12, 0, 0), action="Moved to In Progress"),
+            TaskHistory(timestamp=datetime(2021, 1, 3, 12, 0, 0), action="Priority updated to High"),
+            TaskHistory(timestamp=datetime(2021, 1, 4, 12, 0, 0), action="Category updated to Bug"),
+            TaskHistory(timestamp=datetime(1969, 12, 31, 23, 0, 0), action="Reviewed by someone"),
+        ]
+        history = PackedHistory(entries)
+        self.assertEqual(len(history), 5)
+        self.assertEqual(list(history), entries)
+        self.assertEqual(history[-1], entries[-1])
+        self.assertEqual(history[1:3], entries[1:3])
+        self.assertEqual(history, entries)
+
+    def test_payloads_are_shared(self):
+        first = PackedHistory()
+        second = PackedHistory()
+        first.add(datetime(2021, 1, 1), "Moved to " + "".join(["In ", "Progress"]))
+        second.add(datetime(2021, 1, 1), "Moved to " + "".join(["In Pro", "gress"]))
+        self.assertIs(first._payloads[0], second._payloads[0])
+
+    def test_from_string(self):
+        history = PackedHistory.from_string("2021-01-01 12:00:00 - Created\n\n2021-01-01 12:00:01 - Moved to Done")
+        self.assertEqual([entry.to_string() for entry in history],
+                         ["2021-01-01 12:00:00 - Created", "2021-01-01 12:00:01 - Moved to Done"])
+
+
 class TaskTests(unittest.TestCase):
     _valid_task_str = """---
 id: TASK-1
@@ -238,7 +269,49 @@ This is a note
         with self.assertRaises(ValueError):
             task.move_to_board("invalid")
 
+    def test_task_has_no_instance_dict(self):
+        task = Task(1, "Test Task", "This is a test task", TaskPriority.from_name("High"), "Bug", "Test User")
+        self.assertFalse(hasattr(task, "__dict__"))
+        self.assertIs(task.category, Task(2, "Other", "", TaskPriority.from_name("Low"), "".join(["B", "ug"]), None).category)
+
     def test_task_move_to_board_acronym_history_uses_name(self):
         task = Task(1, "Test Task", "This is a test task", 0, "Bug", "Test User")
         task.move_to_board("ip")
         self.assertEqual(task.history[1].action, "Moved to In Progress")
+
+    def test_task_from_string_lazy_does_not_decode_history(self):
+        with mock.patch.object(TaskHistory, "from_string", wraps=TaskHistory.from_string) as from_string:
+            task = Task.from_string(self._valid_task_str, lazy=True)
+            self.assertEqual(task.title, "Test Task")
+            self.assertEqual(task.description, "This is a test task")
+            self.assertEqual(task.notes, "This is a note")
+            self.assertEqual(from_string.call_count, 0)
+
+    def test_task_from_string_lazy_decodes_history_on_access(self):
+        task = Task.from_string(self._valid_task_str, lazy=True)
+        self.assertEqual(len(task.history), 2)
+        self.assertEqual(task.history[1].action, "Moved to In Progress")
+
+    def test_task_from_string_lazy_invalid_history_raises_exception_on_access(self):
+        task = Task.from_string(self._invalid_history_task_str, lazy=True)
+        with self.assertRaises(ValueError):
+            task.history
+
+    def test_task_lazy_move_to_board_does_not_decode_history(self):
+        task = Task.from_string(self._valid_task_str, lazy=True)
+        with mock.patch.object(TaskHistory, "from_string", wraps=TaskHistory.from_string) as from_string:
+            task.move_to_board("Done")
+            task_str = task.to_string()
+            self.assertEqual(from_string.call_count, 0)
+        self.assertIn("2021-01-01 12:00:01 - Moved to In Progress\n\n", task_str)
+        self.assertTrue(task_str.rstrip().endswith(" - Moved to Done"))
+
+    def test_task_lazy_move_to_board_history_merges_entries(self):
+        task = Task.from_string(self._valid_task_str, lazy=True)
+        task.move_to_board("Done")
+        self.assertEqual([entry.action for entry in task.history],
+                         ["Created", "Moved to In Progress", "Moved to Done"])
+
+    def test_task_lazy_to_string_valid(self):
+        task = Task.from_string(self._valid_task_str, lazy=True)
+        self.assertEqual(task.to_string(), self._valid_task_str)
@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from task_cli import task_index
+from task_cli.task_index import TaskIndex
+from task_cli.query import TaskQuery
+from task_cli.task_manager import TaskManager
+
+
+class TaskIndexTests(unittest.TestCase):
+    def test_refresh_indexes_all_task_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Bug", "Test User")
+            index = TaskIndex(task_manager.workspace / "index", task_manager.tasks_dir)
+            entries = index.refresh()
+            self.assertCountEqual(entries.keys(), ["TASK-1.md", "TASK-2.md"])
+            self.assertEqual(entries["TASK-2.md"]["title"], "Test Task 2")
+            self.assertEqual(entries["TASK-2.md"]["category"], "Bug")
+            self.assertEqual(entries["TASK-2.md"]["priority"], "Medium")
+            self.assertEqual(entries["TASK-2.md"]["board"], "Backlog")
+
+    def test_refresh_ignores_non_task_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            (task_manager.tasks_dir / "README.md").write_text("not a task")
+            self.assertEqual(task_manager.storage.index.refresh(), {})
+
+    def test_refresh_reparses_only_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Feature", "Test User")
+            task_manager.storage.index.refresh()
+            task_manager.storage.index.save()
+            task_file = task_manager.tasks_dir / "TASK-2.md"
+            task_file.write_text(task_file.read_text().replace("board: Backlog", "board: Done"))
+            os.utime(task_file, ns=(0, 0))
+            index = TaskIndex(task_manager.workspace / "index", task_manager.tasks_dir)
+            with mock.patch.object(task_index, "read_header", wraps=task_index.read_header) as read_header:
+                entries = index.refresh()
+            self.assertEqual(read_header.call_count, 1)
+            self.assertEqual(entries["TASK-2.md"]["board"], "Done")
+
+    def test_refresh_drops_deleted_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.storage.index.refresh()
+            (task_manager.tasks_dir / "TASK-1.md").unlink()
+            self.assertEqual(task_manager.storage.index.refresh(), {})
+
+    def test_save_persists_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            index = TaskIndex(task_manager.workspace / "index", task_manager.tasks_dir)
+            self.assertIn("TASK-1.md", index.entries)
+            self.assertEqual(index.entries["TASK-1.md"]["title"], "Test Task")
+
+    def test_corrupted_index_is_rebuilt(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            (task_manager.workspace / "index").write_text("{not json")
+            index = TaskIndex(task_manager.workspace / "index", task_manager.tasks_dir)
+            self.assertIn("TASK-1.md", index.refresh())
+
+    def test_move_task_updates_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.move_task(1, "ip")
+            data = json.loads((task_manager.workspace / "index").read_text())
+            self.assertEqual(data["tasks"]["TASK-1.md"]["board"], "In Progress")
+
+    def test_update_task_priority_and_category_update_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.update_task_priority(1, "High")
+            task_manager.update_task_category(1, "Bug")
+            data = json.loads((task_manager.workspace / "index").read_text())
+            self.assertEqual(data["tasks"]["TASK-1.md"]["priority"], "High")
+            self.assertEqual(data["tasks"]["TASK-1.md"]["category"], "Bug")
+
+    def test_delete_task_updates_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.delete_task(1)
+            data = json.loads((task_manager.workspace / "index").read_text())
+            self.assertNotIn("TASK-1.md", data["tasks"])
+
+    def test_postings_follow_task_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Bug", "Test User")
+            task_manager.create_task("Test Task 3", "Bug", "")
+            task_manager.move_task(2, "ip")
+            task_manager.update_task_category(3, "Feature")
+            task_manager.delete_task(1)
+            index = TaskIndex(task_manager.workspace / "index", task_manager.tasks_dir)
+            self.assertEqual(index.lookup(board=["Backlog"]), ["TASK-3.md"])
+            self.assertEqual(index.lookup(category=["Bug"]), ["TASK-2.md"])
+            self.assertEqual(index.lookup(owner=["Test User"], board=["In Progress"]), ["TASK-2.md"])
+            self.assertEqual(index.lookup(owner=[""]), ["TASK-3.md"])
+            self.assertEqual(index.lookup(board=["Backlog", "In Progress"]), ["TASK-2.md", "TASK-3.md"])
+            self.assertEqual(index.lookup(category=["Security"]), [])
+
+            task_file = task_manager.tasks_dir / "TASK-3.md"
+            task_file.write_text(task_file.read_text().replace("board: Backlog", "board: Done"))
+            (task_manager.tasks_dir / "TASK-2.md").unlink()
+            index.refresh()
+            self.assertEqual(index.lookup(board=["Done"]), ["TASK-3.md"])
+            self.assertEqual(index.lookup(board=["Backlog"]), [])
+            self.assertEqual(index.lookup(owner=["Test User"]), [])
+
+    def test_filtered_list_reads_only_matching_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            for i in range(10):
+                task_manager.create_task(f"Test Task {i + 1}", "Bug" if i % 5 else "Feature", "Test User")
+            storage = TaskManager(tmp).storage
+            with mock.patch.object(storage, "_journaled_entries", wraps=storage._journaled_entries) as journaled:
+                tasks = list(storage.query(TaskQuery.parse("category=Feature")))
+            self.assertEqual([task.title for task in tasks], ["Test Task 1", "Test Task 6"])
+            self.assertEqual(list(journaled.call_args.args[0]), ["TASK-1.md", "TASK-6.md"])
+
+    def test_postings_are_built_from_an_index_without_them(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Bug", "Test User")
+            index_file = task_manager.workspace / "index"
+            data = json.loads(index_file.read_text())
+            index_file.write_text(json.dumps({"version": 1, "tasks": data["tasks"]}))
+            index = TaskIndex(index_file, task_manager.tasks_dir)
+            with mock.patch.object(task_index, "read_header", wraps=task_index.read_header) as read_header:
+                index.refresh()
+            self.assertEqual(read_header.call_count, 0)
+            self.assertEqual(index.lookup(category=["Bug"]), ["TASK-2.md"])
+            index.save()
+            self.assertEqual(json.loads(index_file.read_text())["postings"]["category"], {"Feature": [1], "Bug": [2]})
+
+    def test_init_workspace_ignores_index_in_git(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            self.assertIn("index", (task_manager.workspace / ".gitignore").read_text().split())
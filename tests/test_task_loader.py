@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from task_cli import task_loader
+from task_cli.task_index import read_entry
+from task_cli.task_manager import TaskManager
+
+
+class TaskLoaderTests(unittest.TestCase):
+    def test_choose_backend_small_workspace_is_serial(self):
+        self.assertEqual(task_loader.choose_backend(10), (task_loader.SERIAL, 1))
+
+    def test_choose_backend_medium_workspace_uses_threads(self):
+        with mock.patch.object(task_loader, "_available_cpus", return_value=4):
+            backend, workers = task_loader.choose_backend(500)
+        self.assertEqual(backend, task_loader.THREAD)
+        self.assertGreater(workers, 1)
+
+    def test_choose_backend_single_cpu_is_serial(self):
+        with mock.patch.object(task_loader, "_available_cpus", return_value=1):
+            self.assertEqual(task_loader.choose_backend(100000), (task_loader.SERIAL, 1))
+
+    def test_choose_backend_jobs_override_on_single_cpu(self):
+        with mock.patch.object(task_loader, "_available_cpus", return_value=1):
+            self.assertEqual(task_loader.choose_backend(500, jobs=8), (task_loader.THREAD, 8))
+
+    def test_choose_backend_large_workspace_uses_processes(self):
+        self.assertEqual(task_loader.choose_backend(100000, jobs=4), (task_loader.PROCESS, 4))
+
+    def test_choose_backend_single_job_is_serial(self):
+        self.assertEqual(task_loader.choose_backend(100000, jobs=1), (task_loader.SERIAL, 1))
+
+    def test_load_invalid_backend_raises_exception(self):
+        with self.assertRaises(ValueError):
+            task_loader.load([Path("TASK-1.md")], read_entry, backend="invalid")
+
+    def test_load_keeps_order_for_every_backend(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            for i in range(20):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            paths = [task_manager.tasks_dir / f"TASK-{i + 1}.md" for i in reversed(range(20))]
+            expected = [entry["title"] for entry in task_loader.load(paths, read_entry, backend=task_loader.SERIAL)]
+            self.assertEqual(expected[0], "Test Task 20")
+            for backend in [task_loader.THREAD, task_loader.PROCESS]:
+                with self.subTest(backend=backend):
+                    entries = task_loader.load(paths, read_entry, jobs=2, backend=backend)
+                    self.assertEqual([entry["title"] for entry in entries], expected)
+
+    def test_list_tasks_with_jobs_returns_all_tasks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            for i in range(100):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            (task_manager.workspace / "index").unlink()
+            tasks = TaskManager(tmp).list_tasks(jobs=4)
+            self.assertEqual(len(tasks), 100)
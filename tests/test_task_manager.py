@@ -1,31 +1,50 @@
 import tempfile
 import unittest
 
+from task_cli.gitignore import LOCAL_FILES
 from task_cli.task_manager import TaskManager
 from task_cli.task import Task
 
 
 class TaskManagerTests(unittest.TestCase):
+    engine = "files"
+
+    def _task_manager(self, tmp):
+        task_manager = TaskManager(tmp)
+        task_manager.init_workspace()
+        (task_manager.workspace / "config").write_text(f"[storage]\nengine = {self.engine}\n")
+        return task_manager
+
     def test_init_workspace_if_doesnt_exist(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             self.assertTrue(task_manager.workspace.exists())
             self.assertTrue(task_manager.tasks_dir.exists())
             self.assertTrue(task_manager.task_counter_file.exists())
 
-    def test_init_workspace_should_initialize_counter_with_zero(self):
+    def test_local_files_are_ignored_by_git(self):
         with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            self.assertEqual((task_manager.workspace / ".gitignore").read_text().splitlines(), list(LOCAL_FILES))
+            # A workspace of an older version gets the missing lines with the first file they ignore.
+            (task_manager.workspace / ".gitignore").write_text("index\nnotes.txt")
             task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.search_tasks("test")
+            lines = (task_manager.workspace / ".gitignore").read_text().splitlines()
+            self.assertEqual(lines[:2], ["index", "notes.txt"])
+            self.assertEqual(sorted(lines[2:]), sorted(set(LOCAL_FILES) - {"index"}))
+
+    def test_init_workspace_should_initialize_counter_with_zero(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
             with task_manager.task_counter_file.open("r") as f:
                 counter = f.read()
                 self.assertEqual(counter, "0")
 
     def test_create_task_should_increment_counter(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             with task_manager.task_counter_file.open("r") as f:
                 counter = f.read()
@@ -33,16 +52,14 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_create_task_should_create_task_file(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_file = task_manager.tasks_dir / "TASK-1.md"
             self.assertTrue(task_file.exists())
     
     def test_move_task_should_change_board(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.move_task(1, "In Progress")
             task_file = task_manager.tasks_dir / "TASK-1.md"
@@ -52,8 +69,7 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_move_task_should_not_change_other_fields(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.move_task(1, "In Progress")
             task_file = task_manager.tasks_dir / "TASK-1.md"
@@ -66,8 +82,7 @@ class TaskManagerTests(unittest.TestCase):
     
     def test_move_task_should_not_change_other_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             task_manager.move_task(1, "In Progress")
@@ -78,23 +93,20 @@ class TaskManagerTests(unittest.TestCase):
     
     def test_move_task_should_raise_error_if_task_doesnt_exist(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             with self.assertRaises(ValueError):
                 task_manager.move_task(1, "In Progress")
 
     def test_move_task_should_raise_error_if_board_is_invalid(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             with self.assertRaises(ValueError):
                 task_manager.move_task(1, "Invalid Board")
 
     def test_update_task_priority(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.update_task_priority(1, "High")
             task_file = task_manager.tasks_dir / "TASK-1.md"
@@ -104,8 +116,7 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_update_task_priority_should_not_change_other_fields(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.update_task_priority(1, "High")
             task_file = task_manager.tasks_dir / "TASK-1.md"
@@ -118,8 +129,7 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_update_task_priority_should_not_change_other_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             task_manager.update_task_priority(1, "High")
@@ -130,23 +140,20 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_update_task_priority_should_raise_error_if_task_doesnt_exist(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             with self.assertRaises(ValueError):
                 task_manager.update_task_priority(1, "High")
 
     def test_update_task_priority_should_raise_error_if_priority_is_invalid(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             with self.assertRaises(ValueError):
                 task_manager.update_task_priority(1, "Invalid Priority")
 
     def test_update_task_category_should_change_category(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.update_task_category(1, "Bug")
             task_file = task_manager.tasks_dir / "TASK-1.md"
@@ -156,8 +163,7 @@ class TaskManagerTests(unittest.TestCase):
     
     def test_update_task_category_should_not_change_other_fields(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.update_task_category(1, "Bug")
             task_file = task_manager.tasks_dir / "TASK-1.md"
@@ -170,8 +176,7 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_update_task_category_should_not_change_other_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             task_manager.update_task_category(1, "Bug")
@@ -182,23 +187,20 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_update_task_category_should_raise_error_if_task_doesnt_exist(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             with self.assertRaises(ValueError):
                 task_manager.update_task_category(1, "Bug")
 
     def test_update_task_category_should_raise_error_if_category_is_invalid(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             with self.assertRaises(ValueError):
                 task_manager.update_task_category(1, "Invalid Category")
 
     def test_list_tasks_should_return_all_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             tasks = task_manager.list_tasks()
@@ -207,8 +209,7 @@ class TaskManagerTests(unittest.TestCase):
     
     def test_list_tasks_by_board(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             task_manager.move_task(1, "In Progress")
@@ -218,15 +219,13 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_list_tasks_by_board_should_return_empty_list_if_no_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             tasks = task_manager.list_tasks(board="In Progress")
             self.assertEqual(len(tasks), 0)
 
     def test_list_tasks_by_priority(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             task_manager.update_task_priority(1, "High")
@@ -236,15 +235,13 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_list_tasks_by_priority_should_return_empty_list_if_no_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             tasks = task_manager.list_tasks(priority="High")
             self.assertEqual(len(tasks), 0)
 
     def test_list_tasks_by_priority_should_return_multiple_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             task_manager.update_task_priority(1, "High")
@@ -255,8 +252,7 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_list_tasks_by_category(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Bug", "Test User")
             tasks = task_manager.list_tasks(category="Feature")
@@ -265,25 +261,92 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_list_tasks_by_category_should_return_empty_list_if_no_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             tasks = task_manager.list_tasks(category="Feature")
             self.assertEqual(len(tasks), 0)
 
     def test_list_tasks_by_category_should_return_multiple_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             tasks = task_manager.list_tasks(category="Feature")
             self.assertEqual(len(tasks), 2)
             self.assertCountEqual([task.title for task in tasks], ["Test Task", "Test Task 2"])
 
+    def test_list_tasks_by_owner(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Bug", "Other User")
+            task_manager.create_task("Test Task 3", "Bug", "")
+            self.assertEqual([task.title for task in task_manager.list_tasks(owner="Other User")], ["Test Task 2"])
+            self.assertEqual(task_manager.list_tasks(owner="Nobody"), [])
+
+    def test_list_tasks_by_several_fields(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Bug", "Test User")
+            task_manager.create_task("Test Task 2", "Bug", "Test User")
+            task_manager.create_task("Test Task 3", "Feature", "Test User")
+            task_manager.move_task(2, "ip")
+            task_manager.move_task(3, "ip")
+            task_manager.update_task_priority(2, "High")
+            tasks = TaskManager(tmp).list_tasks(board="ip", category="Bug", owner="Test User")
+            self.assertEqual([task.title for task in tasks], ["Test Task 2"])
+            self.assertEqual([task.title for task in TaskManager(tmp).list_tasks(board="ip", priority="High")],
+                             ["Test Task 2"])
+            self.assertEqual(TaskManager(tmp).list_tasks(board="bl", category="Feature"), [])
+
+    def test_list_tasks_by_query(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Add cli flag", "Feature", "alice")
+            task_manager.create_task("Fix CLI crash", "Bug", "alice")
+            task_manager.create_task("Fix docs", "Documentation", "bob")
+            task_manager.create_task("Improve CLI help", "Feature", "")
+            task_manager.update_task_priority(1, "Low")
+            task_manager.update_task_priority(2, "High")
+            task_manager.move_task(2, "ip")
+
+            def titles(query, **filters):
+                return sorted(task.title for task in TaskManager(tmp).list_tasks(query=query, **filters))
+
+            self.assertEqual(titles('priority<=Medium and owner=alice and title~"cli"'), ["Add cli flag"])
+            self.assertEqual(titles("title~cli and not board=ip"), ["Add cli flag", "Improve CLI help"])
+            self.assertEqual(titles("category=Bug or owner=bob"), ["Fix CLI crash", "Fix docs"])
+            self.assertEqual(titles('owner="" or id>=3'), ["Fix docs", "Improve CLI help"])
+            self.assertEqual(titles("priority>=Medium", board="bl"), ["Fix docs", "Improve CLI help"])
+            self.assertEqual(titles("created>2000-01-01 and created<2100-01-01"),
+                             ["Add cli flag", "Fix CLI crash", "Fix docs", "Improve CLI help"])
+            with self.assertRaises(ValueError):
+                TaskManager(tmp).list_tasks(query="priority<")
+
+    def test_contains_query_ignores_case_of_non_ascii_letters(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Émile cafe", "Feature", "Zoë")
+            task_manager.create_task("Emile cafe", "Feature", "alice")
+
+            def titles(query):
+                return [task.title for task in TaskManager(tmp).iter_tasks(query=query)]
+
+            self.assertEqual(titles("title~émile"), ["Émile cafe"])
+            self.assertEqual(titles("title~ÉMILE and owner~ZOË"), ["Émile cafe"])
+
+    def test_explain_query(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "alice")
+            task_manager.create_task("Test Task 2", "Bug", "bob")
+            lines = TaskManager(tmp).explain_query(board="bl", query="owner=alice and title~test")
+            self.assertEqual(lines[0], "Filter: board in (Backlog) and owner = alice and title ~ test")
+            self.assertIn("Index lookup: board in (Backlog) and owner = alice", lines)
+            self.assertIn("Candidates: 1 of 2 tasks", lines)
+
     def test_list_tasks_by_board_acronym(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             task_manager.move_task(1, "In Progress")
@@ -293,8 +356,7 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_move_to_board_returns_the_task(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task = task_manager.move_task(1, "In Progress")
             self.assertEqual(task._task_id, 1)
@@ -303,8 +365,7 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_delete_task(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.delete_task(1)
             task_file = task_manager.tasks_dir / "TASK-1.md"
@@ -312,23 +373,20 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_delete_task_should_raise_error_if_task_doesnt_exist(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             with self.assertRaises(ValueError):
                 task_manager.delete_task(1)
 
     def test_delete_task_returns_title_of_deleted_task(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             title = task_manager.delete_task(1)
             self.assertEqual(title, "TASK-1 - Test Task")
 
     def test_delete_task_should_not_delete_other_tasks(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             task_manager.delete_task(1)
@@ -337,23 +395,20 @@ class TaskManagerTests(unittest.TestCase):
 
     def test_task_location(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task", "Feature", "Test User")
             location = task_manager.task_location(1)
             self.assertEqual(location, task_manager.tasks_dir / "TASK-1.md")
 
     def test_task_location_should_raise_error_if_task_doesnt_exist(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             with self.assertRaises(ValueError):
                 task_manager.task_location(1)
 
     def test_list_tasks_default_return_sorted_by_board_in_progress_last(self):
         with tempfile.TemporaryDirectory() as tmp:
-            task_manager = TaskManager(tmp)
-            task_manager.init_workspace()
+            task_manager = self._task_manager(tmp)
             task_manager.create_task("Test Task 1", "Feature", "Test User")
             task_manager.create_task("Test Task 2", "Feature", "Test User")
             task_manager.move_task(1, Task.IN_PROGRESS.name)
@@ -361,3 +416,126 @@ class TaskManagerTests(unittest.TestCase):
             tasks = task_manager.list_tasks()
             self.assertEqual(tasks[0].title, "Test Task 2")
             self.assertEqual(tasks[1].title, "Test Task 1")
+
+    def test_list_tasks_loads_task_body_on_access(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_file = task_manager.tasks_dir / "TASK-1.md"
+            task_file.write_text(task_file.read_text().replace("## Description\n", "## Description\nSome details"))
+            tasks = task_manager.list_tasks()
+            self.assertEqual(tasks[0].description, "Some details")
+            self.assertEqual(tasks[0].history[0].action, "Created")
+
+    def test_iter_tasks_limit_returns_first_sorted_tasks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            for i in range(5):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            task_manager.move_task(2, Task.DONE.name)
+            task_manager.move_task(4, Task.DONE.name)
+            tasks = task_manager.iter_tasks(limit=3)
+            self.assertEqual([task.title for task in tasks], [task.title for task in task_manager.list_tasks()][:3])
+
+    def test_iter_tasks_limit_and_offset(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            for i in range(5):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            task_manager.move_task(3, Task.IN_PROGRESS.name)
+            all_titles = [task.title for task in task_manager.list_tasks()]
+            tasks = task_manager.iter_tasks(limit=2, offset=3)
+            self.assertEqual([task.title for task in tasks], all_titles[3:5])
+            self.assertEqual(all_titles[-1], "Test Task 3")
+
+    def test_iter_tasks_offset_without_limit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            for i in range(3):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            tasks = list(task_manager.iter_tasks(offset=1))
+            self.assertEqual(len(tasks), 2)
+
+    def test_iter_tasks_unsorted_with_filter(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Bug", "Test User")
+            task_manager.create_task("Test Task 3", "Bug", "Test User")
+            tasks = list(task_manager.iter_tasks(category="Bug", sort=False, limit=1))
+            self.assertEqual(len(tasks), 1)
+            self.assertEqual(tasks[0].category, "Bug")
+
+
+class SqliteTaskManagerTests(TaskManagerTests):
+    engine = "sqlite"
+
+    def test_explain_query(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "alice")
+            lines = TaskManager(tmp).explain_query(query="owner=alice and created>2024-01-01")
+            self.assertEqual(lines[0], "Filter: owner = alice and created > 2024-01-01")
+            self.assertTrue(lines[1].startswith("SQL: SELECT"))
+            self.assertTrue(any("tasks_owner" in line for line in lines[2:]))
+
+    def test_list_tasks_loads_task_body_on_access(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_file = task_manager.tasks_dir / "TASK-1.md"
+            task_file.write_text(task_file.read_text().replace("## Description\n", "## Description\nSome details"))
+            task_manager.sync()
+            tasks = task_manager.list_tasks()
+            self.assertEqual(tasks[0].description, "Some details")
+            self.assertEqual(tasks[0].history[0].action, "Created")
+
+    def test_tasks_are_stored_in_the_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.move_task(1, Task.IN_PROGRESS.name)
+            (task_manager.tasks_dir / "TASK-1.md").unlink()
+            task = TaskManager(tmp).storage.read_task(1)
+            self.assertEqual(task.board, Task.IN_PROGRESS)
+            self.assertEqual([entry.action for entry in task.history], ["Created", "Moved to In Progress"])
+
+    def test_sync_imports_changed_and_removed_task_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Feature", "Test User")
+            task_file = task_manager.tasks_dir / "TASK-1.md"
+            task_file.write_text(task_file.read_text().replace("board: Backlog", "board: Done"))
+            (task_manager.tasks_dir / "TASK-2.md").unlink()
+            task_manager.sync()
+            tasks = TaskManager(tmp).list_tasks()
+            self.assertEqual([(task.title, task.board) for task in tasks], [("Test Task", Task.DONE)])
+
+    def test_task_files_changed_outside_are_picked_up_without_sync(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = self._task_manager(tmp)
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.create_task("Test Task 2", "Feature", "Test User")
+            task_file = task_manager.tasks_dir / "TASK-1.md"
+            task_file.write_text(task_file.read_text().replace("title: Test Task", "title: Edited"))
+            (task_manager.tasks_dir / "TASK-2.md").unlink()
+            self.assertEqual([task.title for task in TaskManager(tmp).list_tasks()], ["Edited"])
+
+            # A change to a task is not written over a task file edited since.
+            task_file.write_text(task_file.read_text().replace("title: Edited", "title: Edited again"))
+            task_manager.move_task(1, Task.DONE.name)
+            self.assertIn("title: Edited again", task_file.read_text())
+            self.assertIn("board: Done", task_file.read_text())
+
+    def test_switching_to_sqlite_imports_existing_task_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            task_manager.move_task(1, Task.DONE.name)
+            (task_manager.workspace / "config").write_text("[storage]\nengine = sqlite\n")
+            task_manager = TaskManager(tmp)
+            tasks = task_manager.list_tasks(board="dn")
+            self.assertEqual([task.title for task in tasks], ["Test Task"])
+            self.assertTrue(task_manager.storage.db_file.exists())
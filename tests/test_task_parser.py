@@ -0,0 +1,94 @@
+from datetime import datetime
+import tempfile
+import unittest
+from pathlib import Path
+
+import frontmatter
+
+from task_cli.task_parser import parse_body, parse_front_matter, parse_header, parse_timestamp, read_header
+
+
+class TaskParserTests(unittest.TestCase):
+    _task_str = """---
+id: TASK-7
+title: Test Task
+created: 2021-01-01 12:00:00
+priority: High
+category: Bug
+owner:
+board: In Progress
+---
+
+## Description
+This is a test task
+
+## Notes
+This is a note
+
+## History
+2021-01-01 12:00:00 - Created
+
+2021-01-01 12:00:01 - Moved to In Progress
+"""
+
+    def test_parse_header_matches_yaml(self):
+        self.assertEqual(parse_header(self._task_str), frontmatter.loads(self._task_str).metadata)
+
+    def test_parse_header_empty_value_is_none(self):
+        self.assertIsNone(parse_header(self._task_str)["owner"])
+
+    def test_parse_front_matter_returns_stripped_content(self):
+        metadata, content = parse_front_matter(self._task_str)
+        self.assertEqual(metadata["id"], "TASK-7")
+        self.assertEqual(content, frontmatter.loads(self._task_str).content)
+
+    def test_parse_header_falls_back_to_yaml_for_quoted_values(self):
+        task_str = self._task_str.replace("title: Test Task", 'title: "Test: Task"')
+        self.assertEqual(parse_header(task_str)["title"], "Test: Task")
+
+    def test_parse_header_falls_back_to_yaml_for_non_string_values(self):
+        task_str = self._task_str.replace("title: Test Task", "title: 42")
+        self.assertEqual(parse_header(task_str)["title"], 42)
+
+    def test_parse_header_falls_back_to_yaml_for_unknown_keys(self):
+        task_str = self._task_str.replace("owner:\n", "owner: Test User\ndue: 2021-02-01\n")
+        metadata = parse_header(task_str)
+        self.assertEqual(metadata["owner"], "Test User")
+        self.assertIn("due", metadata)
+
+    def test_parse_header_without_closing_delimiter_returns_empty_metadata(self):
+        task_str = self._task_str.replace("---\n\n## Description", "\n## Description")
+        self.assertEqual(parse_header(task_str), {})
+
+    def test_parse_header_matches_yaml_for_workspace_tasks(self):
+        tasks_dir = Path(__file__).resolve().parent.parent / ".tasks" / "tasks"
+        for task_file in tasks_dir.glob("TASK-*.md"):
+            with self.subTest(task_file=task_file.name):
+                task_str = task_file.read_text()
+                self.assertEqual(parse_header(task_str), frontmatter.loads(task_str).metadata)
+
+    def test_read_header_reads_large_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_file = Path(tmp) / "TASK-7.md"
+            task_file.write_text(self._task_str.replace("This is a test task", "x" * 20000))
+            self.assertEqual(read_header(task_file), parse_header(self._task_str))
+
+    def test_parse_body_single_pass(self):
+        _, content = parse_front_matter(self._task_str)
+        description, notes, history = parse_body(content)
+        self.assertEqual(description, "This is a test task")
+        self.assertEqual(notes, "This is a note")
+        self.assertEqual(history, "2021-01-01 12:00:00 - Created\n\n2021-01-01 12:00:01 - Moved to In Progress")
+
+    def test_parse_body_missing_section_raises_exception(self):
+        with self.assertRaises(ValueError):
+            parse_body("## Description\nfoo\n\n## History\n2021-01-01 12:00:00 - Created")
+
+    def test_parse_timestamp(self):
+        self.assertEqual(parse_timestamp("2021-01-01 12:00:01"), datetime(2021, 1, 1, 12, 0, 1))
+
+    def test_parse_timestamp_invalid_raises_exception(self):
+        for value in ["12345", "2021-13-01 12:00:01", "2021-01-01 1a:00:01", ""]:
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_timestamp(value)
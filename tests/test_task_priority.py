@@ -4,6 +4,10 @@ from task_cli.task_priority import TaskPriority
 
 
 class TaskPriorityTests(unittest.TestCase):
+    def test_priorities_are_shared(self):
+        self.assertIs(TaskPriority.from_name("High"), TaskPriority.from_name("high"))
+        self.assertIs(TaskPriority.from_name("Low"), TaskPriority.from_numeric_value(2))
+
     def test_priority_from_numeric_value(self):
         test_cases = {
             0: "High",
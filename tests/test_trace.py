@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from task_cli import trace
+from task_cli.task_manager import TaskManager
+
+_root_dir = Path(__file__).resolve().parent.parent
+
+
+class TraceTests(unittest.TestCase):
+    def tearDown(self):
+        trace.disable()
+
+    def test_disabled_records_nothing(self):
+        trace.enable()
+        trace.disable()
+        with trace.phase("phase"):
+            trace.count("counter")
+        self.assertEqual(trace.summary()["phases"], {})
+        self.assertEqual(trace.summary()["counters"], {})
+
+    def test_phases_and_counters(self):
+        trace.enable()
+        for _ in range(3):
+            with trace.phase("outer"):
+                with trace.phase("inner"):
+                    trace.count("items", 2)
+        result = trace.summary()
+        self.assertEqual(list(result["phases"]), ["outer", "inner"])
+        self.assertEqual(result["phases"]["inner"]["calls"], 3)
+        self.assertGreaterEqual(result["phases"]["outer"]["total_ms"], result["phases"]["inner"]["total_ms"])
+        self.assertEqual(result["counters"], {"items": 6})
+        lines = trace.format_summary(result)
+        self.assertTrue(lines[1].startswith("outer"))
+        self.assertIn("items", lines[-1])
+
+        events = trace.chrome_trace()["traceEvents"]
+        self.assertEqual(len(events), 6)
+        self.assertEqual({event["ph"] for event in events}, {"X"})
+
+    def test_list_tasks_records_phases(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            for i in range(3):
+                task_manager.create_task(f"Test Task {i + 1}", "Feature", "Test User")
+            (task_manager.workspace / "index").unlink()
+            trace.enable()
+            for task in TaskManager(tmp).list_tasks():
+                task.history
+            result = trace.summary()
+        for phase in ["index.load", "index.scan", "index.read", "index.save",
+                      "task.body", "task.history"]:
+            self.assertIn(phase, result["phases"])
+        self.assertEqual(result["counters"]["files_scanned"], 3)
+        self.assertEqual(result["counters"]["files_read"], 3)
+        self.assertGreater(result["counters"]["bytes_read"], 0)
+        self.assertEqual(result["counters"]["tasks_listed"], 3)
+        self.assertEqual(result["counters"]["histories_decoded"], 3)
+
+    def test_trace_variable_writes_a_chrome_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            task_manager = TaskManager(tmp)
+            task_manager.init_workspace()
+            task_manager.create_task("Test Task", "Feature", "Test User")
+            trace_file = Path(tmp) / "trace.json"
+            env = dict(os.environ, PYTHONPATH=str(_root_dir), TASK_CLI_TRACE=str(trace_file))
+            result = subprocess.run([sys.executable, "-m", "task_cli.main", "list"],
+                                    cwd=tmp, env=env, capture_output=True, text=True, check=True)
+            self.assertIn("TASK-1", result.stdout)
+            data = json.loads(trace_file.read_text())
+            self.assertIn("output", {event["name"] for event in data["traceEvents"]})
+            self.assertEqual(data["otherData"]["counters"]["tasks_listed"], 1)
+
+            env = dict(os.environ, PYTHONPATH=str(_root_dir))
+            result = subprocess.run([sys.executable, "-m", "task_cli.main", "--profile", "list"],
+                                    cwd=tmp, env=env, capture_output=True, text=True, check=True)
+            self.assertIn("TASK-1", result.stdout)
+            self.assertIn("index.load", result.stderr)
+            self.assertIn("tasks_listed", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from task_cli.config import WorkspaceConfig
+from task_cli.flow_stats import flow_stats
+from task_cli.task import Task
+from task_cli.task_manager import TaskManager
+from task_cli.workflow import Workflow, compile_workflow
+
+_config = """[workflow]
+boards = Backlog (BL), In Progress (IP), Review (RV), Blocked (BK), Done (DN)
+categories = Bug, Feature, Chore
+list_order = Blocked, Review, In Progress, Backlog, Done
+"""
+
+
+class WorkflowTests(unittest.TestCase):
+    def test_default_workflow(self):
+        workflow = Workflow.parse()
+        self.assertEqual([board.name for board in workflow.boards], ["Backlog", "In Progress", "Done"])
+        self.assertEqual((workflow.initial.name, workflow.start.name, workflow.done.name),
+                         ("Backlog", "In Progress", "Done"))
+        self.assertEqual(workflow.sort_order, {"Done": 0, "Backlog": 1, "In Progress": 2})
+        self.assertEqual(workflow.board("ip").name, "In Progress")
+        self.assertEqual(workflow.category("ui/ux"), "UI/UX")
+
+    def test_custom_workflow(self):
+        workflow = Workflow.parse(boards="Todo, Doing (DO), Review (RV), Blocked (BK), Shipped (SH)",
+                                  categories="Bug, Chore", start="do", done="Shipped")
+        self.assertEqual(workflow.initial.name, "Todo")
+        self.assertEqual([board.name for board in workflow.in_progress], ["Doing", "Review", "Blocked"])
+        self.assertEqual(workflow.board("TODO").acronym, "Todo")
+        with self.assertRaises(ValueError):
+            workflow.category("Feature")
+
+    def test_invalid_workflows(self):
+        for options in [{"boards": ""}, {"categories": " , "}, {"boards": "Review (RV), Rework (RV)"},
+                        {"categories": "Bug, bug"}, {"done": "Shipped"}, {"list_order": "Done, Backlog"},
+                        {"list_order": "Done, Backlog, Backlog, In Progress"}]:
+            with self.subTest(options=options), self.assertRaises(ValueError):
+                Workflow.parse(**options)
+
+    def test_compiled_once(self):
+        self.assertIs(compile_workflow(boards="A, B"), compile_workflow(boards="A, B"))
+
+    def test_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = Path(tmp) / "config"
+            self.assertEqual(WorkspaceConfig(config_file).workflow.categories,
+                             ["Bug", "Feature", "Documentation", "Maintenance", "UI/UX", "Security"])
+            config_file.write_text("[workflow]\ndone = Shipped\n")
+            with self.assertRaises(ValueError):
+                WorkspaceConfig(config_file).workflow
+
+
+class CustomWorkflowTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def _task_manager(self, engine: str = "files") -> TaskManager:
+        self.root_dir = Path(self._tmp.name) / engine
+        self.root_dir.mkdir()
+        task_manager = TaskManager(self.root_dir)
+        task_manager.init_workspace()
+        (task_manager.workspace / "config").write_text(f"{_config}[storage]\nengine = {engine}\n")
+        return task_manager
+
+    def test_custom_boards_and_categories(self):
+        for engine in ["files", "sqlite"]:
+            with self.subTest(engine=engine):
+                task_manager = self._task_manager(engine)
+                first = task_manager.create_task("Write docs", "chore", "alice")
+                second = task_manager.create_task("Fix crash", "Bug", "bob")
+                third = task_manager.create_task("Add flag", "Feature", "alice")
+                task_manager.move_task(Task.task_num_from_id(first), "rv")
+                task_manager.move_task(Task.task_num_from_id(second), "Blocked")
+                with self.assertRaises(ValueError):
+                    task_manager.create_task("Other", "Documentation", "alice")
+                with self.assertRaises(ValueError):
+                    task_manager.move_task(Task.task_num_from_id(third), "Testing")
+
+                task_manager = TaskManager(self.root_dir)
+                self.assertEqual([task.task_id for task in task_manager.list_tasks()], [second, first, third])
+                tasks = task_manager.list_tasks(query="board=review and category=CHORE")
+                self.assertEqual([(task.task_id, task.board.name, task.category) for task in tasks],
+                                 [(first, "Review", "Chore")])
+                self.assertEqual(len(task_manager.list_tasks(query="board!=bk")), 2)
+
+    def test_workspaces_keep_their_own_workflow(self):
+        for engine in ["files", "sqlite"]:
+            with self.subTest(engine=engine):
+                custom = self._task_manager(engine)
+                default = TaskManager(Path(self._tmp.name) / f"{engine}-default")
+                default.workspace.parent.mkdir()
+                default.init_workspace()
+                custom_id = custom.create_task("Write docs", "Chore", "alice")
+                default_id = default.create_task("Write docs", "Documentation", "alice")
+                custom.move_task(Task.task_num_from_id(custom_id), "Review")
+                default.move_task(Task.task_num_from_id(default_id), "In Progress")
+                with self.assertRaises(ValueError):
+                    default.create_task("Other", "Chore", "alice")
+                with self.assertRaises(ValueError):
+                    custom.list_tasks(board="Testing")
+                self.assertEqual([task.board.name for task in custom.list_tasks(category="chore")], ["Review"])
+                self.assertEqual([task.category for task in default.list_tasks(board="ip")], ["Documentation"])
+
+    def test_flow_stats(self):
+        task_manager = self._task_manager()
+        task_id = Task.task_num_from_id(task_manager.create_task("Write docs", "Chore", "alice"))
+        task = task_manager.storage.read_task(task_id)
+        task.move_to_board("Review", datetime(2024, 1, 3, 9))
+        task.move_to_board("Done", datetime(2024, 1, 4, 9))
+        task_manager.storage.write_task(task)
+        task_manager.storage.flush()
+        stats = flow_stats(task_manager.iter_tasks(sort=False), workflow=task_manager.storage.workflow)
+        self.assertEqual(stats["weekly"][0]["cumulative_flow"],
+                         {"Backlog": 0, "In Progress": 0, "Review": 0, "Blocked": 0, "Done": 1})
+        # Cycle time starts with the first move to a work in progress board, here Review.
+        self.assertEqual(stats["cycle_time"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()